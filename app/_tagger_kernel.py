@@ -0,0 +1,79 @@
+"""
+Tagger Kernel - Numba-kompilierter Keyword-Scan für Batch-Tagging
+Arbeitet auf UTF-8 Byte-Puffern (uint8) statt Python-Strings
+"""
+
+import logging
+from typing import List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Try to import Numba (LLVM JIT)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logger.warning("⚠️ numba not available, batch tagging uses per-document scan")
+
+
+def encode_strings(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Packt Strings in einen uint8-Puffer plus Offsets
+
+    Args:
+        values: Liste von Strings
+
+    Returns:
+        (buffer, offsets) - String i liegt in buffer[offsets[i]:offsets[i + 1]]
+    """
+    encoded = [v.encode('utf-8') for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(e) for e in encoded])
+    buffer = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return buffer, offsets
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True, parallel=True)
+    def match_keywords(text_buf, text_offsets, kw_buf, kw_offsets, kw_tags, n_tags):
+        """
+        Prüft für jedes Dokument, welche Tags per Keyword-Substring treffen
+
+        UTF-8 ist selbstsynchronisierend, ein Byte-Treffer ist also
+        immer auch ein Zeichen-Treffer.
+
+        Returns:
+            bool-Matrix [n_docs, n_tags]
+        """
+        n_docs = text_offsets.shape[0] - 1
+        n_kw = kw_offsets.shape[0] - 1
+        result = np.zeros((n_docs, n_tags), dtype=np.bool_)
+
+        for d in prange(n_docs):
+            start = text_offsets[d]
+            end = text_offsets[d + 1]
+            for k in range(n_kw):
+                tag = kw_tags[k]
+                if result[d, tag]:
+                    continue
+                kw_start = kw_offsets[k]
+                kw_len = kw_offsets[k + 1] - kw_start
+                first = kw_buf[kw_start]
+                for i in range(start, end - kw_len + 1):
+                    if text_buf[i] != first:
+                        continue
+                    j = 1
+                    while j < kw_len and text_buf[i + j] == kw_buf[kw_start + j]:
+                        j += 1
+                    if j == kw_len:
+                        result[d, tag] = True
+                        break
+
+        return result
+
+else:
+    match_keywords = None
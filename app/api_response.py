@@ -1,20 +1,78 @@
 """
 API Response Helper - Konsistente Antwort-Formate
 """
-from flask import jsonify
-from typing import Any, Dict, Optional, Tuple
+from dataclasses import dataclass
+from flask import Response, jsonify, current_app, stream_with_context
+from typing import Any, Dict, Iterable, Optional, Tuple
 import logging
 
+from app.json_provider import OrjsonProvider
+
 logger = logging.getLogger(__name__)
 
 
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+@dataclass(slots=True, frozen=True)
+class Pagination:
+    """Pagination-Metadaten (orjson/Flask serialisieren Dataclasses direkt)"""
+    page: int
+    page_size: int
+    total: int
+    total_pages: int
+    has_next: bool
+    has_prev: bool
+
+
+def _pagination(total: int, page: int, page_size: int) -> Pagination:
+    """Pagination-Metadaten"""
+    total_pages = (total + page_size - 1) // page_size
+    return Pagination(
+        page=page,
+        page_size=page_size,
+        total=total,
+        total_pages=total_pages,
+        has_next=page < total_pages,
+        has_prev=page > 1
+    )
+
+
+def _dump(obj: Any) -> bytes:
+    """Serialisiert über den JSON-Provider der App direkt zu Bytes"""
+    provider = current_app.json
+    if isinstance(provider, OrjsonProvider):
+        return provider.dumps_bytes(obj)
+    return provider.dumps(obj).encode('utf-8')
+
+
 class APIResponse:
     """
     Standardisierte API-Antworten mit konsistentem Format
     """
     
     @staticmethod
-    def success(data: Any = None, message: str = "Success", status_code: int = 200) -> Tuple[Dict, int]:
+    def _raw(payload: Any, status: int = 200) -> Response:
+        """
+        Baut die Response direkt aus den JSON-Bytes (ohne jsonify)
+        
+        Args:
+            payload: dict/list (andere Typen gehen über jsonify)
+            status: HTTP Status Code
+            
+        Returns:
+            Response-Objekt
+        """
+        if not isinstance(payload, (dict, list)):
+            response = jsonify(payload)
+            response.status_code = status
+            return response
+        return current_app.response_class(
+            _dump(payload), status=status, mimetype=current_app.json.mimetype
+        )
+    
+    @staticmethod
+    def success(data: Any = None, message: str = "Success", status_code: int = 200) -> Tuple[Response, int]:
         """
         Erfolgreiche Antwort
         
@@ -24,18 +82,18 @@ class APIResponse:
             status_code: HTTP Status Code
             
         Returns:
-            Tuple (response_dict, status_code)
+            Tuple (response, status_code)
         """
         response = {
             "success": True,
             "message": message,
             "data": data
         }
-        return jsonify(response), status_code
+        return APIResponse._raw(response, status_code), status_code
     
     @staticmethod
     def error(message: str, error_code: str = "UNKNOWN_ERROR", 
-              status_code: int = 400, details: Optional[Dict] = None) -> Tuple[Dict, int]:
+              status_code: int = 400, details: Optional[Dict] = None) -> Tuple[Response, int]:
         """
         Fehler-Antwort
         
@@ -46,25 +104,27 @@ class APIResponse:
             details: Zusätzliche Fehler-Details
             
         Returns:
-            Tuple (response_dict, status_code)
+            Tuple (response, status_code)
         """
-        response = {
-            "success": False,
-            "error": {
-                "code": error_code,
-                "message": message
-            }
+        error: Dict[str, Any] = {
+            "code": error_code,
+            "message": message
         }
         
         if details:
-            response["error"]["details"] = details
+            error["details"] = details
+        
+        response = {
+            "success": False,
+            "error": error
+        }
             
         logger.error(f"API Error {error_code}: {message}")
-        return jsonify(response), status_code
+        return APIResponse._raw(response, status_code), status_code
     
     @staticmethod
     def paginated(data: list, total: int, page: int = 1, 
-                  page_size: int = 20, message: str = "Success") -> Tuple[Dict, int]:
+                  page_size: int = 20, message: str = "Success") -> Tuple[Response, int]:
         """
         Paginierte Antwort
         
@@ -76,28 +136,53 @@ class APIResponse:
             message: Erfolgs-Nachricht
             
         Returns:
-            Tuple (response_dict, status_code)
+            Tuple (response, status_code)
         """
-        total_pages = (total + page_size - 1) // page_size
-        
         response = {
             "success": True,
             "message": message,
             "data": data,
-            "pagination": {
-                "page": page,
-                "page_size": page_size,
-                "total": total,
-                "total_pages": total_pages,
-                "has_next": page < total_pages,
-                "has_prev": page > 1
-            }
+            "pagination": _pagination(total, page, page_size)
         }
-        return jsonify(response), 200
+        return APIResponse._raw(response, 200), 200
+    
+    @staticmethod
+    def streamed(rows: Iterable[Any], total: int, page: int = 1,
+                 page_size: int = 20, message: str = "Success") -> Tuple[Any, int]:
+        """
+        Paginierte Antwort als NDJSON-Stream (für große Seiten)
+        
+        Erste Zeile enthält success/message/pagination, danach ein Objekt pro Zeile.
+        Zeilen werden einzeln serialisiert und gesendet.
+        
+        Args:
+            rows: Iterator über die Einträge der Seite
+            total: Gesamtanzahl der Einträge
+            page: Aktuelle Seite
+            page_size: Einträge pro Seite
+            message: Erfolgs-Nachricht
+            
+        Returns:
+            Tuple (streaming_response, status_code)
+        """
+        header = {
+            "success": True,
+            "message": message,
+            "pagination": _pagination(total, page, page_size)
+        }
+        
+        def generate():
+            yield _dump(header) + b'\n'
+            for row in rows:
+                yield _dump(row) + b'\n'
+        
+        return current_app.response_class(
+            stream_with_context(generate()), mimetype=NDJSON_MIMETYPE
+        ), 200
     
     @staticmethod
     def created(data: Any, message: str = "Resource created", 
-                location: Optional[str] = None) -> Tuple[Dict, int]:
+                location: Optional[str] = None) -> Tuple[Response, int]:
         """
         Resource erfolgreich erstellt (201 Created)
         
@@ -107,7 +192,7 @@ class APIResponse:
             location: URL der neuen Resource
             
         Returns:
-            Tuple (response_dict, status_code)
+            Tuple (response, status_code)
         """
         response, _ = APIResponse.success(data, message, 201)
         
@@ -127,11 +212,12 @@ class APIResponse:
         Returns:
             Tuple (empty_string, 204)
         """
-        logger.info(message)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(message)
         return '', 204
     
     @staticmethod
-    def not_found(resource: str = "Resource", resource_id: Any = None) -> Tuple[Dict, int]:
+    def not_found(resource: str = "Resource", resource_id: Any = None) -> Tuple[Response, int]:
         """
         Resource nicht gefunden (404)
         
@@ -140,7 +226,7 @@ class APIResponse:
             resource_id: ID der gesuchten Resource
             
         Returns:
-            Tuple (response_dict, 404)
+            Tuple (response, 404)
         """
         message = f"{resource} not found"
         if resource_id:
@@ -153,7 +239,7 @@ class APIResponse:
         )
     
     @staticmethod
-    def unauthorized(message: str = "Authentication required") -> Tuple[Dict, int]:
+    def unauthorized(message: str = "Authentication required") -> Tuple[Response, int]:
         """
         Nicht authentifiziert (401)
         """
@@ -164,7 +250,7 @@ class APIResponse:
         )
     
     @staticmethod
-    def forbidden(message: str = "Access denied") -> Tuple[Dict, int]:
+    def forbidden(message: str = "Access denied") -> Tuple[Response, int]:
         """
         Keine Berechtigung (403)
         """
@@ -176,7 +262,7 @@ class APIResponse:
     
     @staticmethod
     def validation_error(errors: Dict[str, list], 
-                        message: str = "Validation failed") -> Tuple[Dict, int]:
+                        message: str = "Validation failed") -> Tuple[Response, int]:
         """
         Validierungs-Fehler (422)
         
@@ -185,7 +271,7 @@ class APIResponse:
             message: Haupt-Fehlermeldung
             
         Returns:
-            Tuple (response_dict, 422)
+            Tuple (response, 422)
         """
         return APIResponse.error(
             message=message,
@@ -196,7 +282,7 @@ class APIResponse:
     
     @staticmethod
     def server_error(message: str = "Internal server error", 
-                    exception: Optional[Exception] = None) -> Tuple[Dict, int]:
+                    exception: Optional[Exception] = None) -> Tuple[Response, int]:
         """
         Server-Fehler (500)
         
@@ -205,7 +291,7 @@ class APIResponse:
             exception: Original-Exception (für Logging)
             
         Returns:
-            Tuple (response_dict, 500)
+            Tuple (response, 500)
         """
         if exception:
             logger.exception(f"Server Error: {exception}")
@@ -1,14 +1,119 @@
 """
 Audit Log Helper
+Events werden gepuffert und im Hintergrund gebündelt geschrieben
 """
 from flask_login import current_user
+import atexit
 import logging
+import queue
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+
+class AuditQueue:
+    """
+    Puffert Audit-Events und schreibt sie batchweise (ein executemany pro Batch)
+
+    Bei vollem Puffer wird das älteste Event verworfen.
+    """
+
+    BATCH_SIZE = 128
+    FLUSH_INTERVAL = 0.1  # Sekunden
+
+    def __init__(self, maxsize: int = 10000):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._db = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def put(self, db, row: tuple):
+        """
+        Reiht ein Event ein (blockiert nie)
+
+        Args:
+            db: Database-Instanz zum Schreiben
+            row: (user_id, action, resource_id, details, timestamp)
+        """
+        self._db = db
+        self._ensure_started()
+
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # drop_oldest
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+            except queue.Empty:
+                pass
+            logger.warning("⚠️ Audit-Puffer voll, ältestes Event verworfen")
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                pass
+
+    def flush(self):
+        """Schreibt alle gepufferten Events (z.B. beim Shutdown)"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.BATCH_SIZE:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+        # Auf Batch warten, den der Worker gerade sammelt/schreibt
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while len(batch) < self.BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch: list):
+        try:
+            with self._write_lock:
+                if self._db:
+                    self._db.log_audit_events_bulk(batch)
+        except Exception as e:
+            logger.error(f"Fehler beim Audit-Logging: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+
+_audit_queue = AuditQueue()
+atexit.register(_audit_queue.flush)
+
+
 def log_action(db, action: str, resource_id: str = None, details: dict = None):
     """
-    Loggt eine Benutzeraktion
+    Loggt eine Benutzeraktion (asynchron, gebündelt)
     """
     try:
         user_id = 'system'
@@ -18,9 +123,9 @@ def log_action(db, action: str, resource_id: str = None, details: dict = None):
         except (AttributeError, RuntimeError) as e:
             logger.debug(f"Current user nicht verfügbar: {e}")
             pass
-            
+
         if db:
-            db.log_audit_event(user_id, action, resource_id, details)
-            
+            _audit_queue.put(db, (user_id, action, resource_id, details, time.time()))
+
     except Exception as e:
         logger.error(f"Fehler beim Audit-Logging: {e}")
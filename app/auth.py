@@ -3,20 +3,26 @@ Authentication Module
 Handhabt User-Login und Session-Management mit sicherem Passwort-Hashing
 """
 
+import hmac
 import logging
 import os
-from flask import Blueprint, request, jsonify, session, current_app, redirect
+from flask import Blueprint, request, jsonify, current_app, redirect
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
-import yaml
+from werkzeug.security import check_password_hash
+from app.config_cache import get_config
 
 logger = logging.getLogger(__name__)
 
 auth_bp = Blueprint('auth', __name__)
 login_manager = LoginManager()
 
+# Werkzeug-Hash-Präfixe
+_HASH_PREFIXES = ('pbkdf2:', 'scrypt:', 'bcrypt:')
+
 # Einfache User-Klasse
 class User(UserMixin):
+    __slots__ = ('id',)
+
     def __init__(self, id):
         self.id = id
 
@@ -29,9 +35,8 @@ def init_auth(app, config_path='config.yaml'):
     """Initialisiert Auth für die App"""
     logger.info("Initialisiere Authentifizierung...")
     
-    # Lade Config
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+    # Lade Config (einmal pro Prozess geparst)
+    config = get_config(config_path)
     
     # Secret Key aus ENV oder Config
     secret_key = os.getenv('SECRET_KEY') or config['web'].get('secret_key')
@@ -41,6 +46,7 @@ def init_auth(app, config_path='config.yaml'):
     
     # Lade User-Daten (unterstützt sowohl Klartext als auch gehashte Passwörter)
     app.config['AUTH_USERS'] = config.get('auth', {}).get('users', {})
+    app.config['AUTH_USERS_PARSED'] = _parse_users(app.config['AUTH_USERS'])
     
     login_manager.init_app(app)
 
@@ -50,25 +56,46 @@ def init_auth(app, config_path='config.yaml'):
             return jsonify({'error': 'Unauthorized'}), 401
         return redirect('/login.html')
 
-def _check_password(stored_password: str, provided_password: str) -> bool:
+def _parse_users(users: dict) -> dict:
+    """
+    Bestimmt einmalig, welche Passwörter gehasht sind
+    
+    Args:
+        users: {username: passwort_oder_hash}
+        
+    Returns:
+        {username: (is_hashed, passwort_oder_hash)}
+    """
+    parsed = {}
+    plaintext_users = []
+    for username, stored_password in (users or {}).items():
+        stored_password = str(stored_password)
+        is_hashed = stored_password.startswith(_HASH_PREFIXES)
+        if not is_hashed:
+            plaintext_users.append(username)
+        parsed[username] = (is_hashed, stored_password)
+    
+    if plaintext_users:
+        logger.warning(f"⚠️  Legacy Klartext-Passwörter für: {', '.join(plaintext_users)}! Bitte zu gehashten Passwörtern migrieren!")
+    
+    return parsed
+
+def _verify_password(entry: tuple, provided_password: str) -> bool:
     """
-    Prüft Passwort - unterstützt sowohl Klartext (Legacy) als auch Hashes
+    Prüft Passwort gegen vorab geparsten User-Eintrag
     
     Args:
-        stored_password: Gespeichertes Passwort (Klartext oder Hash)
+        entry: (is_hashed, passwort_oder_hash) aus _parse_users()
         provided_password: Vom User eingegebenes Passwort
         
     Returns:
         True wenn Passwort korrekt
     """
-    # Wenn gespeichertes Passwort mit werkzeug-Hash-Prefix beginnt
-    if stored_password.startswith(('pbkdf2:', 'scrypt:', 'bcrypt:')):
-        # Verwende sichere Hash-Prüfung
+    is_hashed, stored_password = entry
+    if is_hashed:
         return check_password_hash(stored_password, provided_password)
-    else:
-        # Legacy: Klartext-Vergleich
-        logger.warning("⚠️  Legacy Klartext-Passwort verwendet! Bitte zu gehashten Passwörtern migrieren!")
-        return stored_password == provided_password
+    # Legacy: Klartext-Vergleich (zeitkonstant)
+    return hmac.compare_digest(stored_password.encode('utf-8'), provided_password.encode('utf-8'))
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
@@ -80,12 +107,13 @@ def login():
     if not username or not password:
         return jsonify({'success': False, 'message': 'Username und Passwort erforderlich'}), 400
     
-    users = current_app.config.get('AUTH_USERS', {})
+    users = current_app.config.get('AUTH_USERS_PARSED')
+    if users is None:
+        users = _parse_users(current_app.config.get('AUTH_USERS', {}))
+        current_app.config['AUTH_USERS_PARSED'] = users
     
     if username in users:
-        stored_password = users[username]
-        
-        if _check_password(stored_password, password):
+        if _verify_password(users[username], password):
             user = User(username)
             login_user(user)
             logger.info(f"✅ Login erfolgreich: {username}")
@@ -5,11 +5,26 @@ Generiert automatisch Tags basierend auf Dokumenteninhalt und Regeln
 
 import logging
 import re
+import numpy as np
 import yaml
-from typing import List, Dict
+from typing import Any, Dict, List, Optional, Set
+
+from app.config_cache import get_config
+from app._tagger_kernel import NUMBA_AVAILABLE, encode_strings, match_keywords
 
 logger = logging.getLogger(__name__)
 
+# Try to import Aho-Corasick automaton (C extension)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    logger.warning("⚠️ pyahocorasick not available, using Python keyword scan")
+
+# Einmal kompiliert statt pro Aufruf
+_YEAR_RE = re.compile(r'20\d{2}')
+
 class AutoTagger:
     def __init__(self, config_path: str = 'config.yaml'):
         self.rules = {
@@ -22,27 +37,96 @@ class AutoTagger:
             'gesundheit': ['arzt', 'apotheke', 'krankenkasse', 'rezept'],
             'reise': ['bahn', 'flug', 'hotel', 'ticket', 'buchung']
         }
-        
-    def generate_tags(self, text: str, category: str, metadata: Dict = None) -> List[str]:
+
+        # Optionale Regeln aus config.yaml (auto_tagging.rules) ergänzen/überschreiben
+        try:
+            config = get_config(config_path)
+        except FileNotFoundError:
+            config = {}
+        except yaml.YAMLError as e:
+            logger.error(f"Ungültige Config {config_path}, nutze Standard-Regeln: {e}")
+            config = {}
+        # 'auto_tagging:' ohne Inhalt oder 'rules:' ohne Inhalt parsen zu None
+        custom_rules = (config.get('auto_tagging') or {}).get('rules') or {}
+        self.rules.update({tag: [kw.lower() for kw in (kws or []) if kw] for tag, kws in custom_rules.items()})
+
+        # Alle Keywords in einen Automaten -> ein Durchlauf über den Text
+        self._automaton: Optional[Any] = None
+        if AHOCORASICK_AVAILABLE:
+            # Ein Keyword kann mehreren Tags gehören -> alle Tags als Tupel speichern
+            keyword_tags: Dict[str, List[str]] = {}
+            for tag, keywords in self.rules.items():
+                for kw in keywords:
+                    keyword_tags.setdefault(kw, []).append(tag)
+            self._automaton = ahocorasick.Automaton()
+            for kw, kw_tags in keyword_tags.items():
+                self._automaton.add_word(kw, tuple(kw_tags))
+            self._automaton.make_automaton()
+
+        # Keywords für den Batch-Kernel vorkodieren (einmalig)
+        self._tag_names = list(self.rules)
+        keywords = [kw for kws in self.rules.values() for kw in kws]
+        self._kw_buf, self._kw_offsets = encode_strings(keywords)
+        self._kw_tags = np.array(
+            [i for i, kws in enumerate(self.rules.values()) for _ in kws],
+            dtype=np.int64
+        )
+
+    def generate_tags(self, text: str, category: str, metadata: Optional[Dict] = None) -> List[str]:
         """
         Generiert Tags für einen Text
         """
-        tags = set()
+        tags: Set[str] = set()
         text_lower = text.lower()
         metadata = metadata or {}
-        
+
         # 1. Regel-basierte Tags
-        for tag, keywords in self.rules.items():
-            if any(kw in text_lower for kw in keywords):
-                tags.add(tag)
-                
+        if self._automaton is not None:
+            for _, kw_tags in self._automaton.iter(text_lower):
+                tags.update(kw_tags)
+        else:
+            for tag, keywords in self.rules.items():
+                if any(kw in text_lower for kw in keywords):
+                    tags.add(tag)
+
         # 2. Kategorie-Tag
         if category:
             tags.add(f"cat:{category.lower()}")
-            
+
         # 3. Jahres-Tag (aus Text)
-        years = re.findall(r'20\d{2}', text)
-        for year in years:
+        for year in set(_YEAR_RE.findall(text)):
             tags.add(f"year:{year}")
-            
+
         return list(tags)
+
+    def generate_tags_batch(self, texts: List[str], categories: List[str]) -> List[List[str]]:
+        """
+        Generiert Tags für viele Texte auf einmal (Bulk-Import)
+
+        Args:
+            texts: Dokumenttexte
+            categories: Kategorie je Text
+
+        Returns:
+            Tag-Liste je Text (gleiche Reihenfolge)
+        """
+        if not NUMBA_AVAILABLE:
+            return [self.generate_tags(text, cat) for text, cat in zip(texts, categories)]
+
+        text_buf, text_offsets = encode_strings([t.lower() for t in texts])
+        matches = match_keywords(
+            text_buf, text_offsets,
+            self._kw_buf, self._kw_offsets, self._kw_tags,
+            len(self._tag_names)
+        )
+
+        results = []
+        for row, text, category in zip(matches, texts, categories):
+            tags = {self._tag_names[i] for i in np.flatnonzero(row)}
+            if category:
+                tags.add(f"cat:{category.lower()}")
+            for year in set(_YEAR_RE.findall(text)):
+                tags.add(f"year:{year}")
+            results.append(list(tags))
+
+        return results
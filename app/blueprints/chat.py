@@ -5,12 +5,25 @@ Async & Pydantic Modernized
 """
 from flask import Blueprint, jsonify, request
 import logging
-import asyncio
 from typing import Dict, Any, Tuple
 
 chat_bp = Blueprint('chat', __name__, url_prefix='/api/chat')
 logger = logging.getLogger(__name__)
 
+# Nachrichten, für die sich keine Dokumentsuche lohnt
+_GREETINGS = frozenset((
+    'hi', 'hallo', 'hey', 'moin', 'servus', 'hello', 'guten morgen', 'guten tag',
+    'guten abend', 'danke', 'danke schön', 'dankeschön', 'vielen dank', 'thanks',
+    'ok', 'okay', 'tschüss', 'bye', 'ja', 'nein'
+))
+_MIN_CONTEXT_LENGTH = 8
+
+
+def _needs_context(message: str) -> bool:
+    """Prüft ob die Nachricht eine Dokumentsuche rechtfertigt"""
+    normalized = message.strip().lower().strip('?!. ')
+    return len(normalized) >= _MIN_CONTEXT_LENGTH and normalized not in _GREETINGS
+
 
 @chat_bp.route('/', methods=['POST'])
 async def chat() -> Tuple[Dict[str, Any], int]:
@@ -19,9 +32,7 @@ async def chat() -> Tuple[Dict[str, Any], int]:
     Chat mit Ollama LLM
     """
     try:
-        from app.ollama_client import OllamaClient
-        from app.database import Database
-        from app.search_engine import SearchEngine
+        from app.extensions import get_ollama, get_search_engine, run_io
         
         data = request.json or {}
         message = data.get('message', '')
@@ -29,10 +40,11 @@ async def chat() -> Tuple[Dict[str, Any], int]:
         if not message:
             return jsonify({'error': 'Message required'}), 400
         
-        # Initialize Ollama client (fast, just config)
-        ollama = OllamaClient()
+        # App-weiter Client (Config + HTTP-Session einmalig, Erstellung prüft Verbindung)
+        ollama = await run_io(get_ollama)
         
-        if not ollama.available:
+        # Erneut prüfen, falls Ollama inzwischen gestartet wurde
+        if not ollama.available and not await run_io(ollama.refresh):
             return jsonify({
                 'error': 'Ollama not available',
                 'response': 'Der Chatbot ist momentan nicht verfügbar. Bitte stelle sicher, dass Ollama läuft.'
@@ -40,17 +52,15 @@ async def chat() -> Tuple[Dict[str, Any], int]:
         
         # Build context from database if requested
         context = ""
-        if data.get('include_context', True):
+        if data.get('include_context', True) and _needs_context(message):
             # Run search in thread to avoid blocking event loop
             try:
+                search_engine = get_search_engine()
+
                 def get_context():
-                    db = Database()
-                    search_engine = SearchEngine()
-                    results = search_engine.semantic_search(message, limit=3)
-                    db.close()
-                    return results
+                    return search_engine.semantic_search(message, limit=3)
 
-                results = await asyncio.to_thread(get_context)
+                results = await run_io(get_context)
                 
                 if results:
                     context = "Relevante Dokumente:\n"
@@ -65,7 +75,7 @@ async def chat() -> Tuple[Dict[str, Any], int]:
         full_message = f"{context}\n\nFrage: {message}" if context else message
         
         # Run Ollama chat in thread
-        response = await asyncio.to_thread(ollama.chat, full_message)
+        response = await run_io(ollama.chat, full_message)
         
         return jsonify({
             'response': response,
@@ -84,18 +94,20 @@ async def get_status() -> Tuple[Dict[str, Any], int]:
     Ollama-Status prüfen
     """
     try:
-        from app.ollama_client import OllamaClient
+        from app.extensions import get_ollama, run_io
+        
+        ollama = await run_io(get_ollama)
         
         # Run in thread as it makes a request to Ollama
         def check_status():
-            ollama = OllamaClient()
+            ollama.refresh()
             return {
                 'available': ollama.available,
                 'url': ollama.url,
                 'models': ollama.list_models() if ollama.available else []
             }
             
-        status = await asyncio.to_thread(check_status)
+        status = await run_io(check_status)
         
         return jsonify(status), 200
         
@@ -3,90 +3,345 @@ Documents Blueprint
 API-Endpoints für Dokument-Verwaltung
 Async & Pydantic Modernized
 """
-from flask import Blueprint, jsonify, request, send_file, current_app
+from flask import Blueprint, Response, jsonify, request, send_file, stream_with_context, current_app
+from datetime import datetime, timezone
+import asyncio
+import functools
 from pathlib import Path
 import logging
-from typing import Dict, Any, Tuple
+import mimetypes
+import operator
+import os
+import re
+from urllib.parse import quote
+from typing import Dict, Any, Optional, Tuple
 from pydantic import ValidationError
+from werkzeug.wsgi import wrap_file
 
+from app import doc_cache
 from app.api_response import APIResponse, ErrorCodes
+from app.extensions import get_database, get_io_pool, run_io
 from app.schemas import DocumentResponse, DocumentUpdate
 
 documents_bp = Blueprint('documents', __name__, url_prefix='/api/documents')
 logger = logging.getLogger(__name__)
 
+# Maximale Seitengröße (JSON) bzw. für ?format=ndjson (gestreamt)
+MAX_PAGE_SIZE = 100
+MAX_STREAM_PAGE_SIZE = 1000
 
-@documents_bp.route('/', methods=['GET'])
+# 404-Body als vorgefertigte Bytes (gleiches Format wie APIResponse.not_found)
+_NOT_FOUND_TEMPLATE = (
+    b'{"success":false,"error":{"code":"NOT_FOUND","message":"Document not found (ID: %d)"}}'
+)
+
+
+def _document_not_found(doc_id: int) -> Tuple[Response, int]:
+    """404 für unbekannte Dokument-IDs ohne Dict-Aufbau und Encoder-Durchlauf"""
+    return current_app.response_class(
+        _NOT_FOUND_TEMPLATE % doc_id, status=404, mimetype=current_app.json.mimetype
+    ), 404
+
+
+# Filter-Parameter von list_documents -> search_documents/count_documents
+_YEAR_RE = re.compile(r'[12]\d{3}')
+_NO_FILTERS: Dict[str, Any] = {}
+
+
+class InvalidListQuery(ValueError):
+    """Ungültige Query-Parameter für list_documents"""
+
+    def __init__(self, fields: Dict[str, list], message: str = "Validation failed"):
+        super().__init__(message)
+        self.fields = fields
+        self.message = message
+
+
+def parse_list_query(args) -> Tuple[int, int, bool, Dict[str, Any]]:
+    """
+    Parst und validiert die Query-Parameter von GET /api/documents
+    
+    Args:
+        args: request.args
+        
+    Returns:
+        (page, page_size, stream, filter_kwargs) - ohne Filter ein geteiltes leeres Dict
+        
+    Raises:
+        InvalidListQuery: Bei ungültiger Pagination oder Jahreszahl
+    """
+    stream = args.get('format') == 'ndjson'
+    max_page_size = MAX_STREAM_PAGE_SIZE if stream else MAX_PAGE_SIZE
+    
+    try:
+        page = int(args.get('page', 1))
+    except ValueError:
+        page = 0
+    if page < 1:
+        raise InvalidListQuery({"page": ["Must be >= 1"]}, "Invalid pagination parameters")
+    
+    try:
+        page_size = int(args.get('page_size', 20))
+    except ValueError:
+        page_size = 0
+    if not 1 <= page_size <= max_page_size:
+        raise InvalidListQuery({"page_size": [f"Must be between 1 and {max_page_size}"]}, "Invalid page size")
+    
+    category = args.get('category')
+    year = args.get('year')
+    query = args.get('query')
+    if not (category or year or query):
+        return page, page_size, stream, _NO_FILTERS
+    
+    kwargs: Dict[str, Any] = {}
+    if category:
+        kwargs['category'] = category
+    if year:
+        if not _YEAR_RE.fullmatch(year):
+            raise InvalidListQuery({"year": ["Must be a valid year"]})
+        kwargs['year'] = int(year)
+    if query:
+        kwargs['query'] = query
+    return page, page_size, stream, kwargs
+
+
+# Felder von DocumentResponse (einmal beim Import ermittelt)
+_RESPONSE_FIELDS = tuple(DocumentResponse.model_fields)
+
+
+def dump_document(document: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Formt ein Dokument-Dict aus der DB wie DocumentResponse.model_dump()
+    
+    Ohne Pydantic-Validierung - die Daten kommen aus Database._doc_to_dict.
+    Eingaben (DocumentUpdate) werden weiterhin validiert.
+    """
+    return {k: document[k] for k in _RESPONSE_FIELDS if k in document}
+
+
+# Felder der Listenansicht (ohne full_text/OCR-Metriken), Projektion per itemgetter
+LIST_FIELDS = (
+    'id', 'filename', 'filepath', 'category', 'subcategory', 'date_document',
+    'date_added', 'summary', 'keywords', 'amount', 'currency', 'tags'
+)
+_project_list_fields = operator.itemgetter(*LIST_FIELDS)
+
+# Blockgröße für gestreamte Downloads
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _safe_unlink(filepath: str) -> None:
+    """Löscht eine Datei, fehlende Dateien gelten als gelöscht"""
+    try:
+        os.unlink(filepath)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not delete file {filepath}: {e}")
+
+
+def _guess_mimetype(download_name: str) -> str:
+    """MIME-Typ aus dem Dateinamen (Fallback: Binärdaten)"""
+    return mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+
+
+def _set_attachment(response: Response, download_name: str) -> None:
+    """Setzt Content-Disposition: attachment (Umlaute nach RFC 2231 wie send_file)"""
+    try:
+        download_name.encode('ascii')
+        response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+    except UnicodeEncodeError:
+        response.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(download_name)}"
+
+
+def _accel_redirect(filepath: str, download_name: str) -> Optional[Response]:
+    """
+    Überlässt die Übertragung dem Reverse-Proxy (nginx X-Accel-Redirect)
+    
+    Aktiv wenn X_ACCEL_REDIRECT_PREFIX gesetzt ist. Die Datei muss unter
+    X_ACCEL_REDIRECT_ROOT liegen, nginx mappt den Prefix intern darauf:
+    
+        location /_protected/ { internal; alias /app/data/; }
+    
+    Args:
+        filepath: Pfad zur Datei
+        download_name: Dateiname für Content-Disposition
+        
+    Returns:
+        Leere Response mit X-Accel-Redirect, None wenn nicht konfiguriert
+    """
+    prefix = current_app.config.get('X_ACCEL_REDIRECT_PREFIX')
+    if not prefix:
+        return None
+    
+    root = Path(current_app.config.get('X_ACCEL_REDIRECT_ROOT', 'data')).resolve()
+    try:
+        relative = Path(filepath).resolve().relative_to(root)
+    except ValueError:
+        logger.warning(f"{filepath} liegt nicht unter {root} - Download wird gestreamt")
+        return None
+    
+    response = Response(status=200, mimetype=_guess_mimetype(download_name))
+    response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(relative.as_posix())
+    _set_attachment(response, download_name)
+    return response
+
+
+def _iter_file(filepath: str, start: int, length: int):
+    """Liest length Bytes ab start in DOWNLOAD_CHUNK_SIZE-Blöcken"""
+    with open(filepath, 'rb', buffering=0) as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(DOWNLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _file_validators(st: os.stat_result) -> Tuple[str, datetime]:
+    """ETag (mtime + Größe) und Last-Modified (sekundengenau) für eine Datei"""
+    etag = f"{st.st_mtime_ns:x}-{st.st_size:x}"
+    last_modified = datetime.fromtimestamp(int(st.st_mtime), tz=timezone.utc)
+    return etag, last_modified
+
+
+def _not_modified(etag: str, last_modified: datetime) -> bool:
+    """If-None-Match / If-Modified-Since (If-None-Match hat Vorrang, RFC 9110)"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return since is not None and last_modified <= since
+
+
+def _range_applies(etag: str, last_modified: datetime) -> bool:
+    """Range nur auswerten wenn If-Range fehlt oder noch passt"""
+    if_range = request.if_range
+    if if_range.etag is not None:
+        return if_range.etag == etag
+    if if_range.date is not None:
+        return last_modified <= if_range.date
+    return True
+
+
+def _stream_file(filepath: str, download_name: str, st: os.stat_result) -> Response:
+    """
+    Gestreamter Download mit Range-Support (206 Partial Content)
+    
+    Beantwortet If-None-Match/If-Modified-Since mit 304 ohne die Datei zu öffnen.
+    Vollständige Dateien gehen über wsgi.file_wrapper (sendfile), Teilbereiche
+    über einen Generator.
+    
+    Args:
+        filepath: Pfad zur Datei
+        download_name: Dateiname für Content-Disposition
+        st: Bereits ermitteltes os.stat(filepath)
+        
+    Returns:
+        Response mit Generator-Body (Speicher O(Chunk) statt O(Datei))
+    """
+    size = st.st_size
+    etag, last_modified = _file_validators(st)
+    
+    if _not_modified(etag, last_modified):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        return response
+    
+    start, stop, status = 0, size, 200
+    
+    # Nur einzelne Bereiche (bytes=a-b), Multipart-Ranges -> volle Datei
+    if (request.range is not None and len(request.range.ranges) == 1
+            and _range_applies(etag, last_modified)):
+        byte_range = request.range.range_for_length(size)
+        if byte_range is None:
+            response = Response(status=416)
+            response.headers['Content-Range'] = f'bytes */{size}'
+            return response
+        start, stop = byte_range
+        status = 206
+    
+    if status == 200:
+        # Ganze Datei über wsgi.file_wrapper -> gunicorn nutzt sendfile(2) (Zero-Copy)
+        body = wrap_file(request.environ, open(filepath, 'rb'), buffer_size=DOWNLOAD_CHUNK_SIZE)
+    else:
+        body = stream_with_context(_iter_file(filepath, start, stop - start))
+    response = Response(
+        body,
+        status=status,
+        mimetype=_guess_mimetype(download_name),
+        direct_passthrough=True
+    )
+    _set_attachment(response, download_name)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.headers['Content-Length'] = str(stop - start)
+    response.headers['Accept-Ranges'] = 'bytes'
+    if status == 206:
+        response.headers['Content-Range'] = f'bytes {start}-{stop - 1}/{size}'
+    return response
+
+
+@documents_bp.route('/', methods=['GET'], strict_slashes=False)
 async def list_documents() -> Tuple[Dict[str, Any], int]:
     """
     GET /api/documents
     Liste aller Dokumente mit optionalen Filtern
     """
     try:
-        from app.database import Database
-        
-        # Query-Parameter (modernized pagination)
-        page = int(request.args.get('page', 1))
-        page_size = int(request.args.get('page_size', 20))
-        category = request.args.get('category')
-        year = request.args.get('year')
-        query = request.args.get('query')
-        
-        # Validation
-        if page < 1:
-            return APIResponse.validation_error(
-                {"page": ["Must be >= 1"]},
-                "Invalid pagination parameters"
-            )
-        if page_size < 1 or page_size > 100:
-            return APIResponse.validation_error(
-                {"page_size": ["Must be between 1 and 100"]},
-                "Invalid page size"
-            )
+        try:
+            page, page_size, stream, kwargs = parse_list_query(request.args)
+        except InvalidListQuery as e:
+            return APIResponse.validation_error(e.fields, e.message)
         
-        # Calculate offset
         offset = (page - 1) * page_size
         
-        # Build filter kwargs
-        kwargs = {}
-        if category:
-            kwargs['category'] = category
-        if year:
-            try:
-                kwargs['year'] = int(year)
-            except ValueError:
-                return APIResponse.validation_error(
-                    {"year": ["Must be a valid year"]}
-                )
-        if query:
-            kwargs['query'] = query
-        
-        # Database operations (synchronous, but in async route)
-        # Ideally, we would run this in an executor if it blocks significantly
-        db = Database()
-        
-        documents = db.search_documents(
-            limit=page_size,
-            offset=offset,
-            **kwargs
-        )
+        # Fertig serialisierte Seite aus Redis (nur JSON, nicht NDJSON-Streams)
+        cache_key = None
+        if not stream:
+            cache_key, body = await run_io(doc_cache.lookup_list, request.query_string)
+            if body is not None:
+                return current_app.response_class(body, mimetype=current_app.json.mimetype), 200
         
-        total = db.count_documents(**kwargs)
+        # Blockierende DB-Abfragen parallel im io_pool statt im Event-Loop
+        db = get_database()
         
-        db.close()
+        documents, total = await asyncio.gather(
+            run_io(functools.partial(db.search_documents, limit=page_size, offset=offset, **kwargs)),
+            run_io(functools.partial(db.count_documents, **kwargs))
+        )
         
-        # Convert to Pydantic models and back to dict for consistent serialization
-        # (This ensures our response matches the schema, even if DB returns extra fields)
-        # Note: search_documents returns dicts, so we validate them
-        validated_docs = [DocumentResponse.model_validate(doc).model_dump() for doc in documents]
+        # search_documents liefert bereits schema-förmige Dicts -> nur Felder projizieren,
+        # Pydantic-Prüfung nur wenn VALIDATE_RESPONSES gesetzt ist (Debug/Staging)
+        if current_app.config.get('VALIDATE_RESPONSES'):
+            for doc in documents:
+                DocumentResponse.model_validate(doc)
+        
+        documents = [dict(zip(LIST_FIELDS, _project_list_fields(doc))) for doc in documents]
+        
+        if stream:
+            # Zeilenweise serialisiert statt ein großer JSON-Body
+            return APIResponse.streamed(
+                documents,
+                total=total,
+                page=page,
+                page_size=page_size,
+                message="Documents retrieved successfully"
+            )
         
-        return APIResponse.paginated(
-            data=validated_docs,
+        response, status = APIResponse.paginated(
+            data=documents,
             total=total,
             page=page,
             page_size=page_size,
             message="Documents retrieved successfully"
         )
+        if cache_key is not None:
+            await run_io(doc_cache.store_list, cache_key, response.get_data())
+        return response, status
         
     except ValidationError as e:
         return APIResponse.validation_error(
@@ -108,23 +363,27 @@ async def get_document(doc_id: int) -> Tuple[Dict[str, Any], int]:
     Einzelnes Dokument abrufen
     """
     try:
-        from app.database import Database
-        
-        db = Database()
-        document = db.get_document(doc_id)
-        db.close()
+        db = get_database()
+        document = await run_io(doc_cache.get_document, db, doc_id)
         
         if not document:
-            return APIResponse.not_found("Document", doc_id)
+            return _document_not_found(doc_id)
         
-        # Validate with Pydantic
-        validated_doc = DocumentResponse.model_validate(document).model_dump()
+        # Vertrauenswürdige DB-Daten nur auf die Schema-Felder reduzieren (Validierung optional)
+        if current_app.config.get('VALIDATE_RESPONSES'):
+            DocumentResponse.model_validate(document)
         
-        return APIResponse.success(
-            data=validated_doc,
+        response, _ = APIResponse.success(
+            data=dump_document(document),
             message="Document retrieved successfully"
         )
         
+        # ETag über den Body -> 304 ohne erneute Übertragung bei unverändertem Dokument
+        response.add_etag()
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.make_conditional(request)
+        return response, response.status_code
+        
     except Exception as e:
         logger.error(f"Error getting document {doc_id}: {e}")
         return APIResponse.server_error(
@@ -140,24 +399,31 @@ async def download_document(doc_id: int):
     Dokument herunterladen
     """
     try:
-        from app.database import Database
-        
-        db = Database()
-        document = db.get_document(doc_id)
-        db.close()
+        db = get_database()
+        document = await run_io(doc_cache.get_document, db, doc_id)
         
         if not document:
-            return jsonify({'error': 'Document not found'}), 404
+            return _document_not_found(doc_id)
         
         filepath = document.get('filepath')
-        if not filepath or not Path(filepath).exists():
+        if not filepath:
+            return jsonify({'error': 'File not found'}), 404
+        # Ein stat() für Existenz, ETag und Content-Length
+        try:
+            st = await run_io(os.stat, filepath)
+        except FileNotFoundError:
             return jsonify({'error': 'File not found'}), 404
         
-        return send_file(
-            filepath,
-            as_attachment=True,
-            download_name=document.get('filename', 'document.pdf')
-        )
+        download_name = document.get('filename', 'document.pdf')
+        
+        # Übertragung an nginx (X-Accel-Redirect) bzw. Apache (X-Sendfile) abgeben
+        response = _accel_redirect(filepath, download_name)
+        if response is not None:
+            return response
+        if current_app.config.get('USE_X_SENDFILE'):
+            return send_file(filepath, as_attachment=True, download_name=download_name, conditional=True)
+        
+        return _stream_file(filepath, download_name, st)
         
     except Exception as e:
         logger.error(f"Error downloading document {doc_id}: {e}")
@@ -171,28 +437,16 @@ async def delete_document(doc_id: int) -> Tuple[Dict[str, Any], int]:
     Dokument löschen
     """
     try:
-        from app.database import Database
-        
-        db = Database()
+        db = get_database()
         
-        # Get document to delete file
-        document = db.get_document(doc_id)
-        if not document:
-            db.close()
-            return APIResponse.not_found("Document", doc_id)
+        # SELECT + DELETE in einem Statement (DELETE ... RETURNING)
+        row = await run_io(db.delete_returning, doc_id)
+        if not row:
+            return _document_not_found(doc_id)
         
-        # Delete from database
-        db.delete_document(doc_id)
-        
-        # Delete file (optional)
-        filepath = document.get('filepath')
-        if filepath and Path(filepath).exists():
-            try:
-                Path(filepath).unlink()
-            except Exception as e:
-                logger.warning(f"Could not delete file {filepath}: {e}")
-        
-        db.close()
+        # Datei im Hintergrund löschen - Response wartet nicht auf das Dateisystem
+        if row['filepath']:
+            get_io_pool().submit(_safe_unlink, row['filepath'])
         
         return APIResponse.no_content("Document deleted successfully")
         
@@ -220,24 +474,13 @@ async def update_document(doc_id: int) -> Tuple[Dict[str, Any], int]:
                 "Validation failed"
             )
 
-        from app.database import Database
-        
-        db = Database()
+        db = get_database()
         
-        # Check if document exists
-        document = db.get_document(doc_id)
+        # Existenzprüfung, Update und Rückgabe in einem Statement (UPDATE ... RETURNING)
+        document = await run_io(db.update_returning, doc_id, update_data.model_dump(exclude_unset=True))
         if not document:
-            db.close()
-            return APIResponse.not_found("Document", doc_id)
-        
-        # Update document logic (assuming db has update method, or we implement it)
-        # For now, we just log it as the original code did not implement update fully
-        # In a real implementation: db.update_document(doc_id, update_data.model_dump(exclude_unset=True))
-        
-        db.close()
+            return _document_not_found(doc_id)
         
-        # Return updated document (mocked for now as we didn't change DB)
-        # In real world, fetch again
         return APIResponse.success(
             data=document,
             message="Document updated successfully"
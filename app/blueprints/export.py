@@ -1,28 +1,119 @@
 """
 Export Blueprint
-API-Endpoints für Daten-Export (Excel, PDF)
-Async & Pydantic Modernized
+API-Endpoints für Daten-Export (Excel, PDF, CSV, Parquet)
+
+Synchrone Views: unter WSGI (gunicorn sync/gthread) würde Flask jede
+async-View per async_to_sync mit eigenem Event-Loop ausführen - reiner
+Overhead. Lange Exporte laufen über ?async=true in Celery.
 """
-from flask import Blueprint, jsonify, request, send_file
+from flask import Blueprint, Response, jsonify, request, send_file
 from pathlib import Path
+from tempfile import SpooledTemporaryFile
+import itertools
 import logging
-import asyncio
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, BinaryIO, Iterable, Iterator, Optional, Tuple
+
+import pandas as pd
+
+from app.data_extractor import DataExtractor
+from app.exporters import DataExporter
+from app.extensions import get_data_extractor
+
+# Try to import PyArrow (C++ CSV-/Parquet-Writer, multi-threaded)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 export_bp = Blueprint('export', __name__, url_prefix='/api/export')
 logger = logging.getLogger(__name__)
 
+# DataExporter hat keinen Zustand - eine Instanz für alle Requests
+_exporter = DataExporter()
+
+# Exporte bis zu dieser Größe im RAM, darüber als Temp-Datei
+EXPORT_SPOOL_SIZE = 8 * 1024 * 1024
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+PARQUET_MIMETYPE = 'application/vnd.apache.parquet'
+
+
+def _arrow_csv(chunk: pd.DataFrame, header: bool) -> bytes:
+    """Serialisiert einen Daten-Block mit PyArrow als UTF-8 CSV"""
+    table = pa.Table.from_pandas(chunk, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    pa_csv.write_csv(
+        table, sink,
+        write_options=pa_csv.WriteOptions(include_header=header, quoting_style='needed')
+    )
+    return sink.getvalue().to_pybytes()
+
+
+def _objects_as_text(chunk: pd.DataFrame) -> pd.DataFrame:
+    """object-Spalten mit gemischten Typen als Text (fehlende Werte bleiben leer)"""
+    columns = chunk.select_dtypes(include='object').columns
+    return chunk.astype({col: str for col in columns}).where(chunk.notna(), None)
+
+
+def _csv_chunks(chunks: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """
+    Serialisiert die Daten-Blöcke eines Exports als UTF-8 CSV (erster mit Kopfzeile)
+    
+    PyArrow oder pandas wird einmal pro Export am ersten Block gewählt -
+    Quoting und Datumsformat unterscheiden sich, eine Datei mischt sie nicht.
+    Scheitert PyArrow erst an einem späteren Block (gemischte Typen in
+    object-Spalten), gehen dessen object-Spalten als Text an PyArrow.
+    """
+    use_arrow = PYARROW_AVAILABLE
+    header = True
+    for chunk in chunks:
+        if use_arrow:
+            try:
+                data = _arrow_csv(chunk, header)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+                if header:
+                    logger.debug(f"PyArrow CSV fallback: {e}")
+                    use_arrow = False
+                    data = chunk.to_csv(index=False, header=True).encode('utf-8')
+                else:
+                    data = _arrow_csv(_objects_as_text(chunk), header)
+        else:
+            data = chunk.to_csv(index=False, header=header).encode('utf-8')
+        header = False
+        yield data
+
+
+def write_excel_export(
+    extractor: DataExtractor, category: str, year: int, month: Optional[int], output: BinaryIO
+) -> bool:
+    """
+    Schreibt den Excel-Export eines Jahres (optional eines Monats) nach output
+    
+    Blockweise lesen und zeilenweise schreiben (constant_memory). Wird vom
+    Endpoint und vom Celery-Task (app.tasks.export_excel_async) genutzt.
+    
+    Returns:
+        False wenn keine Daten vorhanden sind
+    """
+    chunks = extractor.iter_year_data(category, year, month=month)
+    if chunks is None:
+        return False
+    return _exporter.write_excel_chunks(chunks, output)
+
 
 @export_bp.route('/excel', methods=['POST'])
-async def export_excel() -> Any:
+def export_excel() -> Any:
     """
     POST /api/export/excel
     Daten als Excel exportieren
+    
+    Mit ?async=true läuft der Export als Celery-Task: Antwort 202 mit job_id,
+    Abfrage über /api/export/status/<job_id> und /api/export/result/<job_id>.
     """
     try:
-        from app.exporters import DataExporter
-        from app.data_extractor import DataExtractor
-        
         data = request.json or {}
         category = data.get('category', 'Rechnung')
         year = data.get('year')
@@ -31,40 +122,39 @@ async def export_excel() -> Any:
         if not year:
             return jsonify({'error': 'Year required'}), 400
         
-        # Run export logic in thread
-        def run_export():
-            # Get data
-            extractor = DataExtractor()
-            df = extractor.get_year_data(category, int(year))
-            
-            if df is None or df.empty:
-                return None
-            
-            # Filter by month if specified
-            if month and 'date' in df.columns:
-                df = df[df['date'].dt.month == int(month)]
-            
-            # Export
-            exporter = DataExporter()
-            export_path = exporter.export_to_excel(
-                df,
-                filename=f"{category}_{year}_{month if month else 'all'}.xlsx"
-            )
-            return export_path
-
-        export_path = await asyncio.to_thread(run_export)
-        
-        if export_path is None:
-             return jsonify({'error': 'No data found'}), 404
-        
-        if not export_path or not Path(export_path).exists():
-            return jsonify({'error': 'Export failed'}), 500
+        month = int(month) if month else None
+        
+        # Versuche Async (Celery)
+        if request.args.get('async', 'false').lower() == 'true':
+            try:
+                from app.tasks import export_excel_async
+                # retry=False: ohne erreichbaren Broker sofort synchron exportieren,
+                # statt den Request in Kombus Publish-Retries hängen zu lassen
+                task = export_excel_async.apply_async((category, int(year), month), retry=False)
+                return jsonify({
+                    'success': True,
+                    'status': 'processing_async',
+                    'job_id': task.id
+                }), 202
+            except ImportError:
+                logger.warning("Celery nicht verfügbar, Fallback auf synchron")
+            except Exception as e:
+                logger.error(f"Async Start fehlgeschlagen: {e}")
+        
+        extractor = get_data_extractor()
+        
+        # Ergebnis bis EXPORT_SPOOL_SIZE im RAM, darüber in einer Temp-Datei
+        output = SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+        if not write_excel_export(extractor, category, int(year), month, output):
+            output.close()
+            return jsonify({'error': 'No data found'}), 404
+        output.seek(0)
         
         return send_file(
-            export_path,
+            output,
             as_attachment=True,
             download_name=f"{category}_{year}.xlsx",
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            mimetype=XLSX_MIMETYPE
         )
         
     except Exception as e:
@@ -72,51 +162,92 @@ async def export_excel() -> Any:
         return jsonify({'error': str(e)}), 500
 
 
+@export_bp.route('/status/<job_id>', methods=['GET'])
+def export_status(job_id: str) -> Any:
+    """
+    GET /api/export/status/<job_id>
+    Status eines Hintergrund-Exports
+    """
+    try:
+        from app.celery_app import celery_app
+    except ImportError:
+        return jsonify({'error': 'Async export not available'}), 501
+    
+    result = celery_app.AsyncResult(job_id)
+    payload: Dict[str, Any] = {'job_id': job_id, 'status': result.state.lower()}
+    
+    if result.successful():
+        info = result.result or {}
+        payload['status'] = info.get('status', 'error')
+        if info.get('error'):
+            payload['error'] = info['error']
+    elif result.failed():
+        payload['error'] = str(result.result)
+    
+    return jsonify(payload), 200
+
+
+@export_bp.route('/result/<job_id>', methods=['GET'])
+def export_result(job_id: str) -> Any:
+    """
+    GET /api/export/result/<job_id>
+    Fertigen Hintergrund-Export herunterladen
+    """
+    try:
+        from app.celery_app import celery_app
+    except ImportError:
+        return jsonify({'error': 'Async export not available'}), 501
+    
+    result = celery_app.AsyncResult(job_id)
+    if not result.ready():
+        return jsonify({'job_id': job_id, 'status': result.state.lower()}), 202
+    
+    info = result.result if result.successful() else None
+    if not isinstance(info, dict) or info.get('status') != 'success':
+        return jsonify({'error': 'No data found'}), 404
+    
+    path = Path(info['path'])
+    if not path.is_file():
+        # Export bereits aufgeräumt (EXPORT_MAX_AGE)
+        return jsonify({'error': 'Export expired'}), 410
+    
+    return send_file(
+        path,
+        as_attachment=True,
+        download_name=info['filename'],
+        mimetype=XLSX_MIMETYPE
+    )
+
+
 @export_bp.route('/pdf', methods=['POST'])
-async def export_pdf() -> Any:
+def export_pdf() -> Any:
     """
     POST /api/export/pdf
     Daten als PDF exportieren
     """
     try:
-        from app.exporters import DataExporter
-        from app.data_extractor import DataExtractor
-        
         data = request.json or {}
         category = data.get('category', 'Rechnung')
         year = data.get('year')
+        month = data.get('month')
         title = data.get('title', f'{category} Report {year}')
         
         if not year:
             return jsonify({'error': 'Year required'}), 400
         
-        def run_export():
-            # Get data
-            extractor = DataExtractor()
-            df = extractor.get_year_data(category, int(year))
-            
-            if df is None or df.empty:
-                return None
-            
-            # Export
-            exporter = DataExporter()
-            export_path = exporter.export_to_pdf(
-                df,
-                filename=f"{category}_{year}.pdf",
-                title=title
-            )
-            return export_path
-
-        export_path = await asyncio.to_thread(run_export)
-        
-        if export_path is None:
+        extractor = get_data_extractor()
+        
+        # Get data (Monatsfilter im DataExtractor, nicht hier)
+        df = extractor.get_year_data(category, int(year), month=int(month) if month else None)
+        
+        if df is None or df.empty:
             return jsonify({'error': 'No data found'}), 404
         
-        if not export_path or not Path(export_path).exists():
-            return jsonify({'error': 'Export failed'}), 500
+        # Export
+        output = _exporter.export_to_pdf(df.to_dict('records'), title=title)
         
         return send_file(
-            export_path,
+            output,
             as_attachment=True,
             download_name=f"{category}_{year}.pdf",
             mimetype='application/pdf'
@@ -128,48 +259,87 @@ async def export_pdf() -> Any:
 
 
 @export_bp.route('/csv', methods=['POST'])
-async def export_csv() -> Any:
+def export_csv() -> Any:
     """
     POST /api/export/csv
     Daten als CSV exportieren
     """
     try:
-        from app.data_extractor import DataExtractor
-        from io import BytesIO
+        data = request.json or {}
+        category = data.get('category', 'Rechnung')
+        year = data.get('year')
+        month = data.get('month')
+        
+        if not year:
+            return jsonify({'error': 'Year required'}), 400
+        
+        extractor = get_data_extractor()
+        
+        # Ersten Block vorab lesen (404 bei leeren Daten), Rest beim Senden
+        rest = extractor.iter_year_data(category, int(year), month=int(month) if month else None)
+        first = None
+        if rest is not None:
+            first = next((chunk for chunk in rest if not chunk.empty), None)
+        
+        if first is None:
+            return jsonify({'error': 'No data found'}), 404
+        
+        def generate():
+            # UTF-8 BOM für Excel (wie encoding='utf-8-sig')
+            yield b'\xef\xbb\xbf'
+            yield from _csv_chunks(itertools.chain((first,), rest))
+        
+        response = Response(generate(), mimetype='text/csv')
+        response.headers.set('Content-Disposition', 'attachment', filename=f"{category}_{year}.csv")
+        return response
+        
+    except Exception as e:
+        logger.error(f"Error exporting CSV: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@export_bp.route('/parquet', methods=['POST'])
+def export_parquet() -> Any:
+    """
+    POST /api/export/parquet
+    Daten als Parquet exportieren (spaltenweise, zstd-komprimiert)
+    """
+    try:
+        if not PYARROW_AVAILABLE:
+            return jsonify({'error': 'Parquet export requires pyarrow'}), 501
         
         data = request.json or {}
         category = data.get('category', 'Rechnung')
         year = data.get('year')
+        month = data.get('month')
         
         if not year:
             return jsonify({'error': 'Year required'}), 400
         
-        def run_export():
-            # Get data
-            extractor = DataExtractor()
-            df = extractor.get_year_data(category, int(year))
-            
-            if df is None or df.empty:
-                return None
-            
-            # Export
-            output = BytesIO()
-            df.to_csv(output, index=False, encoding='utf-8-sig')
-            output.seek(0)
-            return output
-
-        output = await asyncio.to_thread(run_export)
-        
-        if output is None:
+        extractor = get_data_extractor()
+        
+        # get_year_data nutzt den Jahres-Cache des DataExtractor
+        df = extractor.get_year_data(category, int(year), month=int(month) if month else None)
+        if df is None or df.empty:
             return jsonify({'error': 'No data found'}), 404
         
+        output = SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+        pq.write_table(
+            pa.Table.from_pandas(df, preserve_index=False),
+            output,
+            compression='zstd',
+            compression_level=3,
+            use_dictionary=True
+        )
+        output.seek(0)
+        
         return send_file(
             output,
             as_attachment=True,
-            download_name=f"{category}_{year}.csv",
-            mimetype='text/csv'
+            download_name=f"{category}_{year}.parquet",
+            mimetype=PARQUET_MIMETYPE
         )
         
     except Exception as e:
-        logger.error(f"Error exporting CSV: {e}")
+        logger.error(f"Error exporting Parquet: {e}")
         return jsonify({'error': str(e)}), 500
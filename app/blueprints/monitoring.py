@@ -2,20 +2,91 @@
 Monitoring Blueprint
 API-Endpoints für Health-Checks und System-Status
 """
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
+import contextvars
 import logging
 import psutil
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Dict, Any
 
+from app.extensions import get_extension
+
 monitoring_bp = Blueprint('monitoring', __name__, url_prefix='/api/monitoring')
 logger = logging.getLogger(__name__)
 
+# Gesamtbudget für alle Probes (laufen parallel, ein hängender Dienst blockiert nicht)
+HEALTH_TIMEOUT = 2.5
+# Probe-Ergebnisse so lange wiederverwenden (Monitoring pollt alle paar Sekunden)
+HEALTH_CACHE_TTL = 5
+
+# Komponente -> (Ablauf, Ergebnis)
+_health_cache: Dict[str, tuple] = {}
+
+
+def check_database() -> Dict[str, Any]:
+    from sqlalchemy import text
+    from app.db_config import engine
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+    return {'status': 'ok'}
+
+
+def check_ollama() -> Dict[str, Any]:
+    from app.extensions import get_ollama
+    ollama = get_ollama()
+    return {
+        'status': 'ok' if ollama.refresh() else 'unavailable',
+        'url': ollama.base_url
+    }
+
+
+def check_redis() -> Dict[str, Any]:
+    from app.redis_client import RedisClient
+    redis_client = RedisClient()
+    return {
+        'status': 'ok' if redis_client.enabled else 'unavailable',
+        'host': redis_client.host
+    }
+
+
+def check_disk() -> Dict[str, Any]:
+    disk = psutil.disk_usage('/')
+    return {
+        'status': 'ok' if disk.percent < 90 else 'warning',
+        'total': disk.total,
+        'used': disk.used,
+        'free': disk.free,
+        'percent': disk.percent
+    }
+
+
+# Ein Fehler in diesen Komponenten setzt den Gesamtstatus auf degraded
+_PROBES = {
+    'database': (check_database, True),
+    'ollama': (check_ollama, False),
+    'redis': (check_redis, False),
+    'disk': (check_disk, False),
+}
+
+
+def _health_pool() -> ThreadPoolExecutor:
+    return get_extension(
+        'health_pool',
+        lambda: ThreadPoolExecutor(max_workers=len(_PROBES), thread_name_prefix='health')
+    )
+
+
 @monitoring_bp.route('/health', methods=['GET'])
 def health_check() -> tuple[Dict[str, Any], int]:
     """
     GET /api/monitoring/health
     Detaillierter Health-Check aller Komponenten
+    
+    Die Probes laufen parallel - Latenz ist die des langsamsten, nicht die
+    Summe; nach HEALTH_TIMEOUT gilt eine Probe als 'timeout'. Erfolgreiche
+    Ergebnisse werden HEALTH_CACHE_TTL Sekunden wiederverwendet, ?nocache=1
+    erzwingt frische Checks.
     """
     status = {
         'status': 'ok',
@@ -23,52 +94,33 @@ def health_check() -> tuple[Dict[str, Any], int]:
         'components': {}
     }
     
-    # Check Database
-    try:
-        from app.database import Database
-        db = Database()
-        # Simple query to check connection
-        db.get_overview_stats()
-        db.close()
-        status['components']['database'] = {'status': 'ok'}
-    except Exception as e:
-        status['status'] = 'degraded'
-        status['components']['database'] = {'status': 'error', 'message': str(e)}
+    now = time.monotonic()
+    use_cache = request.args.get('nocache') not in ('1', 'true')
     
-    # Check Ollama
-    try:
-        from app.ollama_client import OllamaClient
-        ollama = OllamaClient()
-        status['components']['ollama'] = {
-            'status': 'ok' if ollama.available else 'unavailable',
-            'url': ollama.url
-        }
-    except Exception as e:
-        status['components']['ollama'] = {'status': 'error', 'message': str(e)}
-
-    # Check Redis
-    try:
-        from app.redis_client import RedisClient
-        redis_client = RedisClient()
-        status['components']['redis'] = {
-            'status': 'ok' if redis_client.enabled else 'unavailable',
-            'host': redis_client.host
-        }
-    except Exception as e:
-        status['components']['redis'] = {'status': 'error', 'message': str(e)}
-        
-    # Check Disk Space
-    try:
-        disk = psutil.disk_usage('/')
-        status['components']['disk'] = {
-            'status': 'ok' if disk.percent < 90 else 'warning',
-            'total': disk.total,
-            'used': disk.used,
-            'free': disk.free,
-            'percent': disk.percent
-        }
-    except Exception as e:
-        status['components']['disk'] = {'status': 'error', 'message': str(e)}
+    pool = _health_pool()
+    futures = {}
+    for name, (probe, _) in _PROBES.items():
+        cached = _health_cache.get(name) if use_cache else None
+        if cached is not None and cached[0] > now:
+            status['components'][name] = cached[1]
+        else:
+            futures[name] = pool.submit(contextvars.copy_context().run, probe)
+    deadline = now + HEALTH_TIMEOUT
+    
+    for name, future in futures.items():
+        critical = _PROBES[name][1]
+        try:
+            result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            status['components'][name] = result
+            _health_cache[name] = (time.monotonic() + HEALTH_CACHE_TTL, result)
+        except FutureTimeoutError:
+            status['components'][name] = {'status': 'timeout'}
+            if critical:
+                status['status'] = 'degraded'
+        except Exception as e:
+            status['components'][name] = {'status': 'error', 'message': str(e)}
+            if critical:
+                status['status'] = 'degraded'
         
     return jsonify(status), 200 if status['status'] == 'ok' else 503
 
@@ -3,25 +3,463 @@ Photos Blueprint
 API-Endpoints für Foto-Verwaltung mit automatischer Ordner-Organisation
 Async & Pydantic Modernized
 """
-from flask import Blueprint, jsonify, request, send_file
+from flask import Blueprint, Request, Response, current_app, jsonify, request, send_file
 from pathlib import Path
 from datetime import datetime
 import logging
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Optional, Tuple
+import hashlib
+import mimetypes
 import os
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from werkzeug.security import safe_join
 from werkzeug.utils import secure_filename
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
+from urllib.parse import quote
 import io
-import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from app.extensions import get_database, run_io
+
+# Try to import pyvips (libvips: Shrink-on-Load, dekodiert JPEGs nie voll)
+try:
+    import pyvips
+    PYVIPS_AVAILABLE = True
+except (ImportError, OSError):
+    # OSError: Python-Paket vorhanden, aber libvips fehlt
+    PYVIPS_AVAILABLE = False
+
+# Try to import pillow-heif (HEIC-Decoder für PIL: Upload-Transkodierung, eingebettete Thumbnails)
+try:
+    import pillow_heif
+    pillow_heif.register_heif_opener()
+    PILLOW_HEIF_AVAILABLE = True
+except ImportError:
+    PILLOW_HEIF_AVAILABLE = False
+
+# Try to import fcntl (POSIX-Dateisperren für den Foto-Index-Abgleich)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
 
 photos_bp = Blueprint('photos', __name__, url_prefix='/api/photos')
 logger = logging.getLogger(__name__)
 
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'heic', 'webp'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'heic', 'webp'})
+# Tupel für str.endswith (eine C-Schleife, keine Zwischenobjekte außer lower())
+_ALLOWED_SUFFIXES = tuple('.' + ext for ext in sorted(ALLOWED_EXTENSIONS))
 PHOTOS_BASE_DIR = Path('data/Bilder')
 
+# Kodierte Thumbnails (außerhalb von data/Bilder, damit der Foto-Index sie nicht aufnimmt)
+THUMBNAIL_CACHE_DIR = PHOTOS_BASE_DIR.parent / '.thumbs'
+# Nur für versionierte URLs (?v=<mtime>), siehe thumbnail_url
+THUMBNAIL_MAX_AGE = 31536000
+# Heißeste Thumbnails zusätzlich im RAM (Key -> JPEG-Bytes, ~20 KB pro Eintrag)
+THUMBNAIL_MEMORY_CACHE_SIZE = 256
+
+# Thumbnail-Format -> (Dateiendung, Mimetype); WebP wenn der Client es anbietet
+THUMBNAIL_FORMATS = {
+    'jpeg': ('jpg', 'image/jpeg'),
+    'webp': ('webp', 'image/webp'),
+}
+WEBP_QUALITY = 80
+
+# Parallele Verzeichnis-Scans beim Index-Abgleich (ein Task pro Jahres-Ordner);
+# auf rotierenden Platten PHOTO_SCAN_WORKERS=1 setzen
+PHOTO_SCAN_WORKERS = int(os.getenv('PHOTO_SCAN_WORKERS', '4'))
+
+# Puffergröße beim Schreiben von Uploads
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Uploads ab dieser Größe spoolt der Multipart-Parser direkt nach data/Bilder
+# (gleiches Dateisystem -> os.replace statt zweiter Kopie aus /tmp)
+UPLOAD_SPOOL_THRESHOLD = 500 * 1024
+UPLOAD_TMP_PREFIX = '.upload-'
+
+# HEIC wird beim Upload einmal nach JPEG transkodiert (HEIC bleibt als Archiv)
+HEIC_SUFFIX = '.heic'
+HEIC_JPEG_QUALITY = 90
+
+# vips | simd | pil - 'simd' ist der PIL-Pfad mit installiertem Pillow-SIMD
+THUMB_BACKEND = os.getenv('THUMB_BACKEND', 'vips' if PYVIPS_AVAILABLE else 'pil').lower()
+
+# Foto-Index (Tabelle photos) wird einmal pro Deployment im Hintergrund mit dem
+# Dateibaum abgeglichen: jeder Prozess versucht es einmal (PID statt Flag, damit
+# geforkte Worker es auch versuchen), abgleichen darf nur der Halter der Sperrdatei
+_index_lock = threading.Lock()
+_index_pid: Optional[int] = None
+PHOTO_INDEX_LOCK_FILE = PHOTOS_BASE_DIR.parent / '.photo-index.lock'
+_index_lock_fd: Optional[int] = None
+
+# Listen-Antworten: (year, month, day, limit, offset) -> (Ablauf, (photos, total))
+# Upload/Delete leeren den Cache im eigenen Prozess, TTL begrenzt die
+# Veraltung in anderen Worker-Prozessen
+LISTING_CACHE_MAXSIZE = 64
+LISTING_CACHE_TTL = 30
+
+_listing_lock = threading.Lock()
+_listing_cache: "OrderedDict[tuple, Tuple[float, tuple]]" = OrderedDict()
+
+# URL-Präfixe der Auslieferungs-Endpoints (Listing hängt nur noch den Pfad an)
+IMAGE_URL_PREFIX = '/api/photos/image/'
+THUMBNAIL_URL_PREFIX = '/api/photos/thumbnail/'
+
+def thumbnail_url(path: str, mtime: Optional[float]) -> str:
+    """
+    Thumbnail-URL mit mtime als Version
+    
+    Ein ersetztes/gedrehtes Original bekommt eine neue URL - nur so darf das
+    Thumbnail immutable ausgeliefert werden.
+    """
+    if mtime is None:
+        return THUMBNAIL_URL_PREFIX + path
+    return f"{THUMBNAIL_URL_PREFIX}{path}?v={int(mtime * 1e6)}"
+
+_thumb_memory_lock = threading.Lock()
+_thumb_memory: "OrderedDict[str, bytes]" = OrderedDict()
+
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(_ALLOWED_SUFFIXES)
+
+def _parts_date(parts: Tuple[str, ...]) -> Optional[datetime]:
+    """Datum aus den Ordnern YYYY/MM/DD (erste drei Teile) oder None"""
+    if len(parts) >= 3:
+        try:
+            return datetime(int(parts[0]), int(parts[1]), int(parts[2]))
+        except ValueError:
+            pass
+    return None
+
+def _photo_date(parts: Tuple[str, ...], mtime: float) -> datetime:
+    """Datum aus den Ordnern YYYY/MM/DD, sonst Änderungszeit der Datei"""
+    return _parts_date(parts) or datetime.fromtimestamp(mtime)
+
+def _index_photo(db, filepath: Path) -> None:
+    """Nimmt eine gespeicherte Datei in den Foto-Index auf"""
+    st = filepath.stat()
+    relative = filepath.relative_to(PHOTOS_BASE_DIR).as_posix()
+    parts = tuple(relative.split('/', 3)[:-1])
+    db.add_photo(relative, _photo_date(parts, st.st_mtime), st.st_mtime, st.st_size)
+
+def _iter_photo_entries(root: str, parts: Tuple[str, ...] = (), recursive: bool = True):
+    """
+    os.scandir-Durchlauf über data/Bilder mit explizitem Stack
+    
+    is_file()/is_dir() kommen aus dem Verzeichniseintrag (kein stat),
+    stat() nur einmal für tatsächliche Fotos. Die Ordner-Teile werden
+    mitgeführt statt den Pfad später wieder zu zerlegen. HEIC-Dateien mit
+    JPEG-Kopie werden übersprungen.
+    
+    Args:
+        root: Startverzeichnis
+        parts: Ordner-Teile von root relativ zu data/Bilder
+        recursive: False -> nur Dateien direkt in root
+    
+    Yields:
+        (relativer POSIX-Pfad, Ordner-Teile, os.DirEntry)
+    """
+    stack = [(root, parts)]
+    while stack:
+        directory, parts = stack.pop()
+        with os.scandir(directory) as it:
+            entries = list(it)
+        names = {entry.name for entry in entries}
+        prefix = '/'.join(parts) + '/' if parts else ''
+        
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    stack.append((entry.path, parts + (entry.name,)))
+                continue
+            
+            name = entry.name
+            lower = name.lower()
+            if lower.endswith(_ALLOWED_SUFFIXES) and entry.is_file():
+                # HEIC-Archiv mit transkodiertem JPEG daneben: nur das JPEG indexieren
+                if lower.endswith(HEIC_SUFFIX) and f"{name[:-len(HEIC_SUFFIX)]}.jpg" in names:
+                    continue
+                yield prefix + name, parts, entry
+
+def _scan_photo_rows(directory: str, parts: Tuple[str, ...], recursive: bool = True) -> list:
+    """Index-Zeilen (Pfad, Datum, mtime, Größe) für einen Teilbaum"""
+    rows = []
+    # Alle Dateien eines Ordners teilen sich das Datum -> einmal pro Ordner parsen
+    dir_dates: Dict[Tuple[str, ...], Optional[datetime]] = {}
+    for relative, entry_parts, entry in _iter_photo_entries(directory, parts, recursive):
+        st = entry.stat()
+        date = dir_dates.get(entry_parts)
+        if date is None and entry_parts not in dir_dates:
+            date = dir_dates[entry_parts] = _parts_date(entry_parts)
+        rows.append((relative, date or datetime.fromtimestamp(st.st_mtime), st.st_mtime, st.st_size))
+    return rows
+
+def rebuild_photo_index(db) -> int:
+    """
+    Gleicht den Foto-Index mit data/Bilder ab (einmaliger Baum-Durchlauf)
+    
+    Die Jahres-Ordner werden parallel gescannt (PHOTO_SCAN_WORKERS) -
+    scandir/stat warten auf die Platte, nicht auf die CPU.
+    
+    Returns:
+        Anzahl indexierter Fotos
+    """
+    rows = []
+    if PHOTOS_BASE_DIR.is_dir():
+        root = str(PHOTOS_BASE_DIR)
+        rows.extend(_scan_photo_rows(root, (), recursive=False))
+        with os.scandir(root) as it:
+            subdirs = [(entry.path, (entry.name,)) for entry in it if entry.is_dir(follow_symlinks=False)]
+        
+        with ThreadPoolExecutor(max_workers=max(1, PHOTO_SCAN_WORKERS), thread_name_prefix='photo-scan') as pool:
+            futures = [pool.submit(_scan_photo_rows, path, parts) for path, parts in subdirs]
+            for future in futures:
+                rows.extend(future.result())
+    
+    changed, removed = db.reconcile_photos(rows, lambda path: (PHOTOS_BASE_DIR / path).exists())
+    invalidate_listings()
+    logger.info(f"Foto-Index abgeglichen: {len(rows)} Fotos ({changed} neu/geändert, {removed} entfernt)")
+    return len(rows)
+
+def _listing_get(key: tuple) -> Optional[tuple]:
+    with _listing_lock:
+        entry = _listing_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del _listing_cache[key]
+            return None
+        _listing_cache.move_to_end(key)
+        return entry[1]
+
+def _listing_set(key: tuple, value: tuple) -> None:
+    with _listing_lock:
+        _listing_cache[key] = (time.monotonic() + LISTING_CACHE_TTL, value)
+        _listing_cache.move_to_end(key)
+        if len(_listing_cache) > LISTING_CACHE_MAXSIZE:
+            _listing_cache.popitem(last=False)
+
+def invalidate_listings() -> None:
+    """Verwirft alle gecachten Foto-Listen (nach Upload/Delete/Index-Neuaufbau)"""
+    with _listing_lock:
+        _listing_cache.clear()
+
+def _sync_photo_index(db) -> None:
+    try:
+        rebuild_photo_index(db)
+    except Exception as e:
+        logger.error(f"Foto-Index Abgleich fehlgeschlagen: {e}")
+
+def _acquire_index_lease() -> bool:
+    """
+    Sichert diesem Prozess den Foto-Index-Abgleich des Deployments
+    
+    Nicht blockierender flock auf PHOTO_INDEX_LOCK_FILE; der Deskriptor bleibt
+    bis Prozessende offen, die übrigen Worker bekommen die Sperre nie. Stirbt
+    der Halter, gibt der Kernel sie frei und der nächste startende Worker
+    gleicht erneut (diff-basiert) ab. Ohne fcntl (Windows) immer True.
+    """
+    global _index_lock_fd
+    if not FCNTL_AVAILABLE:
+        return True
+    try:
+        PHOTO_INDEX_LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(PHOTO_INDEX_LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+    except OSError as e:
+        logger.warning(f"Foto-Index Sperrdatei nicht verfügbar: {e}")
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        # Ein anderer Worker gleicht ab (oder hat es bereits getan)
+        os.close(fd)
+        return False
+    _index_lock_fd = fd
+    return True
+
+def start_photo_index_sync(db) -> None:
+    """
+    Startet den Abgleich Index <-> Dateibaum einmal pro Deployment im Hintergrund
+    
+    Requests warten nicht darauf - bis zum Ende liefert list_photos den
+    persistierten Stand der Tabelle, danach wird der Listen-Cache geleert.
+    Parallele Abgleiche mehrerer Worker (SQLite 'database is locked')
+    verhindert die Sperrdatei, siehe _acquire_index_lease.
+    """
+    global _index_pid
+    pid = os.getpid()
+    if _index_pid == pid:
+        return
+    with _index_lock:
+        if _index_pid != pid:
+            _index_pid = pid
+            if not _acquire_index_lease():
+                logger.debug(f"Foto-Index Abgleich läuft in einem anderen Worker (PID {pid})")
+                return
+            threading.Thread(
+                target=_sync_photo_index, args=(db,), name='photo-index', daemon=True
+            ).start()
+
+def _photo_file(photo_path: str) -> Optional[Path]:
+    """
+    Löst einen URL-Pfad unterhalb von data/Bilder auf
+    
+    Returns:
+        Pfad oder None bei '..'/absoluten Pfaden und wenn keine reguläre Datei existiert
+    """
+    joined = safe_join(str(PHOTOS_BASE_DIR), photo_path)
+    if joined is None:
+        return None
+    filepath = Path(joined)
+    return filepath if filepath.is_file() else None
+
+def _send_photo(filepath: Path) -> Response:
+    """
+    Liefert ein Original-Foto aus (ETag/Last-Modified -> 304, sonst sendfile)
+    
+    public, no-cache: die URL ist nicht versioniert und ein Original kann
+    unter demselben Pfad ersetzt werden (HEIC-Transkodierung, Löschen +
+    Neu-Upload) - Browser revalidieren, ein unverändertes Foto kostet nur
+    ein 304. immutable bekommen nur versionierte Thumbnail-URLs (thumbnail_url).
+    
+    Mimetype aus der Dateiendung (PNG/WebP/HEIC nicht als image/jpeg); mit
+    USE_X_SENDFILE setzt send_file nur den X-Sendfile-Header.
+    
+    Mit X_ACCEL_PHOTOS_PREFIX überträgt nginx die Datei selbst:
+    
+        location /internal/bilder/ { internal; alias /app/data/Bilder/; }
+    """
+    mimetype = mimetypes.guess_type(filepath.name)[0] or 'image/jpeg'
+    
+    prefix = current_app.config.get('X_ACCEL_PHOTOS_PREFIX')
+    if prefix:
+        relative = filepath.relative_to(PHOTOS_BASE_DIR).as_posix()
+        response = Response(status=200, mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(relative)
+        # ETag/Last-Modified setzt nginx
+        response.cache_control.public = True
+        response.cache_control.no_cache = True
+        return response
+    
+    # Absoluter Pfad: send_file löst relative Pfade gegen app.root_path auf
+    response = send_file(
+        filepath.absolute(),
+        mimetype=mimetype,
+        conditional=True,
+        etag=True
+    )
+    # ohne max_age setzt send_file bereits no-cache
+    response.cache_control.public = True
+    return response
+
+class PhotoUploadRequest(Request):
+    """
+    Request-Klasse der App: große Foto-Uploads landen beim Parsen direkt als
+    Temp-Datei in data/Bilder statt in einem SpooledTemporaryFile unter /tmp
+    """
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.endpoint != 'photos.upload_photo' or (total_content_length or 0) <= UPLOAD_SPOOL_THRESHOLD:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        
+        PHOTOS_BASE_DIR.mkdir(parents=True, exist_ok=True)
+        stream = tempfile.NamedTemporaryFile(dir=PHOTOS_BASE_DIR.absolute(), prefix=UPLOAD_TMP_PREFIX, delete=False)
+        # Nicht übernommene Temp-Dateien räumt _cleanup_upload_spool auf
+        self.__dict__.setdefault('_photo_spool', []).append(stream.name)
+        return stream
+
+def _is_spooled_upload(stream) -> bool:
+    name = getattr(stream, 'name', None)
+    return (isinstance(name, str) and os.path.basename(name).startswith(UPLOAD_TMP_PREFIX)
+            and os.path.dirname(name) == str(PHOTOS_BASE_DIR.absolute()))
+
+@photos_bp.teardown_request
+def _cleanup_upload_spool(exc=None) -> None:
+    for name in request.__dict__.get('_photo_spool', ()):
+        try:
+            os.unlink(name)
+        except FileNotFoundError:
+            pass
+
+def _write_upload(stream, filepath: Path) -> None:
+    """
+    Schreibt einen Upload-Stream atomar nach filepath
+    
+    Von PhotoUploadRequest gespoolte Uploads werden nur umbenannt (keine
+    zweite Kopie). Sonst 1-MiB-Blöcke in eine Temp-Datei im Zielordner, dann
+    os.replace. Danach POSIX_FADV_DONTNEED, damit große Uploads den
+    Page-Cache nicht verdrängen.
+    """
+    if _is_spooled_upload(stream):
+        stream.flush()
+        os.chmod(stream.name, 0o644)
+        os.replace(stream.name, filepath)
+    else:
+        fd, tmp_name = tempfile.mkstemp(dir=filepath.parent, prefix=UPLOAD_TMP_PREFIX)
+        try:
+            with open(fd, 'wb', buffering=UPLOAD_CHUNK_SIZE) as dst:
+                shutil.copyfileobj(stream, dst, UPLOAD_CHUNK_SIZE)
+            # mkstemp legt 0600 an - lesbar wie bisher file.save (z.B. für nginx)
+            os.chmod(tmp_name, 0o644)
+            os.replace(tmp_name, filepath)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    
+    if hasattr(os, 'posix_fadvise'):
+        fd = os.open(filepath, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+def transcode_heic(filepath: Path) -> Optional[Path]:
+    """
+    Transkodiert ein HEIC-Foto einmalig in ein JPEG daneben
+    
+    Thumbnails und Auslieferung laufen danach über das JPEG, die teure
+    HEVC-Dekodierung fällt nur beim Upload an.
+    
+    Returns:
+        Pfad zum JPEG oder None (pillow-heif fehlt / Dekodierfehler)
+    """
+    if not PILLOW_HEIF_AVAILABLE:
+        return None
+    
+    jpeg_path = filepath.with_suffix('.jpg')
+    tmp_path = jpeg_path.with_name(f".{jpeg_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with Image.open(filepath) as img:
+            exif = img.info.get('exif')
+            rgb = img.convert('RGB')
+        rgb.save(tmp_path, format='JPEG', quality=HEIC_JPEG_QUALITY, **({'exif': exif} if exif else {}))
+        os.replace(tmp_path, jpeg_path)
+        return jpeg_path
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        logger.error(f"HEIC transcode error: {e}")
+        return None
+
+def _heic_pair(filepath: Path) -> Tuple[Path, ...]:
+    """Original + transkodierte Kopie (HEIC <-> JPEG), soweit vorhanden"""
+    suffix = filepath.suffix.lower()
+    if suffix == HEIC_SUFFIX:
+        candidates = (filepath.with_suffix('.jpg'),)
+    elif suffix == '.jpg':
+        candidates = (filepath.with_suffix(HEIC_SUFFIX), filepath.with_suffix(HEIC_SUFFIX.upper()))
+    else:
+        candidates = ()
+    
+    for sibling in candidates:
+        if sibling.exists():
+            return filepath, sibling
+    return (filepath,)
 
 def get_photo_path(year: int, month: int, day: int) -> Path:
     """Erstellt Pfad: data/Bilder/YYYY/MM/DD/"""
@@ -29,23 +467,106 @@ def get_photo_path(year: int, month: int, day: int) -> Path:
     path.mkdir(parents=True, exist_ok=True)
     return path
 
-def generate_thumbnail(image_path: Path, max_size: int = 300) -> bytes:
-    """Generiert Thumbnail"""
+def generate_thumbnail(image_path: Path, max_size: int = 300, fmt: str = 'jpeg') -> bytes:
+    """Generiert Thumbnail (JPEG oder WebP, Backend über THUMB_BACKEND)"""
     try:
-        img = Image.open(image_path)
-        img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+        # Schon klein genug und im Zielformat: Original-Bytes statt Dekodieren +
+        # Neukodieren (Image.open liest nur den Header); landet im Thumbnail-Cache.
+        # Kann PIL die Datei nicht öffnen (z.B. HEIC ohne pillow-heif), übernimmt vips
+        try:
+            with Image.open(image_path) as img:
+                if img.format == fmt.upper() and max(img.size) <= max_size:
+                    return image_path.read_bytes()
+        except (OSError, UnidentifiedImageError):
+            pass
         
-        # Convert to RGB if necessary
-        if img.mode in ('RGBA', 'P'):
-            img = img.convert('RGB')
+        if THUMB_BACKEND == 'vips' and PYVIPS_AVAILABLE:
+            thumb = pyvips.Image.thumbnail(str(image_path), max_size, height=max_size, size='down')
+            if thumb.hasalpha():
+                thumb = thumb.flatten(background=255)
+            if fmt == 'webp':
+                return thumb.write_to_buffer(f'.webp[Q={WEBP_QUALITY}]')
+            return thumb.write_to_buffer('.jpg[Q=85,optimize_coding,interlace]')
         
-        buffer = io.BytesIO()
-        img.save(buffer, format='JPEG', quality=85)
-        return buffer.getvalue()
+        with Image.open(image_path) as img:
+            # JPEG: schon beim Dekodieren per DCT-Skalierung verkleinern (1/2 .. 1/8),
+            # Ziel 2x Thumbnail-Größe - den letzten Schritt macht LANCZOS
+            if img.format == 'JPEG':
+                img.draft('RGB', (max_size * 2, max_size * 2))
+            # HEIC: eingebettetes Vorschaubild (>= max_size) statt HEVC-Vollbild dekodieren
+            elif img.format == 'HEIF' and PILLOW_HEIF_AVAILABLE:
+                img = pillow_heif.thumbnail(img, min_box=max_size)
+            img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+            
+            # Convert to RGB if necessary (JPEG kennt kein Alpha/Palette)
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            
+            buffer = io.BytesIO()
+            if fmt == 'webp':
+                img.save(buffer, format='WEBP', quality=WEBP_QUALITY, method=4)
+            else:
+                # Huffman-Optimierung + progressiv: 10-30% kleinere Thumbnails
+                img.save(buffer, format='JPEG', quality=85, optimize=True, progressive=True)
+            return buffer.getvalue()
     except Exception as e:
         logger.error(f"Thumbnail error: {e}")
         return None
 
+def _thumbnail_key(image_path: Path, max_size: int = 300, fmt: str = 'jpeg') -> str:
+    """Cache-Key aus Pfad, mtime_ns, Größe und Format - ein geändertes Original ergibt einen neuen Key"""
+    st = image_path.stat()
+    digest = hashlib.sha1(f"{image_path.as_posix()}:{st.st_mtime_ns}".encode()).hexdigest()
+    return f"{digest}_{max_size}_{fmt}"
+
+def cached_thumbnail(image_path: Path, max_size: int = 300, fmt: str = 'jpeg') -> Optional[Path]:
+    """
+    Thumbnail aus dem Datei-Cache, erzeugt es beim ersten Zugriff
+    
+    Returns:
+        Pfad zur Bilddatei oder None wenn kein Thumbnail erzeugt werden konnte
+    """
+    cache_path = THUMBNAIL_CACHE_DIR / f"{_thumbnail_key(image_path, max_size, fmt)}.{THUMBNAIL_FORMATS[fmt][0]}"
+    
+    if cache_path.exists():
+        return cache_path
+    
+    thumbnail_data = generate_thumbnail(image_path, max_size, fmt)
+    if not thumbnail_data:
+        return None
+    
+    # Atomar ersetzen - parallele Requests sehen nie eine halbe Datei
+    THUMBNAIL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(thumbnail_data)
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+def thumbnail_bytes(image_path: Path, max_size: int = 300, fmt: str = 'jpeg') -> Tuple[str, Optional[bytes]]:
+    """
+    Thumbnail-Bytes: RAM-LRU, dann Datei-Cache, dann Erzeugung
+    
+    Returns:
+        (Cache-Key, Bild-Bytes oder None wenn kein Thumbnail erzeugt werden konnte)
+    """
+    key = _thumbnail_key(image_path, max_size, fmt)
+    with _thumb_memory_lock:
+        data = _thumb_memory.get(key)
+        if data is not None:
+            _thumb_memory.move_to_end(key)
+            return key, data
+    
+    cache_path = cached_thumbnail(image_path, max_size, fmt)
+    if cache_path is None:
+        return key, None
+    data = cache_path.read_bytes()
+    
+    with _thumb_memory_lock:
+        _thumb_memory[key] = data
+        if len(_thumb_memory) > THUMBNAIL_MEMORY_CACHE_SIZE:
+            _thumb_memory.popitem(last=False)
+    return key, data
+
 @photos_bp.route('/upload', methods=['POST'])
 async def upload_photo() -> Tuple[Dict[str, Any], int]:
     """
@@ -70,42 +591,41 @@ async def upload_photo() -> Tuple[Dict[str, Any], int]:
         else:
             photo_date = datetime.now()
         
-        # Sicherer Filename
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%H%M%S')
-        filename = f"photo_{timestamp}_{filename}"
+        # Sicherer Filename; Zufalls-Suffix statt Uhrzeit (HHMMSS kollidierte bei
+        # gleichnamigen Uploads in derselben Sekunde -> os.replace überschrieb)
+        filename = f"photo_{secrets.token_hex(4)}_{secure_filename(file.filename)}"
         
         # Speicherpfad
         save_dir = get_photo_path(photo_date.year, photo_date.month, photo_date.day)
         filepath = save_dir / filename
         
         # Speichern (blocking I/O -> thread)
-        # Note: request.files['file'] is a stream, we can't easily pass it to a thread 
-        # unless we read it first or use save() which is blocking.
-        # Ideally we read content and write in thread, or just accept blocking for upload (common in Flask).
-        # But let's try to be async friendly.
-        
-        # Reading content in memory might be bad for large files.
-        # Flask's save() is efficient.
-        # Let's run save in thread.
+        # Stream direkt auf die Platte, nie komplett im Speicher
+        db = get_database()
         
         def save_file():
-            file.save(str(filepath))
-            return filepath
+            _write_upload(file.stream, filepath)
+            # HEIC: JPEG-Kopie wird indexiert und ausgeliefert
+            served = filepath
+            if filepath.suffix.lower() == HEIC_SUFFIX:
+                served = transcode_heic(filepath) or filepath
+            _index_photo(db, served)
+            invalidate_listings()
+            return served, served.stat().st_mtime
 
-        await asyncio.to_thread(save_file)
+        served_path, served_mtime = await run_io(save_file)
         
         logger.info(f"Photo saved: {filepath}")
         
         # Relative URL
-        relative_path = str(filepath.relative_to(PHOTOS_BASE_DIR))
+        relative_path = served_path.relative_to(PHOTOS_BASE_DIR).as_posix()
         
         return jsonify({
             'success': True,
             'filename': filename,
             'path': str(filepath),
-            'url': f"/api/photos/image/{relative_path}",
-            'thumbnail_url': f"/api/photos/thumbnail/{relative_path}",
+            'url': IMAGE_URL_PREFIX + relative_path,
+            'thumbnail_url': thumbnail_url(relative_path, served_mtime),
             'date': photo_date.isoformat()
         }), 201
         
@@ -118,6 +638,8 @@ async def list_photos() -> Tuple[Dict[str, Any], int]:
     """
     GET /api/photos
     Liste aller Fotos mit optionalen Filtern
+    
+    Seiten werden LISTING_CACHE_TTL Sekunden pro Filter/Pagination gecacht.
     """
     try:
         year = request.args.get('year', type=int)
@@ -126,56 +648,38 @@ async def list_photos() -> Tuple[Dict[str, Any], int]:
         limit = request.args.get('limit', 100, type=int)
         offset = request.args.get('offset', 0, type=int)
         
+        db = get_database()
+        
         def get_photos_list():
-            photos = []
-            
-            # Build search path
-            search_path = PHOTOS_BASE_DIR
-            if year:
-                search_path = search_path / str(year)
-                if month:
-                    search_path = search_path / f"{month:02d}"
-                    if day:
-                        search_path = search_path / f"{day:02d}"
+            key = (year, month, day, limit, offset)
+            cached = _listing_get(key)
+            if cached is not None:
+                return cached
             
-            if not search_path.exists():
-                return [], 0
+            start_photo_index_sync(db)
+            rows, total = db.list_photos(year, month, day, limit=limit, offset=offset)
             
-            # Collect all photos
-            for photo_path in search_path.rglob('*'):
-                if photo_path.is_file() and allowed_file(photo_path.name):
-                    relative_path = str(photo_path.relative_to(PHOTOS_BASE_DIR))
-                    
-                    # Extract date from path
-                    parts = relative_path.split(os.sep)
-                    if len(parts) >= 3:
-                        try:
-                            photo_year = int(parts[0])
-                            photo_month = int(parts[1])
-                            photo_day = int(parts[2])
-                            photo_date = datetime(photo_year, photo_month, photo_day)
-                        except:
-                            photo_date = datetime.fromtimestamp(photo_path.stat().st_mtime)
-                    else:
-                        photo_date = datetime.fromtimestamp(photo_path.stat().st_mtime)
-                    
-                    photos.append({
-                        'filename': photo_path.name,
-                        'path': relative_path,
-                        'url': f"/api/photos/image/{relative_path}",
-                        'thumbnail_url': f"/api/photos/thumbnail/{relative_path}",
-                        'date': photo_date.isoformat(),
-                        'size': photo_path.stat().st_size
-                    })
-            
-            # Sort by date (newest first)
-            photos.sort(key=lambda x: x['date'], reverse=True)
-            
-            total = len(photos)
-            paginated_photos = photos[offset:offset + limit]
-            return paginated_photos, total
+            # Fotos eines Tages teilen sich das Datum -> isoformat() einmal pro Datum
+            iso_dates: Dict[datetime, str] = {}
+            photos = []
+            for row in rows:
+                path = row['path']
+                date = row['date']
+                iso = iso_dates.get(date)
+                if iso is None:
+                    iso = iso_dates[date] = date.isoformat()
+                photos.append({
+                    'filename': path.rpartition('/')[2],
+                    'path': path,
+                    'url': IMAGE_URL_PREFIX + path,
+                    'thumbnail_url': thumbnail_url(path, row['mtime']),
+                    'date': iso,
+                    'size': row['size']
+                })
+            _listing_set(key, (photos, total))
+            return photos, total
 
-        photos, total = await asyncio.to_thread(get_photos_list)
+        photos, total = await run_io(get_photos_list)
         
         return jsonify({
             'photos': photos,
@@ -195,12 +699,12 @@ async def get_photo(photo_path: str):
     Vollauflösungs-Foto
     """
     try:
-        filepath = PHOTOS_BASE_DIR / photo_path
+        filepath = _photo_file(photo_path)
         
-        if not filepath.exists() or not filepath.is_file():
+        if filepath is None:
             return jsonify({'error': 'Photo not found'}), 404
         
-        return send_file(str(filepath), mimetype='image/jpeg')
+        return _send_photo(filepath)
         
     except Exception as e:
         logger.error(f"Get photo error: {e}")
@@ -210,26 +714,45 @@ async def get_photo(photo_path: str):
 async def get_thumbnail(photo_path: str):
     """
     GET /api/photos/thumbnail/<path>
-    Thumbnail (300x300)
+    Thumbnail (300x300, WebP oder JPEG je nach Accept-Header)
     """
     try:
-        filepath = PHOTOS_BASE_DIR / photo_path
+        filepath = _photo_file(photo_path)
         
-        if not filepath.exists():
+        if filepath is None:
             return jsonify({'error': 'Photo not found'}), 404
         
-        # Generate thumbnail in thread
-        thumbnail_data = await asyncio.to_thread(generate_thumbnail, filepath)
+        # HEIC mit JPEG-Kopie: Thumbnail aus dem JPEG, sonst aus dem eingebetteten HEIC-Vorschaubild
+        if filepath.suffix.lower() == HEIC_SUFFIX:
+            filepath = _heic_pair(filepath)[-1]
         
-        if not thumbnail_data:
+        # WebP nur bei explizitem Accept (Browser), sonst JPEG (z.B. */*)
+        mimetype = request.accept_mimetypes.best_match(['image/jpeg', 'image/webp'], default='image/jpeg')
+        fmt = 'webp' if mimetype == 'image/webp' else 'jpeg'
+        
+        # Generate thumbnail in thread (nur beim ersten Zugriff)
+        key, data = await run_io(thumbnail_bytes, filepath, 300, fmt)
+        
+        if data is None:
+            # HEIC-Original kann kein Browser anzeigen - nicht mehrere MB umsonst senden
+            if filepath.suffix.lower() == HEIC_SUFFIX:
+                return jsonify({'error': 'Thumbnail not available'}), 404
             # Fallback: return original
-            return send_file(str(filepath), mimetype='image/jpeg')
+            return _send_photo(filepath)
         
-        return send_file(
-            io.BytesIO(thumbnail_data),
-            mimetype='image/jpeg',
-            as_attachment=False
-        )
+        # Key enthält mtime_ns -> taugt als ETag, 304 ohne Body
+        response = Response(data, mimetype=mimetype)
+        response.set_etag(key)
+        response.vary.add('Accept')
+        response.cache_control.public = True
+        if request.args.get('v'):
+            # Versionierte URL (thumbnail_url) ändert sich mit dem Original
+            response.cache_control.immutable = True
+            response.cache_control.max_age = THUMBNAIL_MAX_AGE
+        else:
+            # Unversionierte URL: revalidieren, ein unverändertes Thumbnail kostet ein 304
+            response.cache_control.no_cache = True
+        return response.make_conditional(request)
         
     except Exception as e:
         logger.error(f"Thumbnail error: {e}")
@@ -242,12 +765,21 @@ async def delete_photo(photo_path: str):
     Löscht Foto
     """
     try:
-        filepath = PHOTOS_BASE_DIR / photo_path
+        filepath = _photo_file(photo_path)
         
-        if not filepath.exists():
+        if filepath is None:
             return jsonify({'error': 'Photo not found'}), 404
         
-        await asyncio.to_thread(filepath.unlink)
+        db = get_database()
+        
+        def remove_file():
+            # HEIC-Archiv und JPEG-Kopie gehören zusammen
+            for path in _heic_pair(filepath):
+                path.unlink(missing_ok=True)
+                db.delete_photo(path.relative_to(PHOTOS_BASE_DIR).as_posix())
+            invalidate_listings()
+
+        await run_io(remove_file)
         logger.info(f"Photo deleted: {filepath}")
         
         return jsonify({'success': True, 'message': 'Photo deleted'}), 200
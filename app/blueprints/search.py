@@ -4,11 +4,13 @@ API-Endpoints für Suche und gespeicherte Suchen
 Async & Pydantic Modernized
 """
 from flask import Blueprint, jsonify, request, current_app
+import functools
 import logging
 from typing import Dict, Any, Tuple
 from pydantic import ValidationError
 
 from app.api_response import APIResponse, ErrorCodes
+from app.extensions import get_database, get_search_engine, run_io
 from app.schemas import SearchQuery
 
 search_bp = Blueprint('search', __name__, url_prefix='/api/search')
@@ -24,36 +26,23 @@ async def search_documents() -> Tuple[Dict[str, Any], int]:
     try:
         # Validate request body
         try:
-            # We use SearchQuery schema but allow extra fields for now if needed,
-            # or we map manually. SearchQuery has most fields.
-            # Note: The original code accepted 'date_from'/'date_to' which match schema 'start_date'/'end_date'
-            # We might need to map them or update schema.
-            # Let's map manually to be safe or use dict if schema is too strict.
-            data = request.json or {}
-            
-            # Simple validation using Pydantic if possible, or just pass to engine
-            # The SearchQuery schema uses start_date/end_date.
-            # Let's try to adapt data to schema if keys differ
-            if 'date_from' in data: data['start_date'] = data.pop('date_from')
-            if 'date_to' in data: data['end_date'] = data.pop('date_to')
-            
-            query_model = SearchQuery.model_validate(data)
+            # Body-Bytes direkt in pydantic-core (Rust) parsen + validieren,
+            # ohne Zwischenschritt über request.json -> dict
+            query_model = SearchQuery.model_validate_json(request.get_data(cache=False) or b'{}')
             
         except ValidationError as e:
-            # Fallback or strict error? Let's be strict for new API, but maybe lenient for legacy
-            # For now, return validation error
+            # Ungültiges JSON hat keine Feld-Location
             return APIResponse.validation_error(
-                {err['loc'][0]: [err['msg']] for err in e.errors()},
+                {(err['loc'][0] if err['loc'] else 'body'): [err['msg']] for err in e.errors()},
                 "Validation failed"
             )
 
-        from app.search_engine import SearchEngine
-        
-        # Initialize search engine
-        search_engine = SearchEngine()
+        # Geteilte SearchEngine (Index wird nicht pro Request aufgebaut)
+        search_engine = get_search_engine()
         
-        # Perform search
-        results = search_engine.search(
+        # Perform search (blockierend -> io_pool, Event-Loop bleibt frei)
+        results = await run_io(functools.partial(
+            search_engine.search,
             query=query_model.query or '',
             category=query_model.category,
             year=None, # Schema doesn't have year explicitly, maybe add it? Or it's in filters?
@@ -64,7 +53,7 @@ async def search_documents() -> Tuple[Dict[str, Any], int]:
             tags=query_model.tags or [],
             date_from=query_model.start_date,
             date_to=query_model.end_date
-        )
+        ))
         
         return jsonify({
             'results': results,
@@ -89,11 +78,12 @@ async def advanced_search() -> Tuple[Dict[str, Any], int]:
         if not query:
             return jsonify({'error': 'Query required'}), 400
         
-        from app.search_engine import SearchEngine
-        search_engine = SearchEngine()
+        search_engine = get_search_engine()
         
-        # Async route, but sync engine call
-        results = search_engine.semantic_search(query, limit=data.get('limit', 10))
+        # Embedding + Ähnlichkeitssuche blockieren -> io_pool
+        results = await run_io(
+            functools.partial(search_engine.semantic_search, query, limit=data.get('limit', 10))
+        )
         
         return jsonify({
             'results': results,
@@ -112,11 +102,8 @@ async def get_saved_searches() -> Tuple[Dict[str, Any], int]:
     Gespeicherte Suchen abrufen
     """
     try:
-        from app.database import Database
-        
-        db = Database()
-        searches = db.get_saved_searches()
-        db.close()
+        db = get_database()
+        searches = await run_io(db.get_saved_searches)
         
         return jsonify({'searches': searches}), 200
         
@@ -132,19 +119,17 @@ async def save_search() -> Tuple[Dict[str, Any], int]:
     Suche speichern
     """
     try:
-        from app.database import Database
-        
         data = request.json
         if not data or not data.get('name'):
             return jsonify({'error': 'Name required'}), 400
         
-        db = Database()
-        search_id = db.save_search(
+        db = get_database()
+        search_id = await run_io(functools.partial(
+            db.save_search,
             name=data['name'],
             query=data.get('query', ''),
             filters=data.get('filters', {})
-        )
-        db.close()
+        ))
         
         return jsonify({
             'success': True,
@@ -163,11 +148,8 @@ async def delete_saved_search(search_id: int) -> Tuple[Dict[str, Any], int]:
     Gespeicherte Suche löschen
     """
     try:
-        from app.database import Database
-        
-        db = Database()
-        db.delete_saved_search(search_id)
-        db.close()
+        db = get_database()
+        await run_io(db.delete_saved_search, search_id)
         
         return jsonify({'success': True}), 200
         
@@ -3,13 +3,22 @@ Statistics Blueprint
 API-Endpoints für Statistiken und Analytics
 Async & Pydantic Modernized
 """
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
+import asyncio
+import contextvars
+import functools
 import logging
-from typing import Dict, Any, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, Awaitable, Callable, Optional, Tuple
 from datetime import datetime
 from pydantic import ValidationError
 
 from app.api_response import APIResponse, ErrorCodes
+from app.extensions import get_data_extractor, get_database, get_extension, get_io_pool, get_statistics_engine, run_io
+from app.redis_client import RedisClient
 # We import schemas but might not use them for all complex nested responses yet
 # unless we define comprehensive models for everything.
 # For now, we focus on async conversion.
@@ -18,41 +27,221 @@ stats_bp = Blueprint('stats', __name__, url_prefix='/api/stats')
 logger = logging.getLogger(__name__)
 
 
-@stats_bp.route('/overview', methods=['GET'])
-async def get_overview_stats() -> Tuple[Dict[str, Any], int]:
+@dataclass(slots=True, frozen=True)
+class CachePolicy:
+    """Frische-Stufe eines Stats-Caches"""
+    name: str
+    min_ttl: int
+    max_ttl: int
+    buffer: int
+    allow_stale: bool = True
+
+
+# TTL = Erzeugungsdauer + buffer, begrenzt auf [min_ttl, max_ttl]
+CACHE_SHORT = CachePolicy('short', min_ttl=60, max_ttl=300, buffer=120)
+CACHE_NORMAL = CachePolicy('normal', min_ttl=600, max_ttl=3600, buffer=1800)
+CACHE_LONG = CachePolicy('long', min_ttl=3600, max_ttl=6 * 3600, buffer=3 * 3600)
+
+# Veraltete Einträge bleiben bis ttl * STALE_FACTOR abrufbar: sie werden
+# ausgeliefert und im Hintergrund neu erzeugt (auch wenn DB/CSV gerade hängen)
+STALE_FACTOR = 4
+
+# Keys, die dieser Prozess gerade neu erzeugt (kein doppeltes Refresh)
+_refresh_lock = threading.Lock()
+_refreshing: set = set()
+
+
+def _refresh_pool() -> ThreadPoolExecutor:
+    """Eigener Pool für Hintergrund-Refreshes (blockiert den io_pool nicht, den sie selbst nutzen)"""
+    return get_extension(
+        'stats_refresh_pool',
+        lambda: ThreadPoolExecutor(max_workers=2, thread_name_prefix='stats-refresh')
+    )
+
+
+async def _produce(policy: CachePolicy, producer: Callable[[], Awaitable[Any]]) -> Tuple[Response, bytes, int]:
     """
-    GET /api/stats/overview
-    Übersichts-Statistiken
+    Erzeugt Antwort + Cache-Eintrag
+    
+    Returns:
+        (Response, Eintrag 'stale_at\\n' + Body, Redis-TTL bis zum harten Ablauf)
     """
+    started = time.monotonic()
+    response = current_app.json.response(await producer())
+    ttl = int(min(max(time.monotonic() - started + policy.buffer, policy.min_ttl), policy.max_ttl))
+    entry = b'%d\n' % (time.time() + ttl) + response.get_data()
+    return response, entry, ttl * STALE_FACTOR
+
+
+def _refresh_in_background(cache_key: str, policy: CachePolicy, producer: Callable[[], Awaitable[Any]]) -> None:
+    """Erzeugt einen veralteten Eintrag neu; bei Fehler bleibt der alte bis zum harten Ablauf"""
+    with _refresh_lock:
+        if cache_key in _refreshing:
+            return
+        _refreshing.add(cache_key)
+    
+    # App-Kontext (get_database etc.) in den Refresh-Thread mitnehmen
+    ctx = contextvars.copy_context()
+    
+    def refresh() -> None:
+        try:
+            _, entry, expire = ctx.run(asyncio.run, _produce(policy, producer))
+            RedisClient().set(cache_key, entry, expire=expire)
+        except Exception as e:
+            logger.warning(f"Stats refresh failed for {cache_key}, serving stale: {e}")
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(cache_key)
+    
+    _refresh_pool().submit(refresh)
+
+
+def _cached_body(cache_key: str, cached: Optional[str], policy: CachePolicy,
+                 producer: Callable[[], Awaitable[Any]]) -> Optional[str]:
+    """
+    JSON-Body aus einem Cache-Eintrag ('stale_at\\n' + Body)
+    
+    Plant bei veraltetem Eintrag ein Hintergrund-Refresh ein.
+    
+    Returns:
+        Body oder None (Miss: kein/altes Format/veraltet ohne allow_stale)
+    """
+    if not cached:
+        return None
+    
+    head, _, body = cached.partition('\n')
     try:
-        from app.database import Database
-        from app.statistics_engine import StatisticsEngine
-        from app.redis_client import RedisClient
+        stale_at = float(head)
+    except ValueError:
+        # Eintrag ohne Zeitstempel (altes Format) -> wie Miss behandeln
+        return None
+    
+    if time.time() < stale_at:
+        return body
+    if not policy.allow_stale:
+        return None
+    _refresh_in_background(cache_key, policy, producer)
+    return body
+
+
+async def _cached_json(cache_key: str, policy: CachePolicy, producer: Callable[[], Awaitable[Any]]) -> Response:
+    """
+    JSON-Antwort mit Redis-Cache der fertig serialisierten Bytes (stale-while-revalidate)
+    
+    Treffer liefern den gespeicherten Body unverändert aus (kein json.loads +
+    erneutes jsonify). Ein veralteter Eintrag (bis ttl * STALE_FACTOR) wird
+    sofort ausgeliefert und im Hintergrund neu erzeugt - fällt das Backend
+    aus, sehen Clients den letzten Stand statt eines Fehlers.
+    
+    Args:
+        cache_key: Redis-Key
+        policy: Frische-Stufe (CACHE_SHORT/NORMAL/LONG)
+        producer: Liefert das Ergebnis (nur bei Miss/Refresh aufgerufen)
+    
+    Returns:
+        JSON-Response
+    """
+    redis_client = RedisClient()
+    
+    cached = await run_io(redis_client.get_raw, cache_key)
+    body = _cached_body(cache_key, cached, policy, producer)
+    if body is not None:
+        return current_app.response_class(body, mimetype=current_app.json.mimetype)
+    
+    response, entry, expire = await _produce(policy, producer)
+    get_io_pool().submit(functools.partial(redis_client.set, cache_key, entry, expire=expire))
+    return response
+
+
+async def _overview_stats() -> Dict[str, Any]:
+    db = get_database()
+    stats_engine = get_statistics_engine()
+    
+    # Blockierende DB-/CSV-Abfragen parallel im io_pool
+    overview, trends = await asyncio.gather(
+        run_io(db.get_statistics),
+        run_io(stats_engine.get_monthly_trends, datetime.now().year)
+    )
+    return {
+        'overview': overview,
+        'trends': trends
+    }
+
+
+async def _year_stats(year: int) -> Dict[str, Any]:
+    db = get_database()
+    
+    # Anzahl (COUNT) + Beträge pro Monat aus der DB
+    documents, monthly = await asyncio.gather(
+        run_io(functools.partial(db.count_documents, year=year)),
+        run_io(db.get_monthly_trends, year)
+    )
+    return {
+        'year': year,
+        'documents': documents,
+        'monthly': monthly
+    }
+
+
+async def _trends(year: int) -> Any:
+    stats_engine = get_statistics_engine()
+    return await run_io(stats_engine.get_monthly_trends, year)
+
+
+@stats_bp.route('/dashboard', methods=['GET'])
+async def get_dashboard() -> Tuple[Dict[str, Any], int]:
+    """
+    GET /api/stats/dashboard?year=<year>
+    Übersicht, Trends und Jahres-Statistik in einer Antwort
+    
+    Alle Cache-Einträge kommen mit einem MGET (ein Redis-Roundtrip), Misses
+    werden parallel erzeugt; die gecachten Bodies werden ohne erneutes
+    Serialisieren zusammengesetzt.
+    """
+    try:
+        year = request.args.get('year', datetime.now().year, type=int)
         
-        redis_client = RedisClient()
-        cache_key = "stats:overview"
+        # Antwort-Feld -> (Cache-Key, Policy, Producer), Keys wie die Einzel-Endpoints
+        sections = {
+            'overview': ("stats:overview", CACHE_SHORT, _overview_stats),
+            'trends': (f"stats:trends:{year}", CACHE_NORMAL, functools.partial(_trends, year)),
+            'year': (f"stats:year:{year}", CACHE_LONG, functools.partial(_year_stats, year)),
+        }
         
-        # Try cache
-        cached = redis_client.get(cache_key)
-        if cached:
-            return jsonify(cached), 200
+        redis_client = RedisClient()
+        cached = await run_io(redis_client.get_many_raw, [key for key, _, _ in sections.values()])
         
-        db = Database()
-        stats_engine = StatisticsEngine()
+        bodies: Dict[str, Any] = {}
+        misses = []
+        for (name, (key, policy, producer)), entry in zip(sections.items(), cached):
+            body = _cached_body(key, entry, policy, producer)
+            if body is None:
+                misses.append(name)
+            else:
+                bodies[name] = body.rstrip('\n').encode()
         
-        # These calls are synchronous, blocking the thread.
-        # In a full async app, we'd await them or run in executor.
-        stats = {
-            'overview': db.get_overview_stats(),
-            'trends': stats_engine.get_monthly_trends()
-        }
+        produced = await asyncio.gather(*(_produce(sections[name][1], sections[name][2]) for name in misses))
+        for name, (response, entry, expire) in zip(misses, produced):
+            bodies[name] = response.get_data().rstrip(b'\n')
+            get_io_pool().submit(functools.partial(redis_client.set, sections[name][0], entry, expire=expire))
         
-        db.close()
+        body = b'{' + b','.join(b'"%s":%s' % (name.encode(), bodies[name]) for name in sections) + b'}\n'
+        return current_app.response_class(body, mimetype=current_app.json.mimetype), 200
         
-        # Cache result (5 minutes)
-        redis_client.set(cache_key, stats, expire=300)
-        
-        return jsonify(stats), 200
+    except Exception as e:
+        logger.error(f"Error getting dashboard stats: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@stats_bp.route('/overview', methods=['GET'])
+async def get_overview_stats() -> Tuple[Dict[str, Any], int]:
+    """
+    GET /api/stats/overview
+    Übersichts-Statistiken
+    """
+    try:
+        # Schnell veränderlich (neue Dokumente)
+        return await _cached_json("stats:overview", CACHE_SHORT, _overview_stats), 200
         
     except Exception as e:
         logger.error(f"Error getting overview stats: {e}")
@@ -66,33 +255,7 @@ async def get_year_stats(year: int) -> Tuple[Dict[str, Any], int]:
     Jahres-Statistiken
     """
     try:
-        from app.database import Database
-        from app.statistics_engine import StatisticsEngine
-        from app.redis_client import RedisClient
-        
-        redis_client = RedisClient()
-        cache_key = f"stats:year:{year}"
-        
-        # Try cache
-        cached = redis_client.get(cache_key)
-        if cached:
-            return jsonify(cached), 200
-        
-        db = Database()
-        stats_engine = StatisticsEngine()
-        
-        stats = {
-            'year': year,
-            'documents': db.get_year_stats(year),
-            'monthly': stats_engine.get_monthly_breakdown(year)
-        }
-        
-        db.close()
-        
-        # Cache result (1 hour)
-        redis_client.set(cache_key, stats, expire=3600)
-        
-        return jsonify(stats), 200
+        return await _cached_json(f"stats:year:{year}", CACHE_LONG, functools.partial(_year_stats, year)), 200
         
     except Exception as e:
         logger.error(f"Error getting year stats: {e}")
@@ -106,45 +269,27 @@ async def get_expenses_analysis() -> Tuple[Dict[str, Any], int]:
     Ausgaben-Analyse
     """
     try:
-        from app.data_extractor import DataExtractor
-        from app.redis_client import RedisClient
-        
         year = request.args.get('year')
         category = request.args.get('category', 'Rechnung')
         
-        redis_client = RedisClient()
-        cache_key = f"stats:expenses:{category}:{year or 'all'}"
-        
-        # Try cache
-        cached = redis_client.get(cache_key)
-        if cached:
-            return jsonify(cached), 200
-        
-        extractor = DataExtractor()
-        
-        if year:
-            data = extractor.get_year_data(category, int(year))
-        else:
-            data = extractor.get_all_years_data(category)
-        
-        # Analyze data
-        analysis = {
-            'category': category,
-            'year': year,
-            'total_amount': 0,
-            'count': 0
-        }
-        
-        if data is not None:
-            import pandas as pd
-            if isinstance(data, pd.DataFrame):
-                analysis['total_amount'] = float(data['amount'].sum()) if 'amount' in data.columns else 0
-                analysis['count'] = len(data)
-        
-        # Cache result (1 hour)
-        redis_client.set(cache_key, analysis, expire=3600)
-        
-        return jsonify(analysis), 200
+        async def produce() -> Dict[str, Any]:
+            extractor = get_data_extractor()
+            
+            # Nur Anzahl + Summe der Betragsspalte, kein ganzes Jahr als DataFrame
+            if year:
+                totals = await run_io(extractor.get_year_totals, category, int(year))
+            else:
+                totals = await run_io(extractor.get_all_years_totals, category)
+            count, total_amount = totals or (0, 0.0)
+            
+            return {
+                'category': category,
+                'year': year,
+                'total_amount': total_amount,
+                'count': count
+            }
+        
+        return await _cached_json(f"stats:expenses:{category}:{year or 'all'}", CACHE_NORMAL, produce), 200
         
     except Exception as e:
         logger.error(f"Error getting expenses: {e}")
@@ -158,24 +303,7 @@ async def get_monthly_trends(year: int) -> Tuple[Dict[str, Any], int]:
     Monatliche Trends
     """
     try:
-        from app.statistics_engine import StatisticsEngine
-        from app.redis_client import RedisClient
-        
-        redis_client = RedisClient()
-        cache_key = f"stats:trends:{year}"
-        
-        # Try cache
-        cached = redis_client.get(cache_key)
-        if cached:
-            return jsonify(cached), 200
-        
-        stats_engine = StatisticsEngine()
-        trends = stats_engine.get_monthly_trends(year)
-        
-        # Cache result (1 hour)
-        redis_client.set(cache_key, trends, expire=3600)
-        
-        return jsonify(trends), 200
+        return await _cached_json(f"stats:trends:{year}", CACHE_NORMAL, functools.partial(_trends, year)), 200
         
     except Exception as e:
         logger.error(f"Error getting trends: {e}")
@@ -192,11 +320,11 @@ async def compare_expenses() -> Tuple[Dict[str, Any], int]:
         year1 = int(request.args.get('year1', datetime.now().year - 1))
         year2 = int(request.args.get('year2', datetime.now().year))
         
-        from app.statistics_engine import StatisticsEngine
-        stats_engine = StatisticsEngine()
+        async def produce() -> Any:
+            stats_engine = get_statistics_engine()
+            return await run_io(stats_engine.get_expenses_comparison, year1, year2)
         
-        comparison = stats_engine.get_expenses_comparison(year1, year2)
-        return jsonify(comparison), 200
+        return await _cached_json(f"stats:compare:{year1}:{year2}", CACHE_NORMAL, produce), 200
         
     except Exception as e:
         logger.error(f"Error comparing expenses: {e}")
@@ -210,16 +338,19 @@ async def list_insurances() -> Tuple[Dict[str, Any], int]:
     Liste aller Versicherungen
     """
     try:
-        from app.database import Database
-        from app.statistics_engine import StatisticsEngine
-        
-        db = Database()
-        stats_engine = StatisticsEngine(db=db)
-        
-        insurances = stats_engine.get_insurance_list()
-        db.close()
-        
-        return jsonify({'insurances': insurances}), 200
+        async def produce() -> Dict[str, Any]:
+            extractor = get_data_extractor()
+            # Eine CSV pro Jahr (data/<Jahr>/versicherungen_data.csv, Spalte 'jahr')
+            frames = await run_io(extractor.get_all_years_data, 'Versicherungen')
+            insurances = [
+                record
+                for df in frames
+                for record in df.astype(object).where(df.notna(), None).to_dict('records')
+            ]
+            return {'insurances': insurances}
+        
+        # Versicherungen ändern sich selten
+        return await _cached_json("stats:insurance:list", CACHE_LONG, produce), 200
         
     except Exception as e:
         logger.error(f"Error listing insurances: {e}")
@@ -4,16 +4,26 @@ API-Endpoints für Tag-Verwaltung
 Async & Pydantic Modernized
 """
 from flask import Blueprint, jsonify, request
+import functools
 import logging
-from typing import Dict, Any, Tuple
-from pydantic import ValidationError
+from typing import Dict, Any, List, Tuple
+from pydantic import TypeAdapter, ValidationError
 
 from app.api_response import APIResponse, ErrorCodes
+from app.extensions import get_database, run_io
 from app.schemas import TagCreate, TagResponse
 
 tags_bp = Blueprint('tags', __name__, url_prefix='/api/tags')
 logger = logging.getLogger(__name__)
 
+# Schema einmal kompilieren: ganze Tag-Liste in einem pydantic-core Aufruf
+# validieren + dumpen statt model_validate/model_dump pro Tag
+_TAG_LIST_ADAPTER = TypeAdapter(List[TagResponse])
+
+
+def _validated_tags(tags: List[dict]) -> List[dict]:
+    return _TAG_LIST_ADAPTER.dump_python(_TAG_LIST_ADAPTER.validate_python(tags))
+
 
 @tags_bp.route('/', methods=['GET'])
 async def get_all_tags() -> Tuple[Dict[str, Any], int]:
@@ -22,15 +32,11 @@ async def get_all_tags() -> Tuple[Dict[str, Any], int]:
     Alle Tags abrufen
     """
     try:
-        from app.database import Database
-        
-        db = Database()
-        tags = db.get_all_tags()
-        db.close()
+        db = get_database()
+        tags = await run_io(db.get_all_tags)
         
         # Validate with Pydantic (optional, but good for consistency)
-        # Note: tags is a list of dicts
-        validated_tags = [TagResponse.model_validate(t).model_dump() for t in tags]
+        validated_tags = _validated_tags(tags)
         
         return jsonify({'tags': validated_tags}), 200
         
@@ -48,21 +54,21 @@ async def create_tag() -> Tuple[Dict[str, Any], int]:
     try:
         # Validate request body
         try:
-            tag_data = TagCreate.model_validate(request.json)
+            # Body-Bytes direkt in pydantic-core parsen + validieren
+            tag_data = TagCreate.model_validate_json(request.get_data(cache=False) or b'{}')
         except ValidationError as e:
+            # Ungültiges JSON hat keine Feld-Location
             return APIResponse.validation_error(
-                {err['loc'][0]: [err['msg']] for err in e.errors()},
+                {(err['loc'][0] if err['loc'] else 'body'): [err['msg']] for err in e.errors()},
                 "Validation failed"
             )
 
-        from app.database import Database
-        
-        db = Database()
-        tag_id = db.create_tag(
+        db = get_database()
+        tag_id = await run_io(functools.partial(
+            db.create_tag,
             name=tag_data.name,
             color=tag_data.color
-        )
-        db.close()
+        ))
         
         return jsonify({
             'success': True,
@@ -83,11 +89,8 @@ async def delete_tag(tag_id: int) -> Tuple[Dict[str, Any], int]:
     Tag löschen
     """
     try:
-        from app.database import Database
-        
-        db = Database()
-        db.delete_tag(tag_id)
-        db.close()
+        db = get_database()
+        await run_io(db.delete_tag, tag_id)
         
         return jsonify({'success': True}), 200
         
@@ -103,14 +106,11 @@ async def get_document_tags(doc_id: int) -> Tuple[Dict[str, Any], int]:
     Tags eines Dokuments abrufen
     """
     try:
-        from app.database import Database
-        
-        db = Database()
-        tags = db.get_document_tags(doc_id)
-        db.close()
+        db = get_database()
+        tags = await run_io(db.get_document_tags, doc_id)
         
         # Validate
-        validated_tags = [TagResponse.model_validate(t).model_dump() for t in tags]
+        validated_tags = _validated_tags(tags)
         
         return jsonify({'tags': validated_tags}), 200
         
@@ -126,8 +126,6 @@ async def add_document_tag(doc_id: int) -> Tuple[Dict[str, Any], int]:
     Tag zu Dokument hinzufügen (per ID oder Name)
     """
     try:
-        from app.database import Database
-        
         data = request.json
         if not data:
             return jsonify({'error': 'No data provided'}), 400
@@ -138,33 +136,24 @@ async def add_document_tag(doc_id: int) -> Tuple[Dict[str, Any], int]:
         if not tag_id and not tag_name:
             return jsonify({'error': 'tag_id or tag_name required'}), 400
         
-        db = Database()
+        db = get_database()
         
-        # If tag_name provided, find or create tag
+        # If tag_name provided, find or create tag (ein Upsert, keine Tag-Liste)
         if not tag_id and tag_name:
-            all_tags = db.get_all_tags()
-            existing_tag = next((t for t in all_tags if t['name'].lower() == tag_name.lower()), None)
-            
-            if existing_tag:
-                tag_id = existing_tag['id']
-            else:
-                # Validate new tag creation
-                try:
-                    # Default color if creating by name
-                    new_tag = TagCreate(name=tag_name, color='#808080')
-                    tag_id = db.create_tag(new_tag.name, new_tag.color)
-                except ValidationError as e:
-                     return APIResponse.validation_error(
-                        {err['loc'][0]: [err['msg']] for err in e.errors()},
-                        "Invalid tag name"
-                    )
+            try:
+                # Default color if creating by name
+                new_tag = TagCreate(name=tag_name, color='#808080')
+            except ValidationError as e:
+                return APIResponse.validation_error(
+                    {err['loc'][0]: [err['msg']] for err in e.errors()},
+                    "Invalid tag name"
+                )
+            tag_id = await run_io(db.create_tag, new_tag.name, new_tag.color)
 
         if tag_id:
-            db.add_tag_to_document(doc_id, tag_id)
-            db.close()
+            await run_io(db.add_tag_to_document, doc_id, tag_id)
             return jsonify({'success': True, 'tag_id': tag_id}), 200
         else:
-            db.close()
             return jsonify({'error': 'Failed to get tag ID'}), 500
         
     except Exception as e:
@@ -179,11 +168,8 @@ async def remove_document_tag(doc_id: int, tag_id: int) -> Tuple[Dict[str, Any],
     Tag von Dokument entfernen
     """
     try:
-        from app.database import Database
-        
-        db = Database()
-        db.remove_tag_from_document(doc_id, tag_id)
-        db.close()
+        db = get_database()
+        await run_io(db.remove_tag_from_document, doc_id, tag_id)
         
         return jsonify({'success': True}), 200
         
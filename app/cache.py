@@ -5,12 +5,81 @@ Cache Manager - Redis Caching mit Fallback
 import logging
 import json
 import pickle
-from typing import Any, Optional, Union
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple, Union
 from functools import wraps
 import hashlib
 
 logger = logging.getLogger(__name__)
 
+# Try to import orjson (Rust-native JSON)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 1-Byte-Präfix vor dem Redis-Wert: JSON für dict/list/str/Zahlen, Pickle für
+# alles andere (datetime, DataFrame, ...); Werte ohne Präfix sind Alt-Einträge
+_JSON_TAG = b'J'
+_PICKLE_TAG = b'P'
+
+
+def _has_tuple(value: Any) -> bool:
+    """True wenn value (auch verschachtelt in dict/list) ein Tupel enthält"""
+    if isinstance(value, tuple):
+        return True
+    if isinstance(value, dict):
+        return any(_has_tuple(v) for v in value.values())
+    if isinstance(value, list):
+        return any(_has_tuple(v) for v in value)
+    return False
+
+
+def _dumps(value: Any) -> bytes:
+    """Serialisiert Cache-Wert - orjson wenn verlustfrei möglich, sonst Pickle"""
+    # Tupel (typische Funktionsrückgabe, auch verschachtelt) kämen als Liste zurück -> Pickle
+    if ORJSON_AVAILABLE and not _has_tuple(value):
+        try:
+            # datetime/Dataclass nicht in JSON umwandeln -> TypeError -> Pickle (Typ bleibt erhalten)
+            return _JSON_TAG + orjson.dumps(
+                value, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+            )
+        except TypeError:
+            pass
+    return _PICKLE_TAG + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _loads(data: bytes) -> Any:
+    """Deserialisiert Cache-Wert anhand des Präfix-Bytes"""
+    tag = data[:1]
+    if tag == _JSON_TAG:
+        return orjson.loads(data[1:])
+    if tag == _PICKLE_TAG:
+        return pickle.loads(data[1:])
+    # Alt-Eintrag (reines Pickle, beginnt mit b'\x80') - läuft per TTL aus
+    return pickle.loads(data)
+
+# In-Memory Fallback (ohne Redis): LRU-Grenze, TTL pro Key wie bei SETEX
+MEMORY_CACHE_MAXSIZE = 1000
+
+# Argumente dieser Typen landen lesbar im Key (kein Hash nötig)
+_PLAIN_KEY_TYPES = (int, str, bool, float, type(None))
+_PLAIN_KEY_MAXLEN = 128
+
+
+def _args_key(args: tuple, kwargs: dict) -> str:
+    """Key-Anteil der Argumente - kurze primitive Argumente direkt, sonst blake2s"""
+    # kwargs sortiert -> Key unabhängig von der Aufruf-Reihenfolge
+    arg_repr = repr((args, sorted(kwargs.items())))
+    if len(arg_repr) <= _PLAIN_KEY_MAXLEN and all(
+        type(a) in _PLAIN_KEY_TYPES for a in (*args, *kwargs.values())
+    ):
+        return arg_repr
+    return hashlib.blake2s(arg_repr.encode(), digest_size=16).hexdigest()
+
 class CacheManager:
     """
     Verwaltet Caching via Redis oder In-Memory (Fallback)
@@ -30,8 +99,9 @@ class CacheManager:
             
         self.redis = None
         self.enabled = False
-        self._memory_cache = {}
-        self._memory_cache_timestamps = {}  # Track insertion time
+        # key -> (Ablauf, Wert); RLock, da Flask-Threads parallel zugreifen
+        self._memory_lock = threading.RLock()
+        self._memory_cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
         
         try:
             import redis
@@ -41,7 +111,7 @@ class CacheManager:
                 port=6379,
                 db=0,
                 socket_connect_timeout=1,
-                decode_responses=False  # Binary mode für pickle
+                decode_responses=False  # Binary mode (Präfix + orjson/Pickle)
             )
             self.redis.ping()
             self.enabled = True
@@ -61,9 +131,17 @@ class CacheManager:
             if self.enabled and self.redis:
                 data = self.redis.get(key)
                 if data:
-                    return pickle.loads(data)
+                    return _loads(data)
             else:
-                return self._memory_cache.get(key)
+                with self._memory_lock:
+                    entry = self._memory_cache.get(key)
+                    if entry is None:
+                        return None
+                    if entry[0] < time.monotonic():
+                        del self._memory_cache[key]
+                        return None
+                    self._memory_cache.move_to_end(key)
+                    return entry[1]
         except Exception as e:
             logger.error(f"Cache Get Error: {e}")
             return None
@@ -73,17 +151,16 @@ class CacheManager:
         """Setzt Wert im Cache (Default: 5 Min)"""
         try:
             if self.enabled and self.redis:
-                data = pickle.dumps(value)
+                data = _dumps(value)
                 return self.redis.setex(key, timeout, data)
             else:
-                # Memory cache mit Timeout-Tracking
-                import time
-                self._memory_cache[key] = value
-                self._memory_cache_timestamps[key] = time.time()
-                
-                # Cleanup alter Einträge (max 1000 items)
-                if len(self._memory_cache) > 1000:
-                    self._cleanup_memory_cache()
+                # Memory cache mit TTL pro Key, älteste Einträge fliegen zuerst (LRU)
+                with self._memory_lock:
+                    self._memory_cache[key] = (time.monotonic() + timeout, value)
+                    self._memory_cache.move_to_end(key)
+                    if len(self._memory_cache) > MEMORY_CACHE_MAXSIZE:
+                        # O(1) - abgelaufene Einträge entfernt get() beim nächsten Zugriff
+                        self._memory_cache.popitem(last=False)
                 
                 return True
         except (pickle.PickleError, TypeError) as e:
@@ -99,10 +176,8 @@ class CacheManager:
             if self.enabled and self.redis:
                 self.redis.delete(key)
             else:
-                if key in self._memory_cache:
-                    del self._memory_cache[key]
-                if key in self._memory_cache_timestamps:
-                    del self._memory_cache_timestamps[key]
+                with self._memory_lock:
+                    self._memory_cache.pop(key, None)
             return True
         except Exception as e:
             logger.error(f"Cache Delete Error für key '{key}': {e}")
@@ -115,9 +190,11 @@ class CacheManager:
                 self.redis.delete(key)
         else:
             # Simple prefix match for memory cache
-            keys_to_delete = [k for k in self._memory_cache.keys() if k.startswith(pattern.replace('*', ''))]
-            for k in keys_to_delete:
-                del self._memory_cache[k]
+            prefix = pattern.replace('*', '')
+            with self._memory_lock:
+                keys_to_delete = [k for k in self._memory_cache if k.startswith(prefix)]
+                for k in keys_to_delete:
+                    del self._memory_cache[k]
 
     @staticmethod
     def cached(timeout: int = 300, key_prefix: str = ''):
@@ -128,9 +205,7 @@ class CacheManager:
                 cache = CacheManager()
                 
                 # Generiere Cache Key
-                arg_str = str(args) + str(kwargs)
-                key_hash = hashlib.md5(arg_str.encode()).hexdigest()
-                cache_key = f"{key_prefix}:{func.__name__}:{key_hash}"
+                cache_key = f"{key_prefix}:{func.__name__}:{_args_key(args, kwargs)}"
                 
                 # Prüfe Cache
                 cached_val = cache.get(cache_key)
@@ -146,20 +221,3 @@ class CacheManager:
                 return result
             return wrapper
         return decorator
-
-    def _cleanup_memory_cache(self, max_age: int = 300):
-        """Entfernt alte Einträge aus Memory Cache"""
-        import time
-        current_time = time.time()
-        
-        # Lösche Einträge älter als max_age Sekunden
-        keys_to_delete = [
-            key for key, timestamp in self._memory_cache_timestamps.items()
-            if current_time - timestamp > max_age
-        ]
-        
-        for key in keys_to_delete:
-            del self._memory_cache[key]
-            del self._memory_cache_timestamps[key]
-        
-        logger.debug(f"Cleanup: {len(keys_to_delete)} alte Cache-Einträge entfernt")
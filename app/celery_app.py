@@ -5,6 +5,9 @@ Celery Configuration
 from celery import Celery
 import os
 
+# Sekunden bis ein nicht erreichbarer Broker als Fehler gilt
+BROKER_CONNECT_TIMEOUT = float(os.getenv('CELERY_BROKER_CONNECT_TIMEOUT', '2'))
+
 def make_celery(app_name=__name__):
     redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
     
@@ -20,6 +23,9 @@ def make_celery(app_name=__name__):
         result_serializer='json',
         timezone='Europe/Berlin',
         enable_utc=True,
+        # Einreihen aus Web-Requests: nicht blockieren, wenn der Broker fehlt
+        broker_connection_timeout=BROKER_CONNECT_TIMEOUT,
+        broker_transport_options={'socket_connect_timeout': BROKER_CONNECT_TIMEOUT},
     )
     
     return celery
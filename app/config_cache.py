@@ -0,0 +1,45 @@
+"""
+Config Cache - Lädt config.yaml einmal pro Prozess
+Nutzt den libyaml C-Parser wenn verfügbar
+"""
+
+import logging
+from functools import lru_cache
+from typing import Dict, Any
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# Try to use libyaml C parser
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+    logger.warning("⚠️ libyaml not available, using pure-Python YAML parser")
+
+
+@lru_cache(maxsize=8)
+def get_config(config_path: str = 'config.yaml') -> Dict[str, Any]:
+    """
+    Lädt und parst die Konfiguration (gecacht)
+
+    Das Ergebnis wird geteilt - nicht verändern.
+
+    Args:
+        config_path: Pfad zur Konfigurationsdatei
+
+    Returns:
+        Konfiguration als Dictionary
+
+    Raises:
+        FileNotFoundError: Wenn Config-Datei nicht gefunden
+        yaml.YAMLError: Wenn Config ungültig
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=SafeLoader) or {}
+
+
+def reload_config() -> None:
+    """Verwirft den Cache (z.B. nach Änderung der Datei)"""
+    get_config.cache_clear()
@@ -6,14 +6,103 @@ Speichert Daten in CSV-Dateien für Analysen
 import logging
 import csv
 import re
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 import yaml
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Keyword-Tabellen einmal auf Modulebene statt pro Aufruf
+_COMPANY_KEYWORDS = ('gmbh', 'ag', 'kg', 'ohg', 'versicherung', 'stadtwerke')
+
+_EXPENSE_CATEGORIES = (
+    ('Haushalt', ('strom', 'gas', 'wasser', 'müll')),
+    ('Kommunikation', ('internet', 'telefon', 'handy', 'mobilfunk')),
+    ('Versicherung', ('versicherung', 'beitrag', 'police')),
+    ('Einkauf', ('amazon', 'ebay', 'shop', 'kaufland', 'rewe', 'edeka')),
+    ('Gesundheit', ('apotheke', 'arzt', 'kranken')),
+    ('Unterhaltung', ('netflix', 'spotify', 'disney', 'kino')),
+    ('Transport', ('tanken', 'benzin', 'bahn', 'ticket')),
+)
+
+# Betragsspalten der Kategorie-CSVs (erste vorhandene zählt)
+AMOUNT_COLUMNS = ('betrag', 'amount', 'beitrag', 'monatlicher_betrag')
+
+# Prozessweiter Cache für get_year_data:
+# CSV-Pfad -> (Ablauf, mtime_ns, DataFrame, Monats-Array oder None)
+YEAR_CACHE_MAXSIZE = 64
+YEAR_CACHE_TTL = 300
+
+_year_cache_lock = threading.Lock()
+_year_cache: "OrderedDict[Path, Tuple[float, int, pd.DataFrame, Optional[np.ndarray]]]" = OrderedDict()
+
+
+def _year_cache_get(csv_path: Path, mtime_ns: int) -> Optional[pd.DataFrame]:
+    with _year_cache_lock:
+        entry = _year_cache.get(csv_path)
+        if entry is None:
+            return None
+        expires, cached_mtime, df, _ = entry
+        if expires < time.monotonic() or cached_mtime != mtime_ns:
+            del _year_cache[csv_path]
+            return None
+        _year_cache.move_to_end(csv_path)
+        return df
+
+
+def _year_cache_set(csv_path: Path, mtime_ns: int, df: pd.DataFrame) -> None:
+    with _year_cache_lock:
+        _year_cache[csv_path] = (time.monotonic() + YEAR_CACHE_TTL, mtime_ns, df, None)
+        _year_cache.move_to_end(csv_path)
+        if len(_year_cache) > YEAR_CACHE_MAXSIZE:
+            _year_cache.popitem(last=False)
+
+
+def _month_array(df: pd.DataFrame) -> Optional[np.ndarray]:
+    """
+    Monat pro Zeile als int8 (0 = kein/ungültiges Datum)
+    
+    Spalte 'date' bzw. 'datum'; None wenn es keine Datumsspalte gibt.
+    """
+    column = 'date' if 'date' in df.columns else 'datum'
+    if column not in df.columns:
+        return None
+    dates = pd.to_datetime(df[column], format='ISO8601', errors='coerce')
+    return dates.dt.month.fillna(0).to_numpy(dtype=np.int8)
+
+
+def _cached_months(csv_path: Path, df: pd.DataFrame) -> Optional[np.ndarray]:
+    """Monats-Array eines Cache-Eintrags, wird beim ersten Monatsfilter berechnet"""
+    with _year_cache_lock:
+        entry = _year_cache.get(csv_path)
+        if entry is not None and entry[2] is df and entry[3] is not None:
+            return entry[3]
+    
+    months = _month_array(df)
+    with _year_cache_lock:
+        entry = _year_cache.get(csv_path)
+        if entry is not None and entry[2] is df:
+            _year_cache[csv_path] = entry[:3] + (months,)
+    return months
+
+
+def _filter_month(chunk: pd.DataFrame, month: int) -> pd.DataFrame:
+    """Filtert einen Daten-Block auf einen Monat"""
+    months = _month_array(chunk)
+    return chunk if months is None else chunk[months == month]
+
+
+def invalidate_year_data(csv_path: Path) -> None:
+    """Entfernt eine Jahres-CSV aus dem get_year_data-Cache"""
+    with _year_cache_lock:
+        _year_cache.pop(csv_path, None)
+
 
 class DataExtractor:
     """Extrahiert strukturierte Daten aus Dokumenten und speichert in CSV"""
@@ -178,7 +267,8 @@ class DataExtractor:
         
         for line in lines[:10]:  # Erste 10 Zeilen
             # Firmen-Patterns
-            if any(kw in line.lower() for kw in ['gmbh', 'ag', 'kg', 'ohg', 'versicherung', 'stadtwerke']):
+            line_lower = line.lower()
+            if any(kw in line_lower for kw in _COMPANY_KEYWORDS):
                 return line[:100]  # Max 100 Zeichen
         
         # Fallback: erste Zeile
@@ -188,17 +278,7 @@ class DataExtractor:
         """Kategorisiert Ausgaben"""
         text_lower = text.lower()
         
-        categories = {
-            'Haushalt': ['strom', 'gas', 'wasser', 'müll'],
-            'Kommunikation': ['internet', 'telefon', 'handy', 'mobilfunk'],
-            'Versicherung': ['versicherung', 'beitrag', 'police'],
-            'Einkauf': ['amazon', 'ebay', 'shop', 'kaufland', 'rewe', 'edeka'],
-            'Gesundheit': ['apotheke', 'arzt', 'kranken'],
-            'Unterhaltung': ['netflix', 'spotify', 'disney', 'kino'],
-            'Transport': ['tanken', 'benzin', 'bahn', 'ticket'],
-        }
-        
-        for category, keywords in categories.items():
+        for category, keywords in _EXPENSE_CATEGORIES:
             if any(kw in text_lower for kw in keywords):
                 return category
         
@@ -306,8 +386,7 @@ class DataExtractor:
         year_path.mkdir(parents=True, exist_ok=True)
         
         # CSV-Datei
-        csv_filename = f"{category.lower()}_data.csv"
-        csv_path = year_path / csv_filename
+        csv_path = self._csv_path(category, year)
         
         # Prüfe ob Datei existiert
         file_exists = csv_path.exists()
@@ -328,29 +407,174 @@ class DataExtractor:
             
         except Exception as e:
             logger.error(f"Fehler beim Speichern in CSV: {e}")
+        finally:
+            invalidate_year_data(csv_path)
     
-    def get_year_data(self, category: str, year: int) -> Optional[pd.DataFrame]:
+    def _csv_path(self, category: str, year: int) -> Path:
+        """Pfad der Jahres-CSV einer Kategorie"""
+        return self.data_path / str(year) / f"{category.lower()}_data.csv"
+    
+    def get_year_data(
+        self, category: str, year: int, month: Optional[int] = None
+    ) -> Optional[pd.DataFrame]:
         """
         Lädt CSV-Daten für ein Jahr und Kategorie
         
+        Ergebnisse werden prozessweit gecacht (YEAR_CACHE_TTL, ungültig sobald
+        sich die mtime der CSV ändert) - wiederholte Exporte desselben Jahres
+        lesen die Datei nicht erneut. Der Monatsfilter nutzt das gecachte
+        Monats-Array, der Aufrufer bekommt nur den Ausschnitt.
+        
         Args:
             category: Kategorie
             year: Jahr
+            month: Optional nur Zeilen dieses Monats (Spalte date bzw. datum)
             
         Returns:
-            Pandas DataFrame oder None
+            Pandas DataFrame (flache Kopie des Cache-Eintrags) oder None
         """
-        csv_path = self.data_path / str(year) / f"{category.lower()}_data.csv"
+        csv_path = self._csv_path(category, year)
         
-        if not csv_path.exists():
+        try:
+            mtime_ns = csv_path.stat().st_mtime_ns
+        except OSError:
             return None
         
+        df = _year_cache_get(csv_path, mtime_ns)
+        if df is None:
+            try:
+                df = pd.read_csv(csv_path)
+            except Exception as e:
+                logger.error(f"Fehler beim Laden der CSV: {e}")
+                return None
+            _year_cache_set(csv_path, mtime_ns, df)
+        
+        if month:
+            months = _cached_months(csv_path, df)
+            if months is not None:
+                return df[months == month]
+        
+        # Neue Spalten beim Aufrufer (z.B. 'jahr') verändern den Cache nicht
+        return df.copy(deep=False)
+    
+    def iter_year_data(
+        self, category: str, year: int, chunksize: int = 10000, month: Optional[int] = None
+    ) -> Optional[Iterator[pd.DataFrame]]:
+        """
+        Liest CSV-Daten für ein Jahr und Kategorie blockweise (für Exporte)
+        
+        Liegt das Jahr bereits im get_year_data-Cache, werden die Blöcke
+        daraus geschnitten statt die Datei erneut zu lesen. Der Monatsfilter
+        vergleicht ein int8-Monats-Array (beim Cache-Eintrag einmal berechnet)
+        statt pro Anfrage den datetime-Accessor über die ganze Spalte.
+        
+        Args:
+            category: Kategorie
+            year: Jahr
+            chunksize: Zeilen pro DataFrame
+            month: Optional nur Zeilen dieses Monats (Spalte date bzw. datum)
+            
+        Returns:
+            Iterator über DataFrames oder None wenn keine Daten existieren
+        """
+        csv_path = self._csv_path(category, year)
+        
         try:
-            df = pd.read_csv(csv_path)
-            return df
+            mtime_ns = csv_path.stat().st_mtime_ns
+        except OSError:
+            return None
+        
+        df = _year_cache_get(csv_path, mtime_ns)
+        if df is not None:
+            if month:
+                months = _cached_months(csv_path, df)
+                if months is not None:
+                    df = df[months == month]
+            return (df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize))
+        
+        chunks = iter(pd.read_csv(csv_path, chunksize=chunksize))
+        if month:
+            chunks = (_filter_month(chunk, month) for chunk in chunks)
+        return chunks
+    
+    def get_year_amounts(self, category: str, year: int) -> Optional[np.ndarray]:
+        """
+        Betragsspalte eines Jahres als float64-Array
+        
+        Nutzt den get_year_data-Cache falls vorhanden, sonst wird in einem
+        Durchgang nur die Betragsspalte gelesen statt des ganzen Jahres.
+        Nicht-numerische Werte werden NaN, ohne Betragsspalte ist jede Zeile 0.
+        
+        Args:
+            category: Kategorie
+            year: Jahr
+            
+        Returns:
+            Array (eine Zeile pro Eintrag) oder None wenn keine Daten existieren
+        """
+        csv_path = self._csv_path(category, year)
+        
+        try:
+            mtime_ns = csv_path.stat().st_mtime_ns
+        except OSError:
+            return None
+        
+        try:
+            df = _year_cache_get(csv_path, mtime_ns)
+            if df is None:
+                df = pd.read_csv(csv_path, usecols=lambda c: c in AMOUNT_COLUMNS)
+                if len(df.columns) == 0:
+                    # Keine Betragsspalte - nur die Zeilenzahl wird gebraucht
+                    df = pd.read_csv(csv_path, usecols=[0])
         except Exception as e:
             logger.error(f"Fehler beim Laden der CSV: {e}")
             return None
+        
+        column = next((c for c in AMOUNT_COLUMNS if c in df.columns), None)
+        if column is None:
+            return np.zeros(len(df))
+        return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64)
+    
+    def get_year_totals(self, category: str, year: int) -> Optional[Tuple[int, float]]:
+        """
+        Anzahl Zeilen und Summe der Betragsspalte eines Jahres
+        
+        Args:
+            category: Kategorie
+            year: Jahr
+            
+        Returns:
+            (Anzahl, Summe) oder None wenn keine Daten existieren
+        """
+        amounts = self.get_year_amounts(category, year)
+        if amounts is None:
+            return None
+        # NumPy-Reduktion direkt auf dem Array, NaN (leere/ungültige Beträge) zählt als 0
+        return amounts.size, float(np.nansum(amounts))
+    
+    def get_all_years_totals(self, category: str) -> Tuple[int, float]:
+        """
+        Anzahl und Summe über alle Jahre einer Kategorie (siehe get_year_totals)
+        
+        Args:
+            category: Kategorie
+            
+        Returns:
+            (Anzahl, Summe)
+        """
+        count, total = 0, 0.0
+        
+        if not self.data_path.exists():
+            return count, total
+        
+        for year_dir in self.data_path.iterdir():
+            if year_dir.is_dir() and year_dir.name.isdigit():
+                totals = self.get_year_totals(category, int(year_dir.name))
+                if totals is not None:
+                    count += totals[0]
+                    total += totals[1]
+        
+        return count, total
     
     def get_all_years_data(self, category: str) -> List[pd.DataFrame]:
         """
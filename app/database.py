@@ -2,17 +2,162 @@
 Database - SQLAlchemy Implementation
 """
 
+import functools
 import logging
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional, List, Dict, Any
 import json
 import yaml
-from sqlalchemy import or_, and_, func, desc
+from sqlalchemy import or_, and_, func, desc, insert, delete, update, select, bindparam
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import selectinload
 from app.db_config import get_db, engine
-from app.models import Base, Document, Tag, AuditLog, SavedSearch, Budget, document_tags
+from app.models import Base, Document, Tag, AuditLog, SavedSearch, Budget, Photo, document_tags
+from app import doc_cache
 
 logger = logging.getLogger(__name__)
 
+
+def _invalidates_document(method):
+    """Entfernt das Dokument (erstes Argument) nach dem Commit aus dem doc_cache"""
+    @functools.wraps(method)
+    def wrapper(self, document_id, *args, **kwargs):
+        try:
+            return method(self, document_id, *args, **kwargs)
+        finally:
+            doc_cache.invalidate(document_id)
+    return wrapper
+
+
+# --- Tag-Liste ---
+# Prozesslokal gecacht; gültig solange die Redis-Version gleich bleibt (create/
+# delete erhöhen sie für alle Worker). Ohne Redis begrenzt TAG_CACHE_TTL die
+# Veraltung in anderen Worker-Prozessen.
+TAG_CACHE_TTL = 30
+_TAG_VERSION_KEY = 'tags:version'
+
+_tag_cache_lock = threading.Lock()
+_tag_cache: Dict[str, Any] = {'version': None, 'expires': 0.0, 'tags': None}
+
+
+def _tag_redis():
+    """Redis-Client falls verbunden, sonst None"""
+    from app.redis_client import RedisClient
+    client = RedisClient()
+    return client.client if client.enabled else None
+
+
+def _tag_version() -> Optional[str]:
+    redis = _tag_redis()
+    if redis is None:
+        return None
+    try:
+        return redis.get(_TAG_VERSION_KEY) or '0'
+    except Exception as e:
+        logger.error(f"Redis get error: {e}")
+        return None
+
+
+def _invalidate_tags() -> None:
+    """Verwirft die Tag-Liste lokal und (über die Version) in allen Workern"""
+    with _tag_cache_lock:
+        _tag_cache['tags'] = None
+    redis = _tag_redis()
+    if redis is not None:
+        try:
+            redis.incr(_TAG_VERSION_KEY)
+        except Exception as e:
+            logger.error(f"Redis incr error: {e}")
+
+
+# --- Statements für search_documents/count_documents ---
+# Ein Statement pro Filter-Kombination (Bitmaske), einmal gebaut und mit Bind-Parametern
+# wiederverwendet -> kein Query-Aufbau pro Request, SQLAlchemy-Compile-Cache trifft immer
+
+# Felder die update_returning setzen darf
+_UPDATABLE_FIELDS = frozenset(('filename', 'category', 'subcategory', 'date_document', 'summary', 'amount'))
+
+_F_CATEGORY, _F_START, _F_END, _F_YEAR, _F_QUERY = 1, 2, 4, 8, 16
+
+
+def _filter_params(query, category, start_date, end_date, year) -> tuple:
+    """Bitmaske der gesetzten Filter + Bind-Parameter"""
+    mask = 0
+    params = {}
+    if category:
+        mask |= _F_CATEGORY
+        params['category'] = category
+    if start_date:
+        mask |= _F_START
+        params['start_date'] = start_date
+    if end_date:
+        mask |= _F_END
+        params['end_date'] = end_date
+    if year:
+        # Bereichsfilter statt strftime() -> idx_cat_date (category, date_document) nutzbar
+        mask |= _F_YEAR
+        params['year_start'] = datetime(year, 1, 1)
+        params['year_end'] = datetime(year + 1, 1, 1)
+    if query:
+        mask |= _F_QUERY
+        params['search'] = f"%{query}%"
+    return mask, params
+
+
+def _photo_date_range(year: int, month: Optional[int], day: Optional[int]) -> tuple:
+    """[Start, Ende) für Jahr / Monat / Tag - Bereich auf idx_photo_date_mtime"""
+    if month and day:
+        start = datetime(year, month, day)
+        return start, start + timedelta(days=1)
+    if month:
+        start = datetime(year, month, 1)
+        return start, datetime(year + month // 12, month % 12 + 1, 1)
+    return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+
+
+def _filter_clauses(mask: int) -> list:
+    """WHERE-Bedingungen für eine Filter-Bitmaske"""
+    clauses = []
+    if mask & _F_CATEGORY:
+        clauses.append(Document.category == bindparam('category'))
+    if mask & _F_START:
+        clauses.append(Document.date_document >= bindparam('start_date'))
+    if mask & _F_END:
+        clauses.append(Document.date_document <= bindparam('end_date'))
+    if mask & _F_YEAR:
+        clauses.append(Document.date_document >= bindparam('year_start'))
+        clauses.append(Document.date_document < bindparam('year_end'))
+    if mask & _F_QUERY:
+        search = bindparam('search')
+        clauses.append(or_(
+            Document.filename.ilike(search),
+            Document.summary.ilike(search),
+            Document.keywords.ilike(search)
+        ))
+    return clauses
+
+
+@functools.lru_cache(maxsize=None)
+def _search_stmt(mask: int):
+    """Seiten-Query (Tags per selectinload statt N+1 Lazy-Loads)"""
+    return (
+        select(Document)
+        .where(*_filter_clauses(mask))
+        .options(selectinload(Document.tags))
+        .order_by(desc(Document.date_added))
+        .limit(bindparam('limit'))
+        .offset(bindparam('offset'))
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _count_stmt(mask: int):
+    """COUNT(*) mit derselben WHERE-Klausel wie _search_stmt"""
+    return select(func.count(Document.id)).where(*_filter_clauses(mask))
+
+
 class Database:
     """SQLAlchemy Database Manager"""
 
@@ -77,7 +222,8 @@ class Database:
                 doc_id = doc.id
                 
                 logger.info(f"Dokument hinzugefügt: {filepath} (ID {doc_id})")
-                return doc_id
+            doc_cache.invalidate_lists()
+            return doc_id
 
         except Exception as e:
             logger.error(f"Fehler beim Hinzufügen des Dokuments: {e}")
@@ -102,6 +248,7 @@ class Database:
         """Gibt eine DB-Session zurück (Context Manager)"""
         return get_db()
 
+    @_invalidates_document
     def delete_document(self, doc_id: int) -> bool:
         """Löscht ein Dokument"""
         try:
@@ -115,6 +262,75 @@ class Database:
             logger.error(f"Fehler beim Löschen von Doc {doc_id}: {e}")
             return False
 
+    @_invalidates_document
+    def delete_returning(self, doc_id: int) -> Optional[dict]:
+        """
+        Löscht ein Dokument in einer Transaktion ohne es vorher zu laden
+
+        DELETE ... RETURNING statt SELECT + ORM-Delete. Tag-Zuordnungen und
+        Audit-Logs werden wie beim ORM-Cascade mitgelöscht.
+
+        Args:
+            doc_id: Dokument-ID
+
+        Returns:
+            {'filepath', 'filename'} des gelöschten Dokuments, None wenn nicht vorhanden
+
+        Raises:
+            SQLAlchemyError: DB-Fehler (z.B. gesperrt) - nicht als "nicht gefunden" melden
+        """
+        with get_db() as session:
+            session.execute(delete(document_tags).where(document_tags.c.document_id == doc_id))
+            session.execute(delete(AuditLog).where(AuditLog.document_id == doc_id))
+            row = session.execute(
+                delete(Document)
+                .where(Document.id == doc_id)
+                .returning(Document.filepath, Document.filename)
+            ).first()
+            if row is None:
+                session.rollback()
+                return None
+            return {'filepath': row.filepath, 'filename': row.filename}
+
+    @_invalidates_document
+    def update_returning(self, doc_id: int, data: dict) -> Optional[dict]:
+        """
+        Aktualisiert Metadaten und liefert das Dokument in einem Statement zurück
+
+        UPDATE ... RETURNING statt SELECT + UPDATE + SELECT. Ohne Änderungen
+        wird das Dokument nur geladen.
+
+        Args:
+            doc_id: Dokument-ID
+            data: Zu ändernde Felder (siehe _UPDATABLE_FIELDS)
+
+        Returns:
+            Aktualisiertes Dokument als Dict, None wenn nicht vorhanden
+
+        Raises:
+            ValueError: date_document ist kein ISO-Datum
+            SQLAlchemyError: DB-Fehler (z.B. gesperrt) - nicht als "nicht gefunden" melden
+        """
+        values = {k: v for k, v in data.items() if k in _UPDATABLE_FIELDS}
+        if isinstance(values.get('date_document'), str):
+            # ValueError bewusst nicht abfangen - ein ungültiges Datum wird abgelehnt, nicht verworfen
+            values['date_document'] = datetime.fromisoformat(values['date_document'])
+
+        with get_db() as session:
+            if values:
+                doc = session.execute(
+                    update(Document)
+                    .where(Document.id == doc_id)
+                    .values(**values)
+                    .returning(Document)
+                ).scalar_one_or_none()
+            else:
+                doc = session.get(Document, doc_id)
+            if doc is None:
+                return None
+            return self._doc_to_dict(doc)
+
+    @_invalidates_document
     def update_document(self, doc_id: int, data: dict) -> bool:
         """Aktualisiert Dokument-Metadaten"""
         try:
@@ -157,42 +373,33 @@ class Database:
     ) -> List[dict]:
         """Einfache Suche"""
         try:
+            mask, params = _filter_params(query, category, start_date, end_date, year)
+            params['limit'] = limit
+            params['offset'] = offset
             with get_db() as session:
-                q = session.query(Document)
-
-                if category:
-                    q = q.filter(Document.category == category)
-
-                if start_date:
-                    q = q.filter(Document.date_document >= start_date)
-
-                if end_date:
-                    q = q.filter(Document.date_document <= end_date)
-                    
-                if year:
-                    # SQLite specific or generic year filtering
-                    # extract('year', Document.date_document) == year
-                    q = q.filter(func.strftime('%Y', Document.date_document) == str(year))
-
-                if query:
-                    search = f"%{query}%"
-                    q = q.filter(or_(
-                        Document.filename.ilike(search),
-                        Document.summary.ilike(search),
-                        Document.keywords.ilike(search)
-                    ))
-
-                q = q.order_by(desc(Document.date_added)).limit(limit).offset(offset)
-                
-                results = []
-                for doc in q.all():
-                    results.append(self._doc_to_dict(doc))
-                
-                return results
+                docs = session.execute(_search_stmt(mask), params).scalars().all()
+                return [self._doc_to_dict(doc) for doc in docs]
         except Exception as e:
             logger.error(f"Fehler bei der Suche: {e}")
             return []
 
+    def count_documents(
+        self,
+        query: Optional[str] = None,
+        category: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        year: Optional[int] = None
+    ) -> int:
+        """Anzahl Treffer für search_documents (SELECT COUNT(*), ohne Zeilen zu laden)"""
+        try:
+            mask, params = _filter_params(query, category, start_date, end_date, year)
+            with get_db() as session:
+                return session.execute(_count_stmt(mask), params).scalar() or 0
+        except Exception as e:
+            logger.error(f"Fehler beim Zählen: {e}")
+            return 0
+
     def search_documents_advanced(
         self,
         query: Optional[str] = None,
@@ -249,16 +456,24 @@ class Database:
     # --- Tags ---
 
     def create_tag(self, name: str, color: str = '#808080') -> Optional[int]:
-        """Erstellt neuen Tag"""
+        """
+        Erstellt Tag oder liefert die ID des vorhandenen (Name case-insensitiv)
+        
+        INSERT ... ON CONFLICT DO NOTHING auf dem Unique-Index von name -
+        keine Tag-Liste laden, parallele Anlage desselben Namens ist sicher.
+        """
         try:
             with get_db() as session:
                 name = name.lower()
-                tag = session.query(Tag).filter_by(name=name).first()
-                if not tag:
-                    tag = Tag(name=name, color=color)
-                    session.add(tag)
-                    session.flush()
-                return tag.id
+                inserted = session.execute(
+                    sqlite_insert(Tag)
+                    .values(name=name, color=color)
+                    .on_conflict_do_nothing(index_elements=[Tag.name])
+                ).rowcount
+                tag_id = session.execute(select(Tag.id).where(Tag.name == name)).scalar_one()
+            if inserted:
+                _invalidate_tags()
+            return tag_id
         except Exception as e:
             logger.error(f"Fehler beim Erstellen von Tag: {e}")
             return None
@@ -268,23 +483,39 @@ class Database:
         try:
             with get_db() as session:
                 tag = session.get(Tag, tag_id)
-                if tag:
-                    session.delete(tag)
-                    return True
-                return False
+                if not tag:
+                    return False
+                session.delete(tag)
+            _invalidate_tags()
+            # Tag steckt in beliebig vielen gecachten Dokumenten
+            doc_cache.clear()
+            return True
         except Exception as e:
             logger.error(f"Fehler beim Löschen von Tag: {e}")
             return False
 
     def get_all_tags(self) -> List[dict]:
-        """Holt alle Tags"""
+        """Holt alle Tags (prozesslokal gecacht, siehe TAG_CACHE_TTL)"""
+        version = _tag_version()
+        with _tag_cache_lock:
+            tags = _tag_cache['tags']
+            if tags is not None and _tag_cache['version'] == version and (
+                version is not None or _tag_cache['expires'] > time.monotonic()
+            ):
+                # Kopien - Aufrufer dürfen die Dicts verändern, ohne den Cache zu treffen
+                return [dict(t) for t in tags]
+        
         try:
             with get_db() as session:
-                tags = session.query(Tag).order_by(Tag.name).all()
-                return [{'id': t.id, 'name': t.name, 'color': t.color} for t in tags]
+                rows = session.execute(select(Tag.id, Tag.name, Tag.color).order_by(Tag.name)).all()
+                tags = [{'id': row.id, 'name': row.name, 'color': row.color} for row in rows]
         except Exception as e:
             logger.error(f"Fehler beim Laden aller Tags: {e}")
             return []
+        
+        with _tag_cache_lock:
+            _tag_cache.update(version=version, expires=time.monotonic() + TAG_CACHE_TTL, tags=tags)
+        return [dict(t) for t in tags]
 
     def get_document_tags(self, document_id: int) -> List[dict]:
         """Holt Tags für Dokument"""
@@ -301,6 +532,7 @@ class Database:
     # Alias for compatibility
     get_tags = get_document_tags
 
+    @_invalidates_document
     def add_tag_to_document(self, document_id: int, tag_id: int) -> bool:
         """Fügt existierenden Tag zu Dokument hinzu"""
         try:
@@ -317,6 +549,7 @@ class Database:
             logger.error(f"Fehler beim Hinzufügen von Tag zu Doc: {e}")
             return False
 
+    @_invalidates_document
     def add_tag(self, document_id: int, tag_name: str) -> Optional[int]:
         """Legacy: Fügt Tag per Name hinzu (erstellt wenn nötig)"""
         try:
@@ -328,19 +561,23 @@ class Database:
                 tag_name = tag_name.lower()
                 tag = session.query(Tag).filter_by(name=tag_name).first()
                 
-                if not tag:
+                created = tag is None
+                if created:
                     tag = Tag(name=tag_name)
                     session.add(tag)
                 
                 if tag not in doc.tags:
                     doc.tags.append(tag)
-                    session.commit()
-                    return tag.id
-                return tag.id
+                session.flush()
+                tag_id = tag.id
+            if created:
+                _invalidate_tags()
+            return tag_id
         except Exception as e:
             logger.error(f"Fehler beim Hinzufügen von Tag: {e}")
             return None
 
+    @_invalidates_document
     def remove_tag_from_document(self, document_id: int, tag_id: int) -> bool:
         """Entfernt Tag von Dokument"""
         try:
@@ -405,6 +642,112 @@ class Database:
             logger.error(f"Fehler beim Löschen der Suche: {e}")
             return False
 
+    # --- Photos ---
+
+    def add_photo(self, path: str, date: datetime, mtime: float, size: int):
+        """Nimmt ein Foto in den Index auf (ersetzt einen bestehenden Eintrag)"""
+        with get_db() as session:
+            session.execute(self._photo_upsert(), [self._photo_row(path, date, mtime, size)])
+
+    def delete_photo(self, path: str) -> bool:
+        """Entfernt ein Foto aus dem Index"""
+        with get_db() as session:
+            return session.execute(delete(Photo).where(Photo.path == path)).rowcount > 0
+
+    def reconcile_photos(self, rows: List[tuple], exists: Callable[[str], bool]) -> tuple:
+        """
+        Gleicht den Foto-Index mit einem Scan des Dateibaums ab
+
+        Neue und geänderte Fotos (mtime/size) werden per Upsert übernommen,
+        unveränderte nicht angefasst. Gelöscht werden nur Index-Pfade, die
+        nicht im Scan vorkommen und auch nicht mehr auf der Platte liegen -
+        ein während des Scans hochgeladenes (add_photo) Foto bleibt erhalten,
+        ein während des Scans gelöschtes wird nicht wieder eingefügt.
+
+        Args:
+            rows: Liste von (path, date, mtime, size) aus dem Scan
+            exists: Prüft, ob ein Index-Pfad (relativ) noch existiert
+
+        Returns:
+            (Anzahl übernommener, Anzahl entfernter Fotos)
+        """
+        scanned = {row[0]: row for row in rows}
+        with get_db() as session:
+            indexed = {
+                r.path: (r.mtime, r.size)
+                for r in session.execute(select(Photo.path, Photo.mtime, Photo.size))
+            }
+            changed = [
+                row for path, row in scanned.items()
+                if indexed.get(path) != (row[2], row[3]) and (path in indexed or exists(path))
+            ]
+            removed = [path for path in indexed.keys() - scanned.keys() if not exists(path)]
+
+            if changed:
+                session.execute(self._photo_upsert(), [self._photo_row(*row) for row in changed])
+            # IN-Liste in Blöcken (SQLite-Limit für Bind-Parameter)
+            for i in range(0, len(removed), 500):
+                session.execute(delete(Photo).where(Photo.path.in_(removed[i:i + 500])))
+        return len(changed), len(removed)
+
+    def list_photos(
+        self,
+        year: Optional[int] = None,
+        month: Optional[int] = None,
+        day: Optional[int] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> tuple:
+        """
+        Fotos aus dem Index, neueste zuerst
+
+        Jahr/Monat/Tag als Datumsbereich: Filter und ORDER BY laufen über
+        idx_photo_date_mtime (rückwärts), SQLite sortiert nicht und bricht
+        nach LIMIT ab.
+
+        Returns:
+            (Liste von Dicts mit path/date/mtime/size, Gesamtanzahl)
+        """
+        clauses = []
+        if year:
+            try:
+                start, end = _photo_date_range(year, month, day)
+            except ValueError:
+                # Ungültiges Datum (z.B. Monat 13) -> keine Treffer
+                return [], 0
+            clauses.append(Photo.date >= start)
+            clauses.append(Photo.date < end)
+
+        with get_db() as session:
+            total = session.execute(
+                select(func.count(Photo.id)).where(*clauses)
+            ).scalar() or 0
+            rows = session.execute(
+                select(Photo.path, Photo.date, Photo.mtime, Photo.size)
+                .where(*clauses)
+                .order_by(Photo.date.desc(), Photo.mtime.desc())
+                .limit(limit)
+                .offset(offset)
+            ).all()
+
+        return [{'path': r.path, 'date': r.date, 'mtime': r.mtime, 'size': r.size} for r in rows], total
+
+    @staticmethod
+    def _photo_upsert():
+        """INSERT ... ON CONFLICT(path) DO UPDATE - ein Statement für neu und geändert"""
+        stmt = sqlite_insert(Photo)
+        return stmt.on_conflict_do_update(
+            index_elements=[Photo.path],
+            set_={
+                column: stmt.excluded[column]
+                for column in ('date', 'mtime', 'size')
+            }
+        )
+
+    @staticmethod
+    def _photo_row(path: str, date: datetime, mtime: float, size: int) -> dict:
+        return {'path': path, 'date': date, 'mtime': mtime, 'size': size}
+
     # --- Budgets & Stats ---
 
     def set_budget(self, category: str, month: str, amount: float) -> bool:
@@ -540,6 +883,27 @@ class Database:
         except Exception as e:
             logger.error(f"Fehler beim Audit Log: {e}")
 
+    def log_audit_events_bulk(self, rows: List[tuple]):
+        """
+        Audit Log - mehrere Events in einer Transaktion (executemany)
+
+        Args:
+            rows: Liste von (user_id, action, resource_id, details, timestamp)
+        """
+        if not rows:
+            return
+        with get_db() as session:
+            session.execute(insert(AuditLog), [
+                {
+                    'user_id': user_id,
+                    'action': action,
+                    'document_id': int(resource_id) if resource_id and str(resource_id).isdigit() else None,
+                    'details': json.dumps(details) if details else None,
+                    'timestamp': datetime.utcfromtimestamp(ts)
+                }
+                for user_id, action, resource_id, details, ts in rows
+            ])
+
     def _doc_to_dict(self, doc: Document) -> dict:
         """Helper to convert Document model to dict"""
         try:
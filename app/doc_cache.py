@@ -0,0 +1,189 @@
+"""
+Document Cache - Metadaten-Cache für get_document
+Redis (zwischen Workern geteilt, invalidate wirkt sofort überall); ohne Redis
+ein In-Process LRU (Fallback für den Einzelprozess-Betrieb)
+
+Redis-Einträge tragen die Version (global.dokument), unter der sie gelesen
+wurden; invalidate erhöht die Version. Ein Leser, der vor dem invalidate aus
+der DB gelesen hat, speichert so höchstens einen Eintrag mit alter Version,
+der beim nächsten Lesen als Miss gilt.
+
+Zusätzlich fertig serialisierte list_documents-Antworten in Redis. Jede
+Dokument-Änderung erhöht eine Epoche, alte Listen-Keys laufen per TTL aus.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Einträge im lokalen LRU bzw. Gültigkeit (Sekunden)
+LOCAL_MAXSIZE = 4096
+LOCAL_TTL = 60
+REDIS_TTL = 300
+LIST_TTL = 45
+
+_LIST_EPOCH_KEY = 'doclist:epoch'
+# Nicht unter 'doc:*', damit clear() die Versionen nicht zurücksetzt
+_VERSION_ALL_KEY = 'docver:all'
+
+_lock = threading.Lock()
+_local: "OrderedDict[int, tuple]" = OrderedDict()
+
+
+def _key(doc_id: int) -> str:
+    return f"doc:{doc_id}"
+
+
+def _version_key(doc_id: int) -> str:
+    return f"docver:{doc_id}"
+
+
+def _redis():
+    """RedisClient falls verbunden, sonst None"""
+    from app.redis_client import RedisClient
+    client = RedisClient()
+    return client if client.enabled else None
+
+
+def _local_get(doc_id: int) -> Optional[Dict[str, Any]]:
+    with _lock:
+        entry = _local.get(doc_id)
+        if entry is None:
+            return None
+        expires, document = entry
+        if expires < time.monotonic():
+            del _local[doc_id]
+            return None
+        _local.move_to_end(doc_id)
+        return dict(document)
+
+
+def _local_set(doc_id: int, document: Dict[str, Any]) -> None:
+    with _lock:
+        _local[doc_id] = (time.monotonic() + LOCAL_TTL, dict(document))
+        _local.move_to_end(doc_id)
+        if len(_local) > LOCAL_MAXSIZE:
+            _local.popitem(last=False)
+
+
+def get_document(db, doc_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Holt Dokument-Metadaten aus dem Cache, sonst aus der DB
+
+    Args:
+        db: Database-Instanz
+        doc_id: Dokument-ID
+
+    Returns:
+        Dokument-Dict (eigene Kopie je Aufrufer) oder None
+        (nicht gefundene IDs werden nicht gecacht)
+    """
+    redis = _redis()
+    if redis is not None:
+        # Kein lokaler LRU vor Redis: ein invalidate in einem anderen Worker
+        # muss beim nächsten Lesen sichtbar sein. Version vor der DB-Abfrage
+        # lesen (ein Roundtrip zusammen mit dem Eintrag)
+        all_version, doc_version, cached = redis.get_many_raw(
+            [_VERSION_ALL_KEY, _version_key(doc_id), _key(doc_id)]
+        )
+        version = f"{all_version or 0}.{doc_version or 0}"
+        if cached:
+            try:
+                entry = json.loads(cached)
+            except json.JSONDecodeError:
+                entry = None
+            if isinstance(entry, dict) and entry.get('v') == version:
+                return entry['doc']
+        document = db.get_document(doc_id)
+        if document is not None:
+            redis.set(_key(doc_id), {'v': version, 'doc': document}, expire=REDIS_TTL)
+        return document
+
+    document = _local_get(doc_id)
+    if document is not None:
+        return document
+
+    document = db.get_document(doc_id)
+    if document is not None:
+        _local_set(doc_id, document)
+    return document
+
+
+def invalidate(doc_id: int) -> None:
+    """Entfernt ein Dokument aus beiden Cache-Tiers (nach Update/Delete/Tag-Änderung)"""
+    with _lock:
+        _local.pop(doc_id, None)
+    redis = _redis()
+    if redis is not None:
+        _bump(redis, _version_key(doc_id))
+        redis.delete(_key(doc_id))
+        _bump_list_epoch(redis)
+
+
+def clear() -> None:
+    """Leert den Cache komplett (z.B. wenn ein Tag gelöscht wird)"""
+    with _lock:
+        _local.clear()
+    redis = _redis()
+    if redis is not None:
+        _bump(redis, _VERSION_ALL_KEY)
+        redis.delete_pattern('doc:*')
+        _bump_list_epoch(redis)
+
+
+def _bump(redis, key: str) -> None:
+    try:
+        redis.client.incr(key)
+    except Exception as e:
+        logger.error(f"Redis incr error: {e}")
+
+
+def _bump_list_epoch(redis) -> None:
+    _bump(redis, _LIST_EPOCH_KEY)
+
+
+def invalidate_lists() -> None:
+    """Verwirft alle gecachten Listen (z.B. nach add_document)"""
+    redis = _redis()
+    if redis is not None:
+        _bump_list_epoch(redis)
+
+
+def lookup_list(query_string: bytes) -> Tuple[Optional[str], Optional[bytes]]:
+    """
+    Sucht eine gecachte list_documents-Antwort
+
+    Args:
+        query_string: request.query_string (roh, bestimmt den Key)
+
+    Returns:
+        (cache_key, body) - body None bei Miss, cache_key None ohne Redis
+    """
+    redis = _redis()
+    if redis is None:
+        return None, None
+    try:
+        epoch = redis.client.get(_LIST_EPOCH_KEY) or '0'
+        key = f"doclist:{epoch}:{hashlib.blake2s(query_string, digest_size=16).hexdigest()}"
+        body = redis.client.get(key)
+        return key, body.encode('utf-8') if body is not None else None
+    except Exception as e:
+        logger.error(f"Redis get error: {e}")
+        return None, None
+
+
+def store_list(key: str, body: bytes) -> None:
+    """Legt eine serialisierte list_documents-Antwort für LIST_TTL Sekunden ab"""
+    redis = _redis()
+    if redis is None:
+        return
+    try:
+        redis.client.set(key, body, ex=LIST_TTL)
+    except Exception as e:
+        logger.error(f"Redis set error: {e}")
@@ -25,6 +25,14 @@ from langdetect import detect
 
 logger = logging.getLogger(__name__)
 
+# Geldbeträge: 1.234,56 € | € 1.234,56 | EUR 1.234,56 | 1.234,56 EUR
+# Eine Alternation statt vier Einzel-Scans; Währung hinter dem Betrag per Lookahead,
+# damit "10,00 € 20,00" weiterhin beide Beträge liefert
+_AMOUNT = r'\d{1,3}(?:\.\d{3})*,\d{2}'
+_AMOUNT_RE = re.compile(
+    rf'({_AMOUNT})(?=\s*(?:€|EUR))|(?:€|EUR)\s*({_AMOUNT})'
+)
+
 
 class DocumentProcessor:
     """Verarbeitet gescannte Dokumente mit OCR und Text-Extraktion"""
@@ -393,26 +401,17 @@ class DocumentProcessor:
         """
         amounts = []
         
-        # Patterns für Geldbeträge
-        patterns = [
-            r'(\d{1,3}(?:\.\d{3})*,\d{2})\s*€',  # 1.234,56 €
-            r'€\s*(\d{1,3}(?:\.\d{3})*,\d{2})',  # € 1.234,56
-            r'EUR\s*(\d{1,3}(?:\.\d{3})*,\d{2})',  # EUR 1.234,56
-            r'(\d{1,3}(?:\.\d{3})*,\d{2})\s*EUR',  # 1.234,56 EUR
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                try:
-                    # German format -> float
-                    amount_str = match.replace('.', '').replace(',', '.')
-                    amount = float(amount_str)
-                    if amount not in amounts:
-                        amounts.append(amount)
-                except (ValueError, TypeError) as e:
-                    logger.debug(f"Betrag-Parsing fehlgeschlagen für '{match}': {e}")
-                    pass
+        for trailing, leading in _AMOUNT_RE.findall(text):
+            match = trailing or leading
+            try:
+                # German format -> float
+                amount_str = match.replace('.', '').replace(',', '.')
+                amount = float(amount_str)
+                if amount not in amounts:
+                    amounts.append(amount)
+            except (ValueError, TypeError) as e:
+                logger.debug(f"Betrag-Parsing fehlgeschlagen für '{match}': {e}")
+                pass
         
         return sorted(amounts, reverse=True)  # Größte zuerst
     
@@ -8,7 +8,9 @@ import pandas as pd
 import io
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, BinaryIO, Iterable
+
+import xlsxwriter
 
 # ReportLab für PDF
 from reportlab.lib import colors
@@ -18,6 +20,16 @@ from reportlab.lib.styles import getSampleStyleSheet
 
 logger = logging.getLogger(__name__)
 
+
+def _chunk_values(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Konvertiert einen Block einmalig in Python-Objekte (NaN -> '')
+    
+    xlsxwriter prüft pro Zelle den Typ - mit int/float/str statt numpy-Skalaren
+    und pd.isna pro Wert bleibt die Zeilenschleife minimal.
+    """
+    return chunk.astype(object).where(chunk.notna(), '')
+
 class DataExporter:
     def __init__(self):
         pass
@@ -25,26 +37,14 @@ class DataExporter:
     def export_to_excel(self, data: List[Dict], filename: str = "export.xlsx") -> io.BytesIO:
         """
         Exportiert Daten nach Excel
+        Zeilenweise über write_excel_chunks statt pd.ExcelWriter (hält sonst
+        jede Zelle bis zum Speichern im Workbook)
         Returns: BytesIO Object
         """
         output = io.BytesIO()
         
         try:
-            df = pd.DataFrame(data)
-            
-            # Excel Writer
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df.to_excel(writer, sheet_name='Dokumente', index=False)
-                
-                # Auto-adjust columns
-                worksheet = writer.sheets['Dokumente']
-                for i, col in enumerate(df.columns):
-                    max_len = max(
-                        df[col].astype(str).map(len).max(),
-                        len(str(col))
-                    ) + 2
-                    worksheet.set_column(i, i, max_len)
-                    
+            self.write_excel_chunks([pd.DataFrame(data)], output)
             output.seek(0)
             return output
             
@@ -52,6 +52,52 @@ class DataExporter:
             logger.error(f"Excel Export Fehler: {e}")
             raise
 
+    def write_excel_chunks(self, chunks: Iterable[pd.DataFrame], output: BinaryIO) -> bool:
+        """
+        Schreibt DataFrame-Blöcke zeilenweise als Excel (xlsxwriter constant_memory)
+        
+        Speicherbedarf O(Zeile) statt O(Datensatz) - pandas.to_excel schreibt
+        spaltenweise und ist daher nicht mit constant_memory kombinierbar.
+        
+        Args:
+            chunks: DataFrames mit identischen Spalten
+            output: Beschreibbares Binär-File (z.B. SpooledTemporaryFile)
+            
+        Returns:
+            False wenn keine Zeilen geschrieben wurden
+        """
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'in_memory': False})
+        worksheet = workbook.add_worksheet('Dokumente')
+        widths: List[int] = []
+        row = 0
+        
+        try:
+            for chunk in chunks:
+                # Kopfzeile auch ohne Datenzeilen (leerer DataFrame mit Spalten)
+                if row == 0 and len(chunk.columns):
+                    headers = [str(col) for col in chunk.columns]
+                    worksheet.write_row(0, 0, headers)
+                    widths = [len(h) for h in headers]
+                    row = 1
+                if chunk.empty:
+                    continue
+                
+                values = _chunk_values(chunk)
+                for i, width in enumerate(values.astype(str).apply(lambda s: s.str.len().max())):
+                    widths[i] = max(widths[i], int(width))
+                
+                for row_values in values.to_numpy().tolist():
+                    worksheet.write_row(row, 0, row_values)
+                    row += 1
+            
+            # Auto-adjust columns
+            for i, width in enumerate(widths):
+                worksheet.set_column(i, i, width + 2)
+        finally:
+            workbook.close()
+        
+        return row > 1
+
     def export_to_pdf(self, data: List[Dict], title: str = "Dokumenten-Bericht") -> io.BytesIO:
         """
         Exportiert Daten als PDF Tabelle
@@ -0,0 +1,101 @@
+"""
+App Extensions - App-weite Singletons in current_app.extensions
+Werden beim ersten Zugriff erzeugt und über Requests hinweg geteilt
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+
+# Obergrenze für blockierende I/O-Threads (Ollama, Suche)
+IO_POOL_WORKERS = 8
+
+
+def get_extension(name: str, factory: Callable[[], Any]) -> Any:
+    """
+    Liefert ein App-Singleton, erzeugt es beim ersten Aufruf
+
+    Args:
+        name: Schlüssel in app.extensions
+        factory: Erzeugt die Instanz (nur einmal aufgerufen)
+
+    Returns:
+        Geteilte Instanz
+    """
+    extensions = current_app.extensions
+    instance = extensions.get(name)
+    if instance is None:
+        with _lock:
+            instance = extensions.get(name)
+            if instance is None:
+                instance = factory()
+                extensions[name] = instance
+                logger.debug(f"Extension '{name}' initialisiert")
+    return instance
+
+
+def get_ollama():
+    """Geteilter OllamaClient (Config + HTTP-Session nur einmal)"""
+    from app.ollama_client import OllamaClient
+    return get_extension('ollama', OllamaClient)
+
+
+def get_search_engine():
+    """Geteilte SearchEngine (von init_app bereits indexiert)"""
+    from app.search_engine import SearchEngine
+    return get_extension('search', SearchEngine)
+
+
+def get_database():
+    """Geteilte Database (Config + create_all nur einmal, Sessions aus dem Engine-Pool)"""
+    from app.database import Database
+    return get_extension('database', Database)
+
+
+def get_data_extractor():
+    """Geteilter DataExtractor (config.yaml nur einmal lesen, danach zustandslos)"""
+    from app.data_extractor import DataExtractor
+    return get_extension('data_extractor', DataExtractor)
+
+
+def get_statistics_engine():
+    """Geteilte StatisticsEngine (mit der geteilten Database für Budgets)"""
+    from app.statistics_engine import StatisticsEngine
+    return get_extension('statistics', lambda: StatisticsEngine(db=get_database()))
+
+
+def get_io_pool() -> ThreadPoolExecutor:
+    """Begrenzter Thread-Pool für blockierende I/O aus async Views"""
+    return get_extension(
+        'io_pool',
+        lambda: ThreadPoolExecutor(max_workers=IO_POOL_WORKERS, thread_name_prefix='io')
+    )
+
+
+async def run_io(func: Callable, *args: Any) -> Any:
+    """
+    Führt blockierende Funktion im io_pool aus (statt asyncio.to_thread)
+
+    Der Kontext (current_app, request) wird wie bei to_thread mitgegeben.
+
+    Args:
+        func: Blockierende Funktion
+        *args: Argumente für func
+
+    Returns:
+        Rückgabewert von func
+    """
+    pool = get_io_pool()
+    ctx = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, functools.partial(ctx.run, func, *args))
@@ -0,0 +1,98 @@
+"""
+JSON Provider - orjson-basierte Serialisierung für Flask
+Fällt automatisch auf den Standard-Provider (stdlib json) zurück
+"""
+
+import logging
+from typing import Any, Union
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+# Try to import orjson (Rust-native JSON)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.warning("⚠️ orjson not available, using stdlib json")
+
+# Keyword-Argumente die orjson abbilden kann (Rest -> stdlib Fallback)
+_SUPPORTED_KWARGS = frozenset(('indent', 'separators', 'sort_keys'))
+
+if ORJSON_AVAILABLE:
+    # datetime/date über default() leiten, damit das Format identisch zu Flask bleibt (HTTP-Date)
+    _BASE_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_SERIALIZE_NUMPY
+        | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON-Provider auf Basis von orjson
+
+    Verhält sich wie der Flask-Standard (inkl. sort_keys/compact),
+    serialisiert aber ohne Python-Encoder-Dispatch pro Key.
+    """
+
+    def _options(self, indent: Any = None, sort_keys: bool = False) -> int:
+        option = _BASE_OPTIONS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps_bytes(self, obj: Any, **kwargs: Any) -> bytes:
+        """
+        Serialisiert direkt zu UTF-8 Bytes (ohne str-Umweg)
+
+        Args:
+            obj: Zu serialisierendes Objekt
+
+        Returns:
+            JSON als Bytes
+        """
+        if not ORJSON_AVAILABLE or kwargs.keys() - _SUPPORTED_KWARGS:
+            return super().dumps(obj, **kwargs).encode('utf-8')
+
+        option = self._options(kwargs.get('indent'), kwargs.get('sort_keys', self.sort_keys))
+        try:
+            return orjson.dumps(obj, default=self.default, option=option)
+        except TypeError:
+            # z.B. Integer > 64 Bit - stdlib json kann das
+            return super().dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialisiert zu JSON-String"""
+        if not ORJSON_AVAILABLE:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj, **kwargs).decode('utf-8')
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        """Deserialisiert JSON"""
+        if not ORJSON_AVAILABLE or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """
+        Baut die jsonify()-Antwort direkt aus Bytes
+
+        Der Standard-Provider geht über dumps() -> str -> erneutes UTF-8
+        Encoding im Response-Objekt; bei großen Listen (Fotos, Suchtreffer)
+        kostet das eine zweite Kopie des gesamten Payloads.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        dump_args: dict = {}
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            dump_args['indent'] = 2
+        else:
+            dump_args['separators'] = (',', ':')
+        return self._app.response_class(
+            self.dumps_bytes(obj, **dump_args) + b'\n', mimetype=self.mimetype
+        )
@@ -1,9 +1,12 @@
 """
 Logging Configuration
 Rotating file handler mit strukturiertem Logging
+Handler laufen asynchron hinter einer Queue (QueueHandler/QueueListener)
 """
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import os
 from pathlib import Path
 
@@ -58,10 +61,16 @@ def setup_logging(app):
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(file_formatter)
     
-    # Add handlers
-    app.logger.addHandler(console_handler)
-    app.logger.addHandler(file_handler)
-    app.logger.addHandler(error_handler)
+    # Add handlers - Formatierung/Datei-I/O im Listener-Thread statt im Request
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(
+        log_queue, console_handler, file_handler, error_handler,
+        respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    app.extensions['log_listener'] = listener
+    app.logger.addHandler(QueueHandler(log_queue))
     
     # Log application startup
     app.logger.info('='*50)
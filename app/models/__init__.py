@@ -86,3 +86,17 @@ class Budget(Base):
     month = Column(String(7), nullable=False) # YYYY-MM
     budget_amount = Column(Float, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+class Photo(Base):
+    __tablename__ = 'photos'
+
+    id = Column(Integer, primary_key=True)
+    path = Column(String(1000), nullable=False, unique=True)  # relativ zu data/Bilder (POSIX)
+    date = Column(DateTime, nullable=False)
+    mtime = Column(Float)
+    size = Column(Integer)
+
+    __table_args__ = (
+        # Datumsbereich (Jahr/Monat/Tag) + ORDER BY date, mtime ohne Sortierschritt
+        Index('idx_photo_date_mtime', 'date', 'mtime'),
+    )
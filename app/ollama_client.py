@@ -6,7 +6,8 @@ Chatbot-Funktionalität mit TinyLlama oder DeepSeek
 import logging
 import requests
 from typing import Dict, Optional, List
-import yaml
+
+from app.config_cache import get_config
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +22,7 @@ class OllamaClient:
         Args:
             config_path: Pfad zur Konfiguration
         """
-        with open(config_path, 'r', encoding='utf-8') as f:
-            self.config = yaml.safe_load(f)
+        self.config = get_config(config_path)
         
         ollama_config = self.config['ai']['ollama']
         
@@ -31,6 +31,9 @@ class OllamaClient:
         self.temperature = ollama_config.get('temperature', 0.7)
         self.max_tokens = ollama_config.get('max_tokens', 2048)
         
+        # Persistente HTTP-Session (Keep-Alive zu Ollama)
+        self.session = requests.Session()
+        
         # Check connection
         self.available = self._check_connection()
         
@@ -42,11 +45,21 @@ class OllamaClient:
     def _check_connection(self) -> bool:
         """Prüft Ollama-Verbindung"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=2)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=2)
             return response.status_code == 200
         except:
             return False
     
+    def refresh(self) -> bool:
+        """
+        Prüft die Verbindung erneut (für langlebige Instanzen)
+        
+        Returns:
+            True wenn Ollama erreichbar
+        """
+        self.available = self._check_connection()
+        return self.available
+    
     def chat(
         self,
         message: str,
@@ -72,7 +85,7 @@ class OllamaClient:
         
         try:
             # Ollama API Call
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/generate",
                 json={
                     'model': self.model,
@@ -6,7 +6,7 @@ Includes graceful fallback if Redis is not available.
 import redis
 import logging
 import json
-from typing import Optional, Any, Union
+from typing import Optional, Any, List, Union
 import os
 
 logger = logging.getLogger(__name__)
@@ -69,6 +69,26 @@ class RedisClient:
             logger.error(f"Redis get error: {e}")
             return None
 
+    def get_raw(self, key: str) -> Optional[str]:
+        """Get value from cache without JSON decoding (e.g. pre-serialized responses)"""
+        if not self.enabled or not self.client:
+            return None
+        try:
+            return self.client.get(key)
+        except Exception as e:
+            logger.error(f"Redis get error: {e}")
+            return None
+
+    def get_many_raw(self, keys: List[str]) -> List[Optional[str]]:
+        """Get several raw values in one round trip (MGET), None for misses"""
+        if not self.enabled or not self.client or not keys:
+            return [None] * len(keys)
+        try:
+            return self.client.mget(keys)
+        except Exception as e:
+            logger.error(f"Redis mget error: {e}")
+            return [None] * len(keys)
+
     def set(self, key: str, value: Any, expire: int = 3600) -> bool:
         """Set value in cache"""
         if not self.enabled or not self.client:
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field, field_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
@@ -14,14 +14,15 @@ class TagResponse(TagBase):
 
 class DocumentBase(BaseModel):
     filename: str
-    category: str
+    category: Optional[str] = None
     date_document: Optional[str] = None
     summary: Optional[str] = None
 
 class DocumentResponse(DocumentBase):
+    # Feldnamen wie Database._doc_to_dict
     id: int
-    upload_date: str
-    file_path: str
+    date_added: Optional[str] = None
+    filepath: str
     tags: List[TagResponse] = []
     
     class Config:
@@ -33,11 +34,23 @@ class DocumentUpdate(BaseModel):
     date_document: Optional[str] = None
     summary: Optional[str] = None
 
+    @field_validator('date_document')
+    @classmethod
+    def _iso_date(cls, value: Optional[str]) -> Optional[str]:
+        # Unparsbares Datum -> 400 statt stillschweigend ignoriert
+        if value is not None:
+            try:
+                datetime.fromisoformat(value)
+            except ValueError:
+                raise ValueError('date_document must be an ISO 8601 date')
+        return value
+
 class SearchQuery(BaseModel):
     query: Optional[str] = None
     category: Optional[str] = None
-    start_date: Optional[str] = None
-    end_date: Optional[str] = None
+    # date_from/date_to: Feldnamen der alten Such-API
+    start_date: Optional[str] = Field(None, validation_alias=AliasChoices('start_date', 'date_from'))
+    end_date: Optional[str] = Field(None, validation_alias=AliasChoices('end_date', 'date_to'))
     tags: Optional[List[str]] = None
     limit: int = Field(100, ge=1, le=1000)
 
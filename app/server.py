@@ -8,7 +8,6 @@ import os
 from pathlib import Path
 from typing import Optional, Dict, Any
 from dotenv import load_dotenv
-import yaml
 import time
 
 from flask import Flask, send_from_directory
@@ -26,6 +25,8 @@ from app.email_receiver import EmailReceiver
 from app.upload_handler import upload_bp
 from app.auth import auth_bp, init_auth
 from app.health import health_bp
+from app.config_cache import get_config
+from app.json_provider import OrjsonProvider
 from app.logging_config import setup_logging, log_request
 from app.security_config import setup_security, add_security_headers
 
@@ -37,6 +38,16 @@ load_dotenv()
 # Flask App
 app = Flask(__name__, static_folder='static', static_url_path='')
 
+# Große Foto-Uploads direkt in data/Bilder spoolen (siehe PhotoUploadRequest)
+from app.blueprints.photos import PhotoUploadRequest
+app.request_class = PhotoUploadRequest
+
+# JSON via orjson (Fallback auf stdlib json)
+app.json = OrjsonProvider(app)
+# Kompaktes JSON ohne Key-Sortierung (auch im Debug-Modus)
+app.json.compact = True
+app.json.sort_keys = False
+
 # Setup Logging (early!)
 logger = setup_logging(app)
 
@@ -45,6 +56,8 @@ limiter = setup_security(app)
 
 # Security Features
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-key-change-me-in-production')
+# API-Antworten gegen die Pydantic-Schemas prüfen (nur Debug/Staging)
+app.config['VALIDATE_RESPONSES'] = os.getenv('VALIDATE_RESPONSES', 'false').lower() == 'true'
 csrf = CSRFProtect(app)
 
 # Globale Objekte (mit Type Hints)
@@ -68,15 +81,25 @@ def init_app(config_path: str = 'config.yaml') -> None:
     global db, search_engine, data_extractor, config
     
     # Lade Config
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+    config = get_config(config_path)
     
     # Init Auth
     init_auth(app, config_path)
     
+    # Downloads über den Reverse-Proxy ausliefern (optional)
+    web_config = config.get('web', {})
+    app.config['X_ACCEL_REDIRECT_PREFIX'] = os.getenv('X_ACCEL_REDIRECT_PREFIX') or web_config.get('x_accel_redirect_prefix')
+    app.config['X_ACCEL_REDIRECT_ROOT'] = os.getenv('X_ACCEL_REDIRECT_ROOT') or web_config.get(
+        'x_accel_redirect_root', config.get('system', {}).get('storage', {}).get('base_path', 'data')
+    )
+    app.config['X_ACCEL_PHOTOS_PREFIX'] = os.getenv('X_ACCEL_PHOTOS_PREFIX') or web_config.get('x_accel_photos_prefix')
+    app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', str(web_config.get('use_x_sendfile', False))).lower() == 'true'
+    
     # Initialisiere Komponenten
     db = Database(config_path)
+    app.extensions['database'] = db
     search_engine = SearchEngine()
+    app.extensions['search'] = search_engine
     data_extractor = DataExtractor(config_path)
     
     # Init Redis
@@ -86,6 +109,10 @@ def init_app(config_path: str = 'config.yaml') -> None:
     # Indexiere Dokumente
     _reindex_search()
     
+    # Foto-Index mit data/Bilder abgleichen (Hintergrund-Thread)
+    from app.blueprints.photos import start_photo_index_sync
+    start_photo_index_sync(db)
+    
     # Initiale Metriken
     try:
         from app.metrics import DB_DOCUMENT_COUNT
@@ -54,21 +54,25 @@ class StatisticsEngine:
             }
         
         try:
-            df = pd.read_csv(csv_path)
+            df = pd.read_csv(csv_path, usecols=lambda c: c in ('datum', 'kategorie', 'betrag'))
             
-            # Parse Datumsangaben
-            df['datum'] = pd.to_datetime(df['datum'], errors='coerce')
-            df['month'] = df['datum'].dt.month
+            # Monat pro Zeile (0 = ungültiges Datum) und Beträge als NumPy-Arrays
+            months = pd.to_datetime(df['datum'], errors='coerce').dt.month.fillna(0).to_numpy(dtype=np.int64)
+            amounts = pd.to_numeric(df['betrag'], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
             
-            # Gruppiere nach Monat
-            monthly_totals = df.groupby('month')['betrag'].sum().to_dict()
+            # Summe + Anzahl pro Monat in je einem C-Durchlauf (bincount statt groupby)
+            sums = np.bincount(months, weights=amounts, minlength=13)
+            counts = np.bincount(months, minlength=13)
+            monthly_totals = {month: float(sums[month]) for month in range(1, 13) if counts[month]}
             
-            # Gruppiere nach Monat und Kategorie
-            monthly_categories = {}
-            for month in range(1, 13):
-                month_data = df[df['month'] == month]
-                category_sums = month_data.groupby('kategorie')['betrag'].sum().to_dict()
-                monthly_categories[month] = category_sums
+            # Monat x Kategorie in einem groupby statt einer Maske pro Monat
+            monthly_categories = {month: {} for month in range(1, 13)}
+            valid = months > 0
+            grouped = pd.Series(amounts[valid]).groupby(
+                [months[valid], df['kategorie'].to_numpy()[valid]]
+            ).sum()
+            for (month, category), total in grouped.items():
+                monthly_categories[int(month)][category] = float(total)
             
             return {
                 'year': year,
@@ -224,6 +228,61 @@ class StatisticsEngine:
             'model_score': float(model.score(X, y))
         }
     
+    def _category_totals(self, year: int) -> Dict[str, float]:
+        """
+        Summe pro Ausgaben-Kategorie eines Jahres
+        
+        Liest nur die Spalten kategorie/betrag und aggregiert in einem groupby.
+        """
+        csv_path = self.data_path / str(year) / 'rechnungen_data.csv'
+        
+        if not csv_path.exists():
+            return {}
+        
+        df = pd.read_csv(csv_path, usecols=lambda c: c in ('kategorie', 'betrag'))
+        if 'kategorie' not in df.columns or 'betrag' not in df.columns:
+            return {}
+        
+        amounts = pd.to_numeric(df['betrag'], errors='coerce')
+        return {
+            category: float(total)
+            for category, total in amounts.groupby(df['kategorie']).sum().items()
+        }
+    
+    def get_expenses_comparison(self, year1: int, year2: int) -> Dict:
+        """
+        Vergleicht Ausgaben pro Kategorie zweier Jahre
+        
+        Args:
+            year1: Erstes Jahr
+            year2: Zweites Jahr
+            
+        Returns:
+            Dictionary mit Summen und Differenz pro Kategorie
+        """
+        try:
+            totals1 = self._category_totals(year1)
+            totals2 = self._category_totals(year2)
+        except Exception as e:
+            logger.error(f"Fehler beim Ausgaben-Vergleich: {e}")
+            totals1, totals2 = {}, {}
+        
+        comparison = {}
+        for category in sorted(totals1.keys() | totals2.keys()):
+            amount1 = totals1.get(category, 0.0)
+            amount2 = totals2.get(category, 0.0)
+            comparison[category] = {
+                'year1': amount1,
+                'year2': amount2,
+                'change': round(amount2 - amount1, 2)
+            }
+        
+        return {
+            'year1': year1,
+            'year2': year2,
+            'comparison': comparison
+        }
+    
     def get_category_breakdown(self, year: int, month: Optional[int] = None) -> Dict:
         """
         Detaillierte Kategorie-Analyse
@@ -253,17 +312,19 @@ class StatisticsEngine:
             if month:
                 df = df[df['datum'].dt.month == month]
             
-            # Gruppiere nach Kategorie
-            category_data = {}
-            for category in df['kategorie'].unique():
-                cat_data = df[df['kategorie'] == category]
-                category_data[category] = {
-                    'total': float(cat_data['betrag'].sum()),
-                    'count': int(len(cat_data)),
-                    'average': float(cat_data['betrag'].mean()),
-                    'min': float(cat_data['betrag'].min()),
-                    'max': float(cat_data['betrag'].max())
+            # Gruppiere nach Kategorie - ein groupby-Durchlauf statt einer Maske pro Kategorie
+            grouped = df.groupby('kategorie')['betrag'].agg(['sum', 'size', 'mean', 'min', 'max'])
+            category_data = {
+                category: {
+                    'total': float(total),
+                    'count': int(count),
+                    'average': float(average),
+                    'min': float(minimum),
+                    'max': float(maximum)
                 }
+                for category, (total, count, average, minimum, maximum)
+                in zip(grouped.index, grouped.to_numpy().tolist())
+            }
             
             total = float(df['betrag'].sum())
             
@@ -6,12 +6,18 @@ from app.celery_app import celery_app
 from app.document_processor import DocumentProcessor
 from app.database import Database
 from app.data_extractor import DataExtractor
-from app.upload_handler import process_uploaded_file_logic  # Muss refactored werden
 import logging
+import os
+import tempfile
+import time
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Ablage für Hintergrund-Exporte (muss für Worker und Web-Server erreichbar sein)
+EXPORT_DIR = Path(os.getenv('EXPORT_DIR', Path(tempfile.gettempdir()) / 'exports'))
+EXPORT_MAX_AGE = 3600
+
 @celery_app.task(bind=True)
 def process_document_async(self, file_path: str):
     """
@@ -34,3 +40,46 @@ def process_document_async(self, file_path: str):
     except Exception as e:
         logger.error(f"Async Task failed: {e}")
         return {'status': 'error', 'error': str(e)}
+
+
+def _purge_exports() -> None:
+    """Löscht Hintergrund-Exporte älter als EXPORT_MAX_AGE"""
+    cutoff = time.time() - EXPORT_MAX_AGE
+    for path in EXPORT_DIR.glob('*.xlsx'):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+@celery_app.task(bind=True)
+def export_excel_async(self, category: str, year: int, month=None):
+    """
+    Erstellt einen Excel-Export im Hintergrund
+    
+    Returns:
+        {'status': 'success', 'path', 'filename'} bzw. 'empty'/'error'
+    """
+    from app.blueprints.export import write_excel_export
+    
+    try:
+        EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+        _purge_exports()
+        
+        target = EXPORT_DIR / f"{self.request.id}.xlsx"
+        partial = target.with_suffix('.part')
+        with open(partial, 'wb') as output:
+            has_rows = write_excel_export(DataExtractor(), category, year, month, output)
+        
+        if not has_rows:
+            partial.unlink()
+            return {'status': 'empty'}
+        
+        partial.replace(target)
+        logger.info(f"Excel-Export fertig: {target}")
+        return {'status': 'success', 'path': str(target), 'filename': f"{category}_{year}.xlsx"}
+        
+    except Exception as e:
+        logger.error(f"Excel-Export Task failed: {e}")
+        return {'status': 'error', 'error': str(e)}
@@ -18,11 +18,12 @@ upload_bp = Blueprint('upload', __name__)
 
 
 ALLOWED_EXTENSIONS = {'pdf', 'jpg', 'jpeg', 'png', 'tiff', 'tif'}
+_ALLOWED_SUFFIXES = tuple('.' + ext for ext in sorted(ALLOWED_EXTENSIONS))
 
 
 def allowed_file(filename: str) -> bool:
     """Prüft ob Datei-Extension erlaubt ist"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(_ALLOWED_SUFFIXES)
 
 
 @upload_bp.route('/upload', methods=['POST'])
@@ -0,0 +1,67 @@
+"""photo_date_index
+
+Revision ID: 002
+Create Date: 2026-10-16
+
+Replaces the photos date indexes with idx_photo_date_mtime and drops the
+unused year/month/day columns (list_photos filters on a date range)
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '002_photo_date_index'
+down_revision = '001_add_indexes'
+branch_labels = None
+depends_on = None
+
+
+def _photo_schema():
+    """(Spalten, Indexe) der photos-Tabelle, None wenn sie noch nicht existiert"""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('photos'):
+        return None
+    columns = {column['name'] for column in inspector.get_columns('photos')}
+    indexes = {index['name'] for index in inspector.get_indexes('photos')}
+    return columns, indexes
+
+
+def upgrade():
+    """Swap photo date indexes, drop year/month/day"""
+    schema = _photo_schema()
+    if schema is None:
+        # Tabelle wird beim App-Start per create_all im aktuellen Schema angelegt
+        return
+    columns, indexes = schema
+
+    with op.batch_alter_table('photos') as batch_op:
+        for name in ('idx_photo_date', 'ix_photos_date'):
+            if name in indexes:
+                batch_op.drop_index(name)
+        for name in ('year', 'month', 'day'):
+            if name in columns:
+                batch_op.drop_column(name)
+        if 'idx_photo_date_mtime' not in indexes:
+            batch_op.create_index('idx_photo_date_mtime', ['date', 'mtime'])
+
+
+def downgrade():
+    """Restore year/month/day and the previous date indexes"""
+    if _photo_schema() is None:
+        return
+
+    with op.batch_alter_table('photos') as batch_op:
+        batch_op.drop_index('idx_photo_date_mtime')
+        batch_op.add_column(sa.Column('year', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('month', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('day', sa.Integer(), nullable=False, server_default='0'))
+
+    # Datumsteile aus date ableiten (SQLite speichert DateTime als ISO-Text)
+    op.execute(
+        "UPDATE photos SET year = CAST(strftime('%Y', date) AS INTEGER), "
+        "month = CAST(strftime('%m', date) AS INTEGER), "
+        "day = CAST(strftime('%d', date) AS INTEGER)"
+    )
+    op.create_index('ix_photos_date', 'photos', ['date'])
+    op.create_index('idx_photo_date', 'photos', ['year', 'month', 'day', 'date'])
@@ -15,6 +15,17 @@ except ImportError:
     print("Install with: pip install pybind11")
     HAS_PYBIND11 = False
 
+# mypyc (AOT-Kompilierung der Request-Hotpaths, opt-in via MYPYC_COMPILE=1)
+MYPYC_MODULES = ['app/api_response.py', 'app/auth.py', 'app/auto_tagger.py']
+USE_MYPYC = os.getenv('MYPYC_COMPILE') == '1'
+if USE_MYPYC:
+    try:
+        from mypyc.build import mypycify
+    except ImportError:
+        print("Warning: mypyc not found - Python modules will not be compiled")
+        print("Install with: pip install mypy")
+        USE_MYPYC = False
+
 # Compiler flags
 extra_compile_args = []
 extra_link_args = []
@@ -74,6 +85,10 @@ if HAS_PYBIND11:
     )
     ext_modules.append(search_ext)
 
+# Request-Hotpaths (Auth, JSON-Responses, Auto-Tagging) als .so - Import bleibt unverändert
+if USE_MYPYC:
+    ext_modules.extend(mypycify(['--ignore-missing-imports', *MYPYC_MODULES], opt_level='3'))
+
 setup(
     name='organisationsai-native',
     version='2.0.0',
@@ -3,6 +3,8 @@ Test Documents API Endpoints
 """
 import pytest
 import json
+from unittest.mock import patch
+from sqlalchemy.exc import OperationalError
 
 
 class TestDocumentsAPI:
@@ -85,6 +87,24 @@ class TestDocumentsAPI:
         response = client.delete('/api/documents/9999')
         assert response.status_code == 404
         
+    def test_delete_document_db_error(self, client):
+        """Test DB-Fehler beim Löschen -> 500 statt 404"""
+        error = OperationalError('DELETE', {}, Exception('database is locked'))
+        with patch('app.database.Database.delete_returning', side_effect=error):
+            response = client.delete('/api/documents/1')
+        assert response.status_code == 500
+        
+    def test_update_document_db_error(self, client):
+        """Test DB-Fehler beim Aktualisieren -> 500 statt 404"""
+        error = OperationalError('UPDATE', {}, Exception('database is locked'))
+        with patch('app.database.Database.update_returning', side_effect=error):
+            response = client.put(
+                '/api/documents/1',
+                data=json.dumps({'category': 'Receipt'}),
+                content_type='application/json'
+            )
+        assert response.status_code == 500
+        
     def test_update_document_success(self, client, db, sample_document):
         """Test updating document"""
         # Create document
@@ -109,6 +129,19 @@ class TestDocumentsAPI:
         response = client.put(f'/api/documents/{doc_id}')
         assert response.status_code == 422  # Validation error
         
+    def test_update_document_invalid_date(self, client, db, tmp_path):
+        """Test dass ein unparsbares Datum abgelehnt statt ignoriert wird"""
+        doc_id = db.add_document(str(tmp_path / 'date.pdf'), 'Invoice', 'Utilities', {'filename': 'date.pdf'})
+        
+        response = client.put(
+            f'/api/documents/{doc_id}',
+            data=json.dumps({'date_document': 'kein-datum'}),
+            content_type='application/json'
+        )
+        assert response.status_code == 422  # Validation error
+        assert response.json['error']['code'] == 'VALIDATION_ERROR'
+        assert db.get_document(doc_id)['date_document'] is None
+        
     def test_filter_by_category(self, client, db, sample_document):
         """Test filtering documents by category"""
         # Create documents with different categories
@@ -140,6 +173,96 @@ class TestDocumentsAPI:
         # Should find the document (in summary or full_text)
         assert data['pagination']['total'] >= 0
 
+    def test_list_documents_projects_fields(self, client, db, tmp_path):
+        """Test list rows carry only the list fields (no full_text)"""
+        filepath = tmp_path / 'listed.pdf'
+        db.add_document(str(filepath), 'Invoice', 'Utilities', {'filename': 'listed.pdf', 'text': 'x' * 5000})
+
+        response = client.get('/api/documents?category=Invoice')
+        assert response.status_code == 200
+
+        for doc in response.json['data']:
+            assert 'full_text' not in doc
+            assert 'filename' in doc and 'tags' in doc
+
+    def test_download_document_streamed(self, client, db, tmp_path):
+        """Test streamed download with full body"""
+        filepath = tmp_path / 'download.pdf'
+        filepath.write_bytes(b'0123456789' * 10000)
+        doc_id = db.add_document(str(filepath), 'Invoice', 'Utilities', {'filename': 'download.pdf'})
+
+        response = client.get(f'/api/documents/{doc_id}/download')
+        assert response.status_code == 200
+        assert response.headers['Accept-Ranges'] == 'bytes'
+        assert response.headers['Content-Length'] == '100000'
+        assert 'attachment' in response.headers['Content-Disposition']
+        assert response.data == filepath.read_bytes()
+
+    def test_download_document_range(self, client, db, tmp_path):
+        """Test partial download via Range header"""
+        filepath = tmp_path / 'range.pdf'
+        filepath.write_bytes(b'0123456789' * 10000)
+        doc_id = db.add_document(str(filepath), 'Invoice', 'Utilities', {'filename': 'range.pdf'})
+
+        response = client.get(f'/api/documents/{doc_id}/download', headers={'Range': 'bytes=10-19'})
+        assert response.status_code == 206
+        assert response.headers['Content-Range'] == 'bytes 10-19/100000'
+        assert response.data == b'0123456789'
+
+        response = client.get(f'/api/documents/{doc_id}/download', headers={'Range': 'bytes=200000-'})
+        assert response.status_code == 416
+
+    def test_get_document_not_modified(self, client, db, tmp_path):
+        """Test ETag revalidation returns 304"""
+        doc_id = db.add_document(str(tmp_path / 'etag.pdf'), 'Invoice', 'Utilities', {'filename': 'etag.pdf'})
+
+        response = client.get(f'/api/documents/{doc_id}')
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+
+        response = client.get(f'/api/documents/{doc_id}', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_download_document_not_modified(self, client, db, tmp_path):
+        """Test conditional download via ETag and Last-Modified"""
+        filepath = tmp_path / 'cond.pdf'
+        filepath.write_bytes(b'%PDF-1.4')
+        doc_id = db.add_document(str(filepath), 'Invoice', 'Utilities', {'filename': 'cond.pdf'})
+
+        response = client.get(f'/api/documents/{doc_id}/download')
+        assert response.status_code == 200
+
+        revalidated = client.get(
+            f'/api/documents/{doc_id}/download',
+            headers={'If-None-Match': response.headers['ETag']}
+        )
+        assert revalidated.status_code == 304
+
+        revalidated = client.get(
+            f'/api/documents/{doc_id}/download',
+            headers={'If-Modified-Since': response.headers['Last-Modified']}
+        )
+        assert revalidated.status_code == 304
+
+    def test_download_document_x_accel(self, app, client, db, tmp_path):
+        """Test download offloaded to nginx via X-Accel-Redirect"""
+        filepath = tmp_path / 'sub' / 'accel.pdf'
+        filepath.parent.mkdir()
+        filepath.write_bytes(b'%PDF-1.4')
+        doc_id = db.add_document(str(filepath), 'Invoice', 'Utilities', {'filename': 'accel.pdf'})
+
+        app.config['X_ACCEL_REDIRECT_PREFIX'] = '/_protected/'
+        app.config['X_ACCEL_REDIRECT_ROOT'] = str(tmp_path)
+        try:
+            response = client.get(f'/api/documents/{doc_id}/download')
+        finally:
+            app.config['X_ACCEL_REDIRECT_PREFIX'] = None
+
+        assert response.status_code == 200
+        assert response.headers['X-Accel-Redirect'] == '/_protected/sub/accel.pdf'
+        assert response.data == b''
+
 
 class TestDocumentLifecycle:
     """Test complete document lifecycle"""
@@ -171,3 +294,33 @@ class TestDocumentLifecycle:
         # Verify deleted
         get_response = client.get(f'/api/documents/{doc_id}')
         assert get_response.status_code == 404
+
+
+class TestParseListQuery:
+    """Test query parsing for GET /api/documents"""
+
+    def test_defaults_share_empty_filters(self):
+        from app.blueprints.documents import parse_list_query
+
+        page, page_size, stream, kwargs = parse_list_query({})
+        assert (page, page_size, stream, kwargs) == (1, 20, False, {})
+        assert parse_list_query({})[3] is kwargs
+
+    def test_filters(self):
+        from app.blueprints.documents import parse_list_query
+
+        _, _, _, kwargs = parse_list_query({'category': 'Invoice', 'year': '2024', 'query': 'strom'})
+        assert kwargs == {'category': 'Invoice', 'year': 2024, 'query': 'strom'}
+
+    @pytest.mark.parametrize('args, field', [
+        ({'page': '0'}, 'page'),
+        ({'page': 'abc'}, 'page'),
+        ({'page_size': '1000'}, 'page_size'),
+        ({'year': '24'}, 'year'),
+    ])
+    def test_invalid(self, args, field):
+        from app.blueprints.documents import parse_list_query, InvalidListQuery
+
+        with pytest.raises(InvalidListQuery) as exc_info:
+            parse_list_query(args)
+        assert field in exc_info.value.fields
@@ -0,0 +1,149 @@
+"""
+Test Export API Endpoints
+"""
+import io
+import json
+import pytest
+import pandas as pd
+from unittest.mock import patch
+
+from app.blueprints import export
+
+CSV_ROWS = pd.DataFrame({
+    'datum': ['2024-01-05', '2024-02-10', '2024-02-11'],
+    'firma': ['Stadtwerke', 'Telekom, GmbH', 'Bäcker "Korn"'],
+    'betrag': [120.5, 39.99, 4.2],
+})
+
+
+@pytest.fixture
+def extractor(tmp_path):
+    """DataExtractor mit eigenem Daten-Verzeichnis (Rechnungen 2024)"""
+    from app import data_extractor
+
+    config = tmp_path / 'config.yaml'
+    config.write_text(
+        f"system:\n  storage:\n    data_path: '{(tmp_path / 'data').as_posix()}'\n"
+        "data_extraction: {}\n",
+        encoding='utf-8'
+    )
+    (tmp_path / 'data' / '2024').mkdir(parents=True)
+    CSV_ROWS.to_csv(tmp_path / 'data' / '2024' / 'rechnung_data.csv', index=False)
+    (tmp_path / 'data' / '2023').mkdir(parents=True)
+    CSV_ROWS.iloc[:0].to_csv(tmp_path / 'data' / '2023' / 'rechnung_data.csv', index=False)
+
+    data_extractor._year_cache.clear()
+    instance = data_extractor.DataExtractor(str(config))
+    with patch('app.blueprints.export.get_data_extractor', return_value=instance):
+        yield instance
+    data_extractor._year_cache.clear()
+
+
+def _post(client, fmt, **payload):
+    return client.post(
+        f'/api/export/{fmt}',
+        data=json.dumps({'category': 'Rechnung', **payload}),
+        content_type='application/json'
+    )
+
+
+class TestExportAPI:
+    """Test /api/export endpoints"""
+    
+    def test_csv(self, client, extractor):
+        """Test CSV-Export mit BOM, Kopfzeile und Quoting"""
+        response = _post(client, 'csv', year=2024)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        assert response.data.startswith(b'\xef\xbb\xbf')
+        
+        df = pd.read_csv(io.BytesIO(response.data), encoding='utf-8-sig')
+        pd.testing.assert_frame_equal(df, CSV_ROWS)
+        
+    def test_csv_month(self, client, extractor):
+        """Test Monatsfilter"""
+        response = _post(client, 'csv', year=2024, month=2)
+        assert response.status_code == 200
+        
+        df = pd.read_csv(io.BytesIO(response.data), encoding='utf-8-sig')
+        assert df['firma'].tolist() == ['Telekom, GmbH', 'Bäcker "Korn"']
+        
+    @pytest.mark.parametrize('year', [2023, 2022])
+    def test_csv_empty(self, client, extractor, year):
+        """Test nur Kopfzeile bzw. keine Datei -> 404"""
+        assert _post(client, 'csv', year=year).status_code == 404
+        
+    def test_excel(self, client, extractor):
+        """Test Excel-Export (constant_memory)"""
+        response = _post(client, 'excel', year=2024)
+        assert response.status_code == 200
+        assert response.mimetype == export.XLSX_MIMETYPE
+        
+        df = pd.read_excel(io.BytesIO(response.data), sheet_name='Dokumente')
+        pd.testing.assert_frame_equal(df, CSV_ROWS)
+        
+    @pytest.mark.parametrize('year', [2023, 2022])
+    def test_excel_empty(self, client, extractor, year):
+        """Test ohne Datenzeilen -> 404"""
+        assert _post(client, 'excel', year=year).status_code == 404
+        
+    def test_excel_async_broker_down(self, client, extractor):
+        """Test nicht erreichbarer Broker -> synchroner Export statt Hänger"""
+        with patch('app.tasks.export_excel_async.apply_async', side_effect=ConnectionError('broker down')) as apply:
+            response = client.post(
+                '/api/export/excel?async=true',
+                data=json.dumps({'category': 'Rechnung', 'year': 2024}),
+                content_type='application/json'
+            )
+        assert response.status_code == 200
+        assert response.mimetype == export.XLSX_MIMETYPE
+        assert apply.call_args.kwargs['retry'] is False
+        
+    @pytest.mark.skipif(not export.PYARROW_AVAILABLE, reason="pyarrow nicht installiert")
+    def test_parquet(self, client, extractor):
+        """Test Parquet-Export"""
+        import pyarrow.parquet as pq
+        
+        response = _post(client, 'parquet', year=2024)
+        assert response.status_code == 200
+        
+        df = pq.read_table(io.BytesIO(response.data)).to_pandas()
+        pd.testing.assert_frame_equal(df, CSV_ROWS)
+        
+    @pytest.mark.skipif(not export.PYARROW_AVAILABLE, reason="pyarrow nicht installiert")
+    @pytest.mark.parametrize('year', [2023, 2022])
+    def test_parquet_empty(self, client, extractor, year):
+        """Test ohne Datenzeilen -> 404"""
+        assert _post(client, 'parquet', year=year).status_code == 404
+
+
+class TestCsvChunks:
+    """Tests für _csv_chunks (Writer-Wahl einmal pro Export)"""
+    
+    def test_header_once(self):
+        """Test nur der erste Block bekommt die Kopfzeile"""
+        data = b''.join(export._csv_chunks([CSV_ROWS.iloc[:2], CSV_ROWS.iloc[2:]]))
+        pd.testing.assert_frame_equal(pd.read_csv(io.BytesIO(data)), CSV_ROWS)
+        
+    @pytest.mark.skipif(not export.PYARROW_AVAILABLE, reason="pyarrow nicht installiert")
+    def test_later_mixed_block_stays_on_pyarrow(self):
+        """Test gemischte Typen in einem späteren Block wechseln nicht auf pandas"""
+        first = pd.DataFrame({'nr': ['a1'], 'betrag': [1.5]})
+        mixed = pd.DataFrame({'nr': [7, 'b2'], 'betrag': [2.0, None]})
+        
+        with patch.object(pd.DataFrame, 'to_csv', side_effect=AssertionError('pandas writer used')):
+            data = b''.join(export._csv_chunks([first, mixed]))
+        
+        assert data.decode().splitlines() == ['"nr","betrag"', '"a1",1.5', '"7",2', '"b2",']
+        
+    @pytest.mark.skipif(not export.PYARROW_AVAILABLE, reason="pyarrow nicht installiert")
+    def test_mixed_first_block_uses_pandas_throughout(self):
+        """Test scheitert PyArrow am ersten Block, schreibt pandas die ganze Datei"""
+        mixed = pd.DataFrame({'nr': [7, 'b2'], 'betrag': [2.0, 3.0]})
+        later = pd.DataFrame({'nr': ['c3'], 'betrag': [4.0]})
+        
+        with patch.object(export, '_arrow_csv', wraps=export._arrow_csv) as arrow:
+            data = b''.join(export._csv_chunks([mixed, later]))
+        
+        assert arrow.call_count == 1
+        assert data.decode().splitlines() == ['nr,betrag', '7,2.0', 'b2,3.0', 'c3,4.0']
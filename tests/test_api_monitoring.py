@@ -0,0 +1,182 @@
+"""
+Test Health/Monitoring API Endpoints
+"""
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from sqlalchemy.exc import OperationalError
+
+from app.blueprints import monitoring
+
+
+def _ok(**extra):
+    return lambda: {'status': 'ok', **extra}
+
+
+def _failing(message):
+    def probe():
+        raise RuntimeError(message)
+    return probe
+
+
+@pytest.fixture
+def probes():
+    """Probes durch Fakes ersetzen, Ergebnis-Cache leeren"""
+    fakes = {
+        'database': (_ok(), True),
+        'ollama': (_ok(url='http://ollama'), False),
+        'redis': (_ok(host='localhost'), False),
+        'disk': (_ok(percent=42.0), False),
+    }
+    monitoring._health_cache.clear()
+    with patch.dict(monitoring._PROBES, fakes):
+        yield monitoring._PROBES
+    monitoring._health_cache.clear()
+
+
+class TestMonitoringHealth:
+    """Test /api/monitoring/health"""
+
+    def test_all_ok(self, client, probes):
+        """Test Payload mit allen Komponenten und 200"""
+        response = client.get('/api/monitoring/health')
+        assert response.status_code == 200
+
+        data = response.json
+        assert data['status'] == 'ok'
+        assert isinstance(data['timestamp'], float)
+        assert data['components'] == {
+            'database': {'status': 'ok'},
+            'ollama': {'status': 'ok', 'url': 'http://ollama'},
+            'redis': {'status': 'ok', 'host': 'localhost'},
+            'disk': {'status': 'ok', 'percent': 42.0},
+        }
+
+    def test_database_failure_degrades(self, client, probes):
+        """Test kritische Komponente fehlgeschlagen -> 503 degraded"""
+        probes['database'] = (_failing('database is locked'), True)
+
+        response = client.get('/api/monitoring/health')
+        assert response.status_code == 503
+        assert response.json['status'] == 'degraded'
+        assert response.json['components']['database'] == {
+            'status': 'error', 'message': 'database is locked'
+        }
+
+    def test_optional_failure_stays_ok(self, client, probes):
+        """Test nicht-kritische Komponente fehlgeschlagen -> weiterhin 200"""
+        probes['ollama'] = (_failing('connection refused'), False)
+
+        response = client.get('/api/monitoring/health')
+        assert response.status_code == 200
+        assert response.json['status'] == 'ok'
+        assert response.json['components']['ollama']['status'] == 'error'
+
+    def test_hung_probe_times_out(self, client, probes):
+        """Test hängende Probe meldet 'timeout' nach HEALTH_TIMEOUT"""
+        release = threading.Event()
+        probes['database'] = (lambda: release.wait(5) and {'status': 'ok'}, True)
+
+        try:
+            with patch.object(monitoring, 'HEALTH_TIMEOUT', 0.1):
+                response = client.get('/api/monitoring/health')
+        finally:
+            release.set()
+
+        assert response.status_code == 503
+        assert response.json['components']['database'] == {'status': 'timeout'}
+        assert response.json['components']['disk']['status'] == 'ok'
+
+
+class TestMonitoringHealthCache:
+    """Test Wiederverwendung der Probe-Ergebnisse"""
+
+    @pytest.fixture
+    def counted(self, probes):
+        """Datenbank-Probe, die ihre Aufrufe zählt"""
+        calls = []
+
+        def probe():
+            calls.append(1)
+            return {'status': 'ok'}
+
+        probes['database'] = (probe, True)
+        return calls
+
+    def test_result_reused_within_ttl(self, client, counted):
+        """Test zweiter Aufruf innerhalb HEALTH_CACHE_TTL nutzt den Cache"""
+        assert client.get('/api/monitoring/health').status_code == 200
+        assert client.get('/api/monitoring/health').status_code == 200
+        assert len(counted) == 1
+
+    def test_expired_result_rechecked(self, client, counted):
+        """Test abgelaufener Eintrag wird neu geprüft"""
+        with patch.object(monitoring, 'HEALTH_CACHE_TTL', -1):
+            client.get('/api/monitoring/health')
+            client.get('/api/monitoring/health')
+        assert len(counted) == 2
+
+    def test_nocache_forces_check(self, client, counted):
+        """Test ?nocache=1 umgeht den Cache"""
+        client.get('/api/monitoring/health')
+        client.get('/api/monitoring/health?nocache=1')
+        assert len(counted) == 2
+
+    def test_errors_not_cached(self, client, probes):
+        """Test Fehler werden nicht gecacht - Erholung ist sofort sichtbar"""
+        probes['database'] = (_failing('down'), True)
+        assert client.get('/api/monitoring/health').status_code == 503
+
+        probes['database'] = (_ok(), True)
+        response = client.get('/api/monitoring/health')
+        assert response.status_code == 200
+        assert response.json['components']['database'] == {'status': 'ok'}
+
+
+class TestHealth:
+    """Test /health (Liveness) und Datenbank-Probe"""
+
+    @pytest.fixture
+    def other_checks(self):
+        """Nur die Datenbank-Probe läuft echt"""
+        with patch('app.health.check_disk_space', return_value={'status': 'ok'}), \
+             patch('app.health.check_ollama', return_value={'status': 'ok'}), \
+             patch('app.health.check_scanner', return_value={'status': 'not_installed'}):
+            yield
+
+    def test_optional_checks_do_not_degrade(self, client):
+        """Test fehlender Scanner / Ollama lassen /health gesund"""
+        with patch('app.health.check_disk_space', return_value={'status': 'ok'}), \
+             patch('app.health.check_ollama', return_value={'status': 'unavailable'}), \
+             patch('app.health.check_scanner', return_value={'status': 'not_installed'}):
+            response = client.get('/health')
+
+        assert response.status_code == 200
+        assert response.json['status'] == 'healthy'
+
+    def test_health_payload(self, client, other_checks):
+        """Test Payload und 200 mit erreichbarer Datenbank (SELECT 1)"""
+        response = client.get('/health')
+        assert response.status_code == 200
+
+        data = response.json
+        assert data['status'] == 'healthy'
+        assert 'timestamp' in data
+        assert set(data['checks']) == {'database', 'disk_space', 'ollama', 'scanner'}
+        assert data['checks']['database'] == {'status': 'ok'}
+
+    def test_health_database_unreachable(self, client, other_checks):
+        """Test nicht erreichbare Datenbank"""
+        engine = MagicMock()
+        engine.connect.side_effect = OperationalError('SELECT 1', {}, Exception('unable to open database file'))
+        with patch('app.db_config.engine', engine):
+            response = client.get('/health')
+
+        assert response.status_code == 503
+        assert response.json['status'] == 'degraded'
+        assert response.json['checks']['database']['status'] == 'failed'
+        assert 'unable to open database file' in response.json['checks']['database']['error']
+
+    def test_monitoring_database_probe(self):
+        """Test Monitoring-Probe nutzt den gepoolten Engine"""
+        assert monitoring.check_database() == {'status': 'ok'}
@@ -0,0 +1,171 @@
+"""
+Test Photos API Endpoints
+"""
+import io
+import os
+import pytest
+from unittest.mock import patch
+from PIL import Image
+
+from app.blueprints import photos
+
+
+def _jpeg(size=(800, 600)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 80, 40)).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def photo_dir(tmp_path, monkeypatch):
+    """Eigenes data/Bilder + Thumbnail-Cache, leere RAM-Caches, kein Index-Abgleich"""
+    base = tmp_path / 'Bilder'
+    monkeypatch.setattr(photos, 'PHOTOS_BASE_DIR', base)
+    monkeypatch.setattr(photos, 'THUMBNAIL_CACHE_DIR', tmp_path / '.thumbs')
+    monkeypatch.setattr(photos, '_index_pid', os.getpid())
+    photos._thumb_memory.clear()
+    photos.invalidate_listings()
+    yield base
+    photos._thumb_memory.clear()
+    photos.invalidate_listings()
+
+
+@pytest.fixture
+def photo(photo_dir):
+    """Ein Foto unter 2024/05/06 (relativer Pfad)"""
+    path = photo_dir / '2024' / '05' / '06' / 'a.jpg'
+    path.parent.mkdir(parents=True)
+    path.write_bytes(_jpeg())
+    return '2024/05/06/a.jpg'
+
+
+class TestPhotosAPI:
+    """Test /api/photos endpoints"""
+    
+    def test_upload(self, client, photo_dir):
+        """Test Upload landet unter JJJJ/MM/TT, Index und Liste kennen das Foto"""
+        response = client.post(
+            '/api/photos/upload',
+            data={'file': (io.BytesIO(_jpeg()), 'urlaub.jpg'), 'date': '2024-05-06T10:00:00'},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code == 201
+        
+        data = response.json
+        relative = data['url'].removeprefix(photos.IMAGE_URL_PREFIX)
+        assert relative.startswith('2024/05/06/photo_') and relative.endswith('_urlaub.jpg')
+        assert (photo_dir / relative).is_file()
+        assert data['thumbnail_url'].startswith(f"{photos.THUMBNAIL_URL_PREFIX}{relative}?v=")
+        # Spool-Datei des Uploads wurde umbenannt, nicht liegen gelassen
+        assert not list(photo_dir.glob(f"{photos.UPLOAD_TMP_PREFIX}*"))
+        
+        listing = client.get('/api/photos/?year=2024&month=5&day=6').json
+        assert data['thumbnail_url'] in [p['thumbnail_url'] for p in listing['photos']]
+        
+    def test_upload_invalid_type(self, client, photo_dir):
+        """Test nicht erlaubte Endung -> 400"""
+        response = client.post(
+            '/api/photos/upload',
+            data={'file': (io.BytesIO(b'x'), 'script.exe')},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code == 400
+        
+    def test_thumbnail_cache(self, client, photo):
+        """Test erst erzeugen, dann RAM-Cache, dann Datei-Cache"""
+        with patch.object(photos, 'generate_thumbnail', wraps=photos.generate_thumbnail) as generate:
+            first = client.get(f'/api/photos/thumbnail/{photo}', headers={'Accept': 'image/jpeg'})
+            second = client.get(f'/api/photos/thumbnail/{photo}', headers={'Accept': 'image/jpeg'})
+            photos._thumb_memory.clear()
+            third = client.get(f'/api/photos/thumbnail/{photo}', headers={'Accept': 'image/jpeg'})
+        
+        assert first.status_code == second.status_code == third.status_code == 200
+        assert generate.call_count == 1
+        assert first.data == second.data == third.data
+        assert first.mimetype == 'image/jpeg'
+        assert max(Image.open(io.BytesIO(first.data)).size) <= 300
+        assert len(list(photos.THUMBNAIL_CACHE_DIR.iterdir())) == 1
+        
+    def test_thumbnail_webp(self, client, photo):
+        """Test WebP bei explizitem Accept"""
+        response = client.get(f'/api/photos/thumbnail/{photo}', headers={'Accept': 'image/webp,*/*'})
+        assert response.status_code == 200
+        assert response.mimetype == 'image/webp'
+        assert 'Accept' in response.headers['Vary']
+        
+    def test_thumbnail_etag_304(self, client, photo):
+        """Test If-None-Match -> 304 ohne Body"""
+        response = client.get(f'/api/photos/thumbnail/{photo}')
+        etag = response.headers['ETag']
+        
+        cached = client.get(f'/api/photos/thumbnail/{photo}', headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.data == b''
+        
+    def test_thumbnail_cache_control(self, client, photo):
+        """Test immutable nur für versionierte URLs"""
+        versioned = client.get(f'/api/photos/thumbnail/{photo}?v=1')
+        assert 'immutable' in versioned.headers['Cache-Control']
+        
+        plain = client.get(f'/api/photos/thumbnail/{photo}')
+        assert 'no-cache' in plain.headers['Cache-Control']
+        assert 'immutable' not in plain.headers['Cache-Control']
+        
+    def test_thumbnail_changes_with_original(self, client, photo, photo_dir):
+        """Test neues Original -> neuer ETag"""
+        etag = client.get(f'/api/photos/thumbnail/{photo}').headers['ETag']
+        
+        path = photo_dir / photo
+        path.write_bytes(_jpeg((400, 400)))
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        
+        assert client.get(f'/api/photos/thumbnail/{photo}').headers['ETag'] != etag
+        
+    def test_original_revalidates(self, client, photo):
+        """Test Original: no-cache + ETag -> 304"""
+        response = client.get(f'/api/photos/image/{photo}')
+        assert response.status_code == 200
+        assert 'no-cache' in response.headers['Cache-Control']
+        assert 'immutable' not in response.headers['Cache-Control']
+        
+        cached = client.get(f'/api/photos/image/{photo}', headers={'If-None-Match': response.headers['ETag']})
+        assert cached.status_code == 304
+        
+    def test_missing_and_traversal(self, client, photo_dir):
+        """Test unbekannter Pfad bzw. '..' -> 404"""
+        assert client.get('/api/photos/thumbnail/2024/01/01/x.jpg').status_code == 404
+        assert client.get('/api/photos/image/..%2Fconfig.yaml').status_code == 404
+
+
+class TestPhotoIndexSync:
+    """Tests für Baum-Scan und Foto-Index-Abgleich"""
+    
+    def test_rebuild_scans_tree(self, photo):
+        """Test rebuild_photo_index übergibt alle Fotos (inkl. Datum aus dem Pfad)"""
+        class FakeDb:
+            def reconcile_photos(self, rows, exists):
+                self.rows = rows
+                return len(rows), 0
+        
+        db = FakeDb()
+        assert photos.rebuild_photo_index(db) == 1
+        (path, date, mtime, size), = db.rows
+        assert path == photo
+        assert (date.year, date.month, date.day) == (2024, 5, 6)
+        
+    def test_lease_once_per_deployment(self, tmp_path, monkeypatch):
+        """Test nur ein Halter der Sperrdatei gleicht ab"""
+        if not photos.FCNTL_AVAILABLE:
+            pytest.skip("fcntl nicht verfügbar")
+        monkeypatch.setattr(photos, 'PHOTO_INDEX_LOCK_FILE', tmp_path / '.photo-index.lock')
+        monkeypatch.setattr(photos, '_index_lock_fd', None)
+        
+        assert photos._acquire_index_lease() is True
+        holder = photos._index_lock_fd
+        try:
+            # Zweiter Versuch (neue Datei-Beschreibung wie in einem anderen Worker)
+            monkeypatch.setattr(photos, '_index_lock_fd', None)
+            assert photos._acquire_index_lease() is False
+        finally:
+            os.close(holder)
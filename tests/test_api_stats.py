@@ -0,0 +1,78 @@
+"""
+Test Statistics API Endpoints
+"""
+import pytest
+import pandas as pd
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from app.statistics_engine import StatisticsEngine
+
+
+@pytest.fixture
+def stats_engine(db, tmp_path):
+    """StatisticsEngine mit leerem Datenverzeichnis"""
+    engine = StatisticsEngine(db=db)
+    engine.data_path = tmp_path
+    return engine
+
+
+@pytest.fixture
+def no_redis():
+    """Stats-Cache ohne Redis (jeder Zugriff ein Miss)"""
+    redis = MagicMock()
+    redis.get_raw.return_value = None
+    redis.get_many_raw.side_effect = lambda keys: [None] * len(keys)
+    with patch('app.blueprints.stats.RedisClient', return_value=redis):
+        yield redis
+
+
+class TestStatsAPI:
+    """Test /api/stats endpoints"""
+    
+    def test_dashboard(self, client, stats_engine, no_redis):
+        """Test dashboard liefert Übersicht, Trends und Jahr in einer Antwort"""
+        year = datetime.now().year
+        with patch('app.blueprints.stats.get_statistics_engine', return_value=stats_engine):
+            response = client.get(f'/api/stats/dashboard?year={year}')
+        assert response.status_code == 200
+        
+        data = response.json
+        assert set(data) == {'overview', 'trends', 'year'}
+        assert {'total_documents', 'categories'} <= set(data['overview']['overview'])
+        assert data['overview']['trends']['year'] == year
+        assert data['trends']['year'] == year
+        assert data['year']['year'] == year
+        assert isinstance(data['year']['documents'], int)
+        assert len(data['year']['monthly']) == 12
+        
+    def test_overview(self, client, stats_engine, no_redis):
+        """Test Übersicht (gleicher Producer wie im Dashboard)"""
+        with patch('app.blueprints.stats.get_statistics_engine', return_value=stats_engine):
+            response = client.get('/api/stats/overview')
+        assert response.status_code == 200
+        assert set(response.json) == {'overview', 'trends'}
+        
+    def test_year(self, client, no_redis):
+        """Test Jahres-Statistik"""
+        response = client.get('/api/stats/year/2024')
+        assert response.status_code == 200
+        
+        data = response.json
+        assert data['year'] == 2024
+        assert data['documents'] == 0
+        
+    def test_insurance_list(self, client, no_redis):
+        """Test Versicherungsliste aus den Jahres-CSVs (NaN -> null)"""
+        extractor = MagicMock()
+        extractor.get_all_years_data.return_value = [
+            pd.DataFrame({'firma': ['Allianz', 'HUK'], 'betrag': [12.5, float('nan')], 'jahr': [2024, 2024]})
+        ]
+        with patch('app.blueprints.stats.get_data_extractor', return_value=extractor):
+            response = client.get('/api/stats/insurance/list')
+        assert response.status_code == 200
+        
+        insurances = response.json['insurances']
+        assert [i['firma'] for i in insurances] == ['Allianz', 'HUK']
+        assert insurances[1]['betrag'] is None
+        extractor.get_all_years_data.assert_called_once_with('Versicherungen')
@@ -0,0 +1,65 @@
+"""
+Test Tags API Endpoints
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+
+
+@pytest.fixture
+def tag_db():
+    """Database-Mock für das Tags-Blueprint"""
+    db = MagicMock()
+    db.create_tag.return_value = 7
+    db.get_all_tags.return_value = [
+        {'id': 1, 'name': 'steuer', 'color': '#ff0000'},
+        {'id': 2, 'name': 'abo', 'color': '#00FF00'},
+    ]
+    with patch('app.blueprints.tags.get_database', return_value=db):
+        yield db
+
+
+class TestTagsAPI:
+    """Test /api/tags endpoints"""
+
+    def test_list_tags(self, client, tag_db):
+        """Test Tag-Liste wird validiert und unverändert ausgegeben"""
+        response = client.get('/api/tags/')
+        assert response.status_code == 200
+        assert response.json['tags'] == tag_db.get_all_tags.return_value
+
+    def test_create_tag(self, client, tag_db):
+        """Test gültiger Tag wird angelegt"""
+        response = client.post('/api/tags/', json={'name': 'haustier', 'color': '#123abc'})
+        assert response.status_code == 201
+        assert response.json == {'success': True, 'id': 7, 'name': 'haustier', 'color': '#123abc'}
+        tag_db.create_tag.assert_called_once_with(name='haustier', color='#123abc')
+
+    @pytest.mark.parametrize('body, field', [
+        ({'name': 'rot', 'color': 'red'}, 'color'),
+        ({'name': '', 'color': '#ff0000'}, 'name'),
+        ({'name': 'x' * 51}, 'name'),
+        ({'color': '#ff0000'}, 'name'),
+    ])
+    def test_create_tag_invalid_fields(self, client, tag_db, body, field):
+        """Test ungültige Felder liefern 422 mit Feld-Fehlern"""
+        response = client.post('/api/tags/', json=body)
+        assert response.status_code == 422
+
+        error = response.json['error']
+        assert error['code'] == 'VALIDATION_ERROR'
+        assert field in error['details']['fields']
+        tag_db.create_tag.assert_not_called()
+
+    def test_create_tag_malformed_json(self, client, tag_db):
+        """Test kaputtes JSON liefert 422 unter 'body' statt 500"""
+        response = client.post('/api/tags/', data=b'{"name": ', content_type='application/json')
+        assert response.status_code == 422
+        assert 'body' in response.json['error']['details']['fields']
+        tag_db.create_tag.assert_not_called()
+
+    def test_add_document_tag_invalid_name(self, client, tag_db):
+        """Test zu langer Tag-Name beim Zuweisen liefert 422"""
+        response = client.post('/api/tags/document/1', json={'tag_name': 'x' * 51})
+        assert response.status_code == 422
+        assert 'name' in response.json['error']['details']['fields']
+        tag_db.add_tag_to_document.assert_not_called()
@@ -44,6 +44,13 @@ class TestDocumentProcessor(unittest.TestCase):
         self.assertGreater(len(amounts), 0)
         self.assertAlmostEqual(amounts[0], 1234.56, places=2)
     
+    def test_extract_amounts_mixed_formats(self):
+        """Test: Beträge mit Währung vor und hinter der Zahl"""
+        text = "Netto 10,00 € 20,00 zzgl. EUR 3,80 = € 1.234,56 bzw. 5,00EUR"
+        amounts = self.processor._extract_amounts(text)
+        
+        self.assertEqual(amounts, [1234.56, 20.0, 10.0, 5.0, 3.8])
+    
     def test_extract_keywords(self):
         """Test: Keyword-Extraktion"""
         text = "Stromrechnung für Januar. Stadtwerke München. Verbrauch: 150 kWh"
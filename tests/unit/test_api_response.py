@@ -0,0 +1,132 @@
+"""
+Unit Tests für APIResponse
+"""
+import json
+from datetime import datetime
+
+import pytest
+from flask import Flask
+
+from app.api_response import APIResponse, NDJSON_MIMETYPE
+from app.json_provider import OrjsonProvider
+
+
+@pytest.fixture
+def app():
+    """Minimale App mit OrjsonProvider"""
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    return app
+
+
+@pytest.mark.unit
+class TestStreamed:
+    """Tests für APIResponse.streamed (NDJSON)"""
+
+    def _lines(self, app, rows, total, page=1, page_size=20):
+        with app.test_request_context():
+            response, status = APIResponse.streamed(rows, total, page, page_size)
+            body = b''.join(response.response)
+        return response, status, body
+
+    def test_framing(self, app):
+        """Header-Zeile, dann ein Objekt pro Zeile, jede Zeile mit \\n abgeschlossen"""
+        rows = [{'id': 1, 'filename': 'a.pdf'}, {'id': 2, 'filename': 'zeile\nmit umbruch.pdf'}]
+
+        response, status, body = self._lines(app, iter(rows), total=45, page=2, page_size=20)
+
+        assert status == 200
+        assert response.mimetype == NDJSON_MIMETYPE
+        assert body.endswith(b'\n')
+        lines = body.split(b'\n')[:-1]
+        assert len(lines) == 3
+
+        header = json.loads(lines[0])
+        assert header['success'] is True
+        assert header['pagination'] == {
+            'page': 2, 'page_size': 20, 'total': 45,
+            'total_pages': 3, 'has_next': True, 'has_prev': True
+        }
+        assert [json.loads(line) for line in lines[1:]] == rows
+
+    def test_empty_page(self, app):
+        """Ohne Einträge nur die Header-Zeile"""
+        _, _, body = self._lines(app, iter([]), total=0)
+
+        lines = body.split(b'\n')
+        assert lines[-1] == b''
+        assert len(lines) == 2
+        assert json.loads(lines[0])['pagination']['total_pages'] == 0
+
+    def test_rows_serialized_with_provider(self, app):
+        """Zeilen laufen über den App-Provider (datetime als HTTP-Date)"""
+        rows = [{'created_at': datetime(2025, 1, 2, 3, 4, 5)}]
+
+        _, _, body = self._lines(app, iter(rows), total=1)
+
+        assert json.loads(body.split(b'\n')[1]) == {'created_at': 'Thu, 02 Jan 2025 03:04:05 GMT'}
+
+    def test_rows_consumed_lazily(self, app):
+        """Der Iterator wird erst beim Senden gelesen"""
+        consumed = []
+
+        def rows():
+            for i in range(3):
+                consumed.append(i)
+                yield {'id': i}
+
+        with app.test_request_context():
+            response, _ = APIResponse.streamed(rows(), total=3)
+            assert consumed == []
+            chunks = iter(response.response)
+            next(chunks)
+            assert consumed == []
+            next(chunks)
+            assert consumed == [0]
+
+
+@pytest.mark.unit
+class TestRawBodies:
+    """Tests für success/error/paginated (Body direkt aus JSON-Bytes)"""
+
+    def test_success(self, app):
+        """Body und Content-Type wie bei jsonify"""
+        with app.test_request_context():
+            response, status = APIResponse.success({'id': 1}, status_code=201)
+
+        assert status == 201 and response.status_code == 201
+        assert response.mimetype == 'application/json'
+        assert response.get_json() == {'success': True, 'message': 'Success', 'data': {'id': 1}}
+
+    def test_error_details(self, app):
+        """Fehler-Body mit Code und Details"""
+        with app.test_request_context():
+            response, status = APIResponse.validation_error({'date': ['ungültig']}, 'Ungültig')
+
+        assert status == 422 and response.status_code == 422
+        assert response.get_json() == {
+            'success': False,
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': 'Ungültig',
+                'details': {'fields': {'date': ['ungültig']}}
+            }
+        }
+
+    def test_paginated_dataclass(self, app):
+        """Pagination-Dataclass wird als Objekt serialisiert"""
+        with app.test_request_context():
+            response, _ = APIResponse.paginated([{'id': 1}], total=1)
+
+        assert response.get_json()['pagination'] == {
+            'page': 1, 'page_size': 20, 'total': 1,
+            'total_pages': 1, 'has_next': False, 'has_prev': False
+        }
+
+    def test_non_container_payload_uses_jsonify(self, app):
+        """Nicht dict/list geht über jsonify"""
+        with app.test_request_context():
+            response = APIResponse._raw('text', 202)
+
+        assert response.status_code == 202
+        assert response.get_json() == 'text'
@@ -0,0 +1,40 @@
+"""
+Unit Tests für Audit-Queue
+"""
+import pytest
+from unittest.mock import MagicMock
+from app.audit import AuditQueue
+
+
+@pytest.mark.unit
+class TestAuditQueue:
+    """Tests für AuditQueue"""
+
+    def test_flush_writes_batch(self):
+        """Test dass Events gebündelt geschrieben werden"""
+        db = MagicMock()
+        audit_queue = AuditQueue()
+        audit_queue._thread = MagicMock()  # Worker nicht starten
+
+        for i in range(5):
+            audit_queue.put(db, ('system', 'upload_document', str(i), None, 0.0))
+        audit_queue._thread = None
+        audit_queue.flush()
+
+        db.log_audit_events_bulk.assert_called_once()
+        rows = db.log_audit_events_bulk.call_args.args[0]
+        assert [row[2] for row in rows] == ['0', '1', '2', '3', '4']
+
+    def test_drop_oldest_when_full(self):
+        """Test Overflow-Policy (ältestes Event verwerfen)"""
+        db = MagicMock()
+        audit_queue = AuditQueue(maxsize=2)
+        audit_queue._thread = MagicMock()  # Worker nicht starten
+
+        for i in range(3):
+            audit_queue.put(db, ('system', 'action', str(i), None, 0.0))
+        audit_queue._thread = None
+        audit_queue.flush()
+
+        rows = db.log_audit_events_bulk.call_args.args[0]
+        assert [row[2] for row in rows] == ['1', '2']
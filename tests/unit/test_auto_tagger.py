@@ -0,0 +1,98 @@
+"""
+Unit Tests für AutoTagger
+"""
+import pytest
+from app.auto_tagger import AutoTagger
+
+
+SAMPLE_TEXT = "Rechnung vom 01.01.2025 über 50€ für Tankstelle Aral. Miete für Februar."
+
+
+@pytest.mark.unit
+class TestGenerateTags:
+    """Tests für generate_tags()"""
+
+    def test_rule_tags(self):
+        """Test Keyword-Regeln"""
+        tags = AutoTagger().generate_tags(SAMPLE_TEXT, "Rechnungen")
+
+        assert "auto" in tags  # Tankstelle
+        assert "wohnen" in tags  # Miete
+        assert "reise" not in tags
+
+    def test_category_and_year_tags(self):
+        """Test Kategorie- und Jahres-Tags"""
+        tags = AutoTagger().generate_tags(SAMPLE_TEXT, "Rechnungen")
+
+        assert "cat:rechnungen" in tags
+        assert "year:2025" in tags
+
+    def test_python_fallback_matches_automaton(self):
+        """Test dass Python-Fallback dieselben Tags liefert"""
+        tagger = AutoTagger()
+        expected = sorted(tagger.generate_tags(SAMPLE_TEXT, "Rechnungen"))
+
+        tagger._automaton = None
+        assert sorted(tagger.generate_tags(SAMPLE_TEXT, "Rechnungen")) == expected
+
+    def test_keyword_shared_between_tags(self, tmp_path):
+        """Test dass ein Keyword in mehreren Regeln alle Tags liefert"""
+        config = tmp_path / "config.yaml"
+        config.write_text("auto_tagging:\n  rules:\n    energie: [strom]\n", encoding="utf-8")
+        tagger = AutoTagger(str(config))
+
+        tags = tagger.generate_tags("Abschlag Strom März", "")
+        assert {"wohnen", "energie"} <= set(tags)
+
+        tagger._automaton = None
+        assert {"wohnen", "energie"} <= set(tagger.generate_tags("Abschlag Strom März", ""))
+
+
+@pytest.mark.unit
+class TestGenerateTagsBatch:
+    """Tests für generate_tags_batch()"""
+
+    def test_batch_matches_single(self):
+        """Test dass Batch-Ergebnis identisch zu Einzelaufrufen ist"""
+        tagger = AutoTagger()
+        texts = [SAMPLE_TEXT, "Arztrechnung Apotheke 2024", "", "Flug und Hotel für die Reise"]
+        categories = ["Rechnungen", "Gesundheit", "", "Sonstiges"]
+
+        batch = tagger.generate_tags_batch(texts, categories)
+
+        assert len(batch) == len(texts)
+        for tags, text, cat in zip(batch, texts, categories):
+            assert sorted(tags) == sorted(tagger.generate_tags(text, cat))
+
+    def test_empty_batch(self):
+        """Test leere Eingabe"""
+        assert AutoTagger().generate_tags_batch([], []) == []
+
+
+@pytest.mark.unit
+class TestConfigRules:
+    """Tests für auto_tagging.rules aus config.yaml"""
+
+    def test_custom_rules(self, tmp_path):
+        """Test dass Config-Regeln ergänzt werden"""
+        config = tmp_path / "config.yaml"
+        config.write_text("auto_tagging:\n  rules:\n    haustier: [Tierarzt, Futter]\n", encoding="utf-8")
+
+        tags = AutoTagger(str(config)).generate_tags("Rechnung vom Tierarzt", "")
+
+        assert "haustier" in tags
+
+    @pytest.mark.parametrize("content", [
+        "auto_tagging:\n",
+        "auto_tagging:\n  rules:\n",
+        "auto_tagging:\n  rules:\n    haustier:\n",
+        "auto_tagging: [unclosed\n",
+    ])
+    def test_empty_or_invalid_config(self, tmp_path, content):
+        """Test dass leere/ungültige Config auf Standard-Regeln zurückfällt"""
+        config = tmp_path / "config.yaml"
+        config.write_text(content, encoding="utf-8")
+
+        tags = AutoTagger(str(config)).generate_tags(SAMPLE_TEXT, "")
+
+        assert "auto" in tags
@@ -0,0 +1,101 @@
+"""
+Unit Tests für die Serialisierung des Cache Managers
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+
+from app import cache as cache_module
+from app.cache import CacheManager, _dumps, _loads, _JSON_TAG, _PICKLE_TAG, ORJSON_AVAILABLE
+
+
+@pytest.mark.unit
+class TestCacheSerialization:
+    """Tests für _dumps / _loads"""
+
+    @pytest.mark.skipif(not ORJSON_AVAILABLE, reason="orjson nicht installiert")
+    def test_plain_json(self):
+        """Reine JSON-Werte gehen über orjson"""
+        value = {'a': [1, 2.5, 'x', None], 'b': {'c': True}}
+        data = _dumps(value)
+
+        assert data[:1] == _JSON_TAG
+        assert _loads(data) == value
+
+    def test_tuple_roundtrip(self):
+        """Tupel auf oberster Ebene bleiben Tupel"""
+        data = _dumps((1, 'a'))
+
+        assert data[:1] == _PICKLE_TAG
+        assert _loads(data) == (1, 'a')
+
+    def test_nested_tuple_roundtrip(self):
+        """Verschachtelte Tupel kommen nicht als Listen zurück"""
+        value = {'rows': [(1, 'a'), (2, 'b')], 'range': (0, 10)}
+        result = _loads(_dumps(value))
+
+        assert result == value
+        assert isinstance(result['rows'][0], tuple)
+        assert isinstance(result['range'], tuple)
+
+    def test_datetime_roundtrip(self):
+        """datetime behält seinen Typ (Pickle statt ISO-String)"""
+        value = {'created': datetime(2024, 1, 2, 3, 4)}
+
+        assert _loads(_dumps(value)) == value
+
+
+@pytest.fixture
+def clock():
+    """Feste Uhr für time.monotonic im cache-Modul"""
+    now = {'t': 1000.0}
+    with patch.object(cache_module.time, 'monotonic', lambda: now['t']):
+        yield now
+
+
+@pytest.fixture
+def memory_cache(clock):
+    """CacheManager im In-Memory-Modus mit leerem LRU"""
+    cache = CacheManager()
+    with patch.object(cache, 'enabled', False):
+        cache._memory_cache.clear()
+        yield cache
+        cache._memory_cache.clear()
+
+
+@pytest.mark.unit
+class TestMemoryCache:
+    """Tests für den In-Memory-Fallback (TTL pro Key + LRU)"""
+
+    def test_ttl_expiry(self, memory_cache, clock):
+        """Eintrag verfällt nach timeout Sekunden"""
+        memory_cache.set('a', 1, timeout=10)
+
+        clock['t'] += 9
+        assert memory_cache.get('a') == 1
+        clock['t'] += 2
+        assert memory_cache.get('a') is None
+        assert 'a' not in memory_cache._memory_cache
+
+    def test_size_cap(self, memory_cache):
+        """Nie mehr als MEMORY_CACHE_MAXSIZE Einträge"""
+        with patch.object(cache_module, 'MEMORY_CACHE_MAXSIZE', 3):
+            for i in range(10):
+                memory_cache.set(f'k{i}', i)
+
+        assert len(memory_cache._memory_cache) == 3
+        assert [memory_cache.get(f'k{i}') for i in (7, 8, 9)] == [7, 8, 9]
+
+    def test_lru_eviction_order(self, memory_cache):
+        """Gelesene Einträge bleiben, der am längsten ungenutzte fliegt"""
+        with patch.object(cache_module, 'MEMORY_CACHE_MAXSIZE', 3):
+            for key in ('a', 'b', 'c'):
+                memory_cache.set(key, key)
+            memory_cache.get('a')
+            memory_cache.set('d', 'd')
+            assert memory_cache.get('b') is None
+
+            memory_cache.set('c', 'c2')
+            memory_cache.set('e', 'e')
+
+        assert list(memory_cache._memory_cache) == ['d', 'c', 'e']
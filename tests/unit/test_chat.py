@@ -0,0 +1,21 @@
+"""
+Unit Tests für Chat Blueprint
+"""
+import pytest
+from app.blueprints.chat import _needs_context
+
+
+@pytest.mark.unit
+class TestNeedsContext:
+    """Tests für _needs_context()"""
+
+    def test_trivial_messages(self):
+        """Test Grüße und Kurznachrichten ohne Suche"""
+        assert _needs_context("Hi") is False
+        assert _needs_context("  Danke schön! ") is False
+        assert _needs_context("Guten Morgen.") is False
+        assert _needs_context("ok?") is False
+
+    def test_real_question(self):
+        """Test echte Fragen mit Suche"""
+        assert _needs_context("Wie hoch war meine Stromrechnung 2024?") is True
@@ -0,0 +1,38 @@
+"""
+Unit Tests für Config Cache
+"""
+import pytest
+from app.config_cache import get_config, reload_config
+
+
+@pytest.mark.unit
+class TestGetConfig:
+    """Tests für get_config()"""
+
+    def test_parses_once(self, tmp_path):
+        """Test dass die Datei nur einmal geparst wird"""
+        path = tmp_path / 'config.yaml'
+        path.write_text("web:\n  port: 5001\n", encoding='utf-8')
+        reload_config()
+
+        first = get_config(str(path))
+        path.write_text("web:\n  port: 9999\n", encoding='utf-8')
+
+        assert get_config(str(path)) is first
+        assert first['web']['port'] == 5001
+
+    def test_reload(self, tmp_path):
+        """Test dass reload_config() den Cache verwirft"""
+        path = tmp_path / 'config.yaml'
+        path.write_text("web:\n  port: 5001\n", encoding='utf-8')
+        get_config(str(path))
+
+        path.write_text("web:\n  port: 9999\n", encoding='utf-8')
+        reload_config()
+
+        assert get_config(str(path))['web']['port'] == 9999
+
+    def test_missing_file(self, tmp_path):
+        """Test fehlende Datei"""
+        with pytest.raises(FileNotFoundError):
+            get_config(str(tmp_path / 'missing.yaml'))
@@ -0,0 +1,124 @@
+"""
+Unit Tests für den get_year_data-Cache des DataExtractor
+"""
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+
+@pytest.fixture
+def extractor(tmp_path):
+    """DataExtractor mit eigenem Daten-Verzeichnis und leerem Cache"""
+    from app import data_extractor
+
+    config = tmp_path / 'config.yaml'
+    config.write_text(
+        f"system:\n  storage:\n    data_path: '{(tmp_path / 'data').as_posix()}'\n"
+        "data_extraction: {}\n",
+        encoding='utf-8'
+    )
+    data_extractor._year_cache.clear()
+    yield data_extractor.DataExtractor(str(config))
+    data_extractor._year_cache.clear()
+
+
+@pytest.mark.unit
+class TestYearDataCache:
+    """Tests für get_year_data / iter_year_data"""
+
+    def test_second_call_skips_read(self, extractor):
+        """Zweiter Aufruf liest die CSV nicht erneut"""
+        extractor._save_to_csv('Rechnungen', 2024, {'datum': '2024-01-05', 'betrag': 10.0})
+
+        with patch('app.data_extractor.pd.read_csv', wraps=pd.read_csv) as read_csv:
+            first = extractor.get_year_data('Rechnungen', 2024)
+            second = extractor.get_year_data('Rechnungen', 2024)
+
+        assert read_csv.call_count == 1
+        assert len(first) == len(second) == 1
+
+    def test_write_invalidates(self, extractor):
+        """Neue Zeilen sind nach _save_to_csv sichtbar"""
+        extractor._save_to_csv('Rechnungen', 2024, {'datum': '2024-01-05', 'betrag': 10.0})
+        assert len(extractor.get_year_data('Rechnungen', 2024)) == 1
+
+        extractor._save_to_csv('Rechnungen', 2024, {'datum': '2024-02-05', 'betrag': 20.0})
+        assert len(extractor.get_year_data('Rechnungen', 2024)) == 2
+
+    def test_caller_columns_not_cached(self, extractor):
+        """Vom Aufrufer ergänzte Spalten landen nicht im Cache"""
+        extractor._save_to_csv('Bank', 2023, {'datum': '2023-03-01', 'betrag': 1.0})
+
+        df = extractor.get_year_data('Bank', 2023)
+        df['jahr'] = 2023
+
+        assert 'jahr' not in extractor.get_year_data('Bank', 2023).columns
+
+    def test_iter_uses_cache(self, extractor):
+        """iter_year_data schneidet Blöcke aus dem gecachten Jahr"""
+        for day in range(1, 6):
+            extractor._save_to_csv('Bank', 2023, {'datum': f'2023-03-0{day}', 'betrag': day})
+        extractor.get_year_data('Bank', 2023)
+
+        with patch('app.data_extractor.pd.read_csv') as read_csv:
+            chunks = list(extractor.iter_year_data('Bank', 2023, chunksize=2))
+
+        assert not read_csv.called
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+
+    def test_missing_year(self, extractor):
+        """Fehlende CSV -> None"""
+        assert extractor.get_year_data('Bank', 1999) is None
+        assert extractor.iter_year_data('Bank', 1999) is None
+
+    @pytest.mark.parametrize('cached', [False, True])
+    def test_iter_month_filter(self, extractor, cached):
+        """Monatsfilter mit und ohne Cache-Eintrag"""
+        for datum in ('2023-01-10', '2023-02-11', '2023-02-12', ''):
+            extractor._save_to_csv('Bank', 2023, {'datum': datum, 'betrag': 1.0})
+        if cached:
+            extractor.get_year_data('Bank', 2023)
+
+        chunks = [chunk for chunk in extractor.iter_year_data('Bank', 2023, chunksize=1, month=2) if not chunk.empty]
+
+        assert sum(len(chunk) for chunk in chunks) == 2
+        assert all(chunk['datum'].str.startswith('2023-02').all() for chunk in chunks)
+
+    def test_get_year_data_month(self, extractor):
+        """get_year_data liefert nur den Monatsausschnitt, Cache bleibt vollständig"""
+        for datum in ('2023-01-10', '2023-02-11', '2023-02-12'):
+            extractor._save_to_csv('Bank', 2023, {'datum': datum, 'betrag': 1.0})
+
+        february = extractor.get_year_data('Bank', 2023, month=2)
+
+        assert list(february['datum']) == ['2023-02-11', '2023-02-12']
+        assert len(extractor.get_year_data('Bank', 2023)) == 3
+
+    def test_year_totals_reads_amount_column_only(self, extractor):
+        """get_year_totals liest ohne Cache nur die Betragsspalte"""
+        extractor._save_to_csv('Rechnungen', 2024, {'datum': '2024-01-05', 'betrag': 10.5})
+        extractor._save_to_csv('Rechnungen', 2024, {'datum': '2024-02-05', 'betrag': 4.5})
+
+        with patch('app.data_extractor.pd.read_csv', wraps=pd.read_csv) as read_csv:
+            assert extractor.get_year_totals('Rechnungen', 2024) == (2, 15.0)
+
+        # Ein Lesevorgang, nur Betragsspalten
+        assert read_csv.call_count == 1
+        usecols = read_csv.call_args.kwargs['usecols']
+        assert usecols('betrag') and not usecols('datum')
+        assert extractor.get_year_totals('Rechnungen', 1999) is None
+
+    def test_year_totals_without_amount_column(self, extractor):
+        """Ohne Betragsspalte zählen die Zeilen, Summe 0"""
+        extractor._save_to_csv('Notizen', 2024, {'datum': '2024-01-05', 'titel': 'a'})
+        extractor._save_to_csv('Notizen', 2024, {'datum': '2024-01-06', 'titel': 'b'})
+
+        assert extractor.get_year_totals('Notizen', 2024) == (2, 0.0)
+
+    def test_all_years_totals(self, extractor):
+        """Summen über alle Jahres-Ordner"""
+        extractor._save_to_csv('Bank', 2022, {'datum': '2022-01-01', 'betrag': 1.0})
+        extractor._save_to_csv('Bank', 2023, {'datum': '2023-01-01', 'betrag': 2.0})
+        extractor.get_year_data('Bank', 2023)
+
+        assert extractor.get_all_years_totals('Bank') == (2, 3.0)
@@ -2,6 +2,7 @@
 Unit Tests für Database - SQLAlchemy
 """
 import pytest
+from sqlalchemy.exc import OperationalError
 from app.database import Database
 from app.models import Document
 from datetime import datetime
@@ -85,19 +86,141 @@ class TestDocumentOperations:
         mock_session = MagicMock()
         mock_get_db.return_value.__enter__.return_value = mock_session
         
-        # Mock query chain
-        mock_query = mock_session.query.return_value
-        mock_query.filter.return_value = mock_query
-        mock_query.order_by.return_value = mock_query
-        mock_query.limit.return_value = mock_query
-        mock_query.offset.return_value = mock_query
-        mock_query.all.return_value = []
+        # Vorgebautes Statement + Bind-Parameter
+        mock_session.execute.return_value.scalars.return_value.all.return_value = []
         
         db = Database(test_config)
         results = db.search_documents(query="test")
         
         assert isinstance(results, list)
-        assert mock_session.query.called
+        params = mock_session.execute.call_args[0][1]
+        assert params['search'] == '%test%'
+        assert (params['limit'], params['offset']) == (100, 0)
+
+    @patch('app.database.get_db')
+    def test_count_documents(self, mock_get_db, test_config):
+        """Test Zählen ohne Zeilen zu laden"""
+        mock_session = MagicMock()
+        mock_get_db.return_value.__enter__.return_value = mock_session
+
+        mock_session.execute.return_value.scalar.return_value = 42
+
+        db = Database(test_config)
+        total = db.count_documents(category="Rechnung", year=2024)
+
+        assert total == 42
+        assert not mock_session.execute.return_value.scalars.called
+
+    def test_statements_cached_per_filter_shape(self, test_config):
+        """Test ein Statement pro Filter-Kombination"""
+        from app.database import _filter_params, _search_stmt
+
+        mask_a, _ = _filter_params(None, 'Bank', None, None, 2023)
+        mask_b, params = _filter_params(None, 'Rechnung', None, None, 2024)
+
+        assert mask_a == mask_b
+        assert _search_stmt(mask_a) is _search_stmt(mask_b)
+        assert params['year_start'] == datetime(2024, 1, 1)
+
+    @patch('app.database.get_db')
+    def test_delete_returning_not_found(self, mock_get_db, test_config):
+        """Test Löschen einer unbekannten ID"""
+        mock_session = MagicMock()
+        mock_get_db.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value.first.return_value = None
+
+        db = Database(test_config)
+        assert db.delete_returning(999) is None
+
+    @patch('app.database.get_db')
+    def test_delete_returning(self, mock_get_db, test_config):
+        """Test Löschen liefert Dateipfad zurück"""
+        mock_session = MagicMock()
+        mock_get_db.return_value.__enter__.return_value = mock_session
+        row = MagicMock(filepath='/tmp/a.pdf', filename='a.pdf')
+        mock_session.execute.return_value.first.return_value = row
+
+        db = Database(test_config)
+        assert db.delete_returning(1) == {'filepath': '/tmp/a.pdf', 'filename': 'a.pdf'}
+
+    @patch('app.database.get_db')
+    def test_delete_returning_db_error_propagates(self, mock_get_db, test_config):
+        """Test DB-Fehler wird nicht als 'nicht gefunden' (None) gemeldet"""
+        mock_session = MagicMock()
+        mock_get_db.return_value.__enter__.return_value = mock_session
+        mock_session.execute.side_effect = OperationalError('DELETE', {}, Exception('database is locked'))
+
+        db = Database(test_config)
+        with pytest.raises(OperationalError):
+            db.delete_returning(1)
+
+    @patch('app.database.get_db')
+    def test_update_returning_db_error_propagates(self, mock_get_db, test_config):
+        """Test DB-Fehler beim Update wird nicht als 'nicht gefunden' (None) gemeldet"""
+        mock_session = MagicMock()
+        mock_get_db.return_value.__enter__.return_value = mock_session
+        mock_session.execute.side_effect = OperationalError('UPDATE', {}, Exception('database is locked'))
+
+        db = Database(test_config)
+        with pytest.raises(OperationalError):
+            db.update_returning(1, {'category': 'Bank'})
+
+    @patch('app.database.get_db')
+    def test_update_returning_filters_fields(self, mock_get_db, test_config):
+        """Test Update ignoriert unbekannte Felder, fehlende ID -> None"""
+        mock_session = MagicMock()
+        mock_get_db.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value.scalar_one_or_none.return_value = None
+
+        db = Database(test_config)
+        assert db.update_returning(999, {'category': 'Bank', 'id': 5}) is None
+
+        params = mock_session.execute.call_args[0][0].compile().params
+        assert params['category'] == 'Bank'
+        assert 'id' not in params
+
+    @patch('app.database.get_db')
+    def test_update_returning_rejects_invalid_date(self, mock_get_db, test_config):
+        """Test unparsbares date_document -> ValueError, kein Update"""
+        db = Database(test_config)
+        with pytest.raises(ValueError):
+            db.update_returning(1, {'date_document': 'kein-datum'})
+        mock_get_db.assert_not_called()
+
+@pytest.mark.unit
+class TestPhotoIndex:
+    """Tests für den Foto-Index"""
+
+    @patch('app.database.get_db')
+    def test_list_photos(self, mock_get_db, test_config):
+        """Test Seite + Gesamtanzahl aus dem Index"""
+        mock_session = MagicMock()
+        mock_get_db.return_value.__enter__.return_value = mock_session
+        row = MagicMock(path='2024/05/01/a.jpg', date=datetime(2024, 5, 1), mtime=1.5, size=10)
+        mock_session.execute.return_value.scalar.return_value = 1
+        mock_session.execute.return_value.all.return_value = [row]
+
+        db = Database(test_config)
+        photos, total = db.list_photos(year=2024, month=5, limit=20)
+
+        assert total == 1
+        assert photos == [{'path': '2024/05/01/a.jpg', 'date': datetime(2024, 5, 1), 'mtime': 1.5, 'size': 10}]
+        params = mock_session.execute.call_args[0][0].compile().params
+        assert set(params.values()) >= {datetime(2024, 5, 1), datetime(2024, 6, 1)}
+
+    def test_photo_date_range(self):
+        """Test Datumsbereiche inkl. Jahres- und Monatswechsel"""
+        from app.database import _photo_date_range
+
+        assert _photo_date_range(2024, 12, None) == (datetime(2024, 12, 1), datetime(2025, 1, 1))
+        assert _photo_date_range(2024, 2, 29) == (datetime(2024, 2, 29), datetime(2024, 3, 1))
+        assert _photo_date_range(2024, None, None) == (datetime(2024, 1, 1), datetime(2025, 1, 1))
+
+    def test_photo_row_columns(self):
+        """Test Index-Zeile enthält nur Pfad, Datum, mtime und Größe"""
+        row = Database._photo_row('a.jpg', datetime(2023, 7, 9), 1.0, 5)
+        assert row == {'path': 'a.jpg', 'date': datetime(2023, 7, 9), 'mtime': 1.0, 'size': 5}
+
 
 @pytest.mark.unit
 class TestDatabaseMethods:
@@ -0,0 +1,157 @@
+"""
+Unit Tests für den Dokument-Metadaten-Cache
+"""
+import fnmatch
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+
+
+class FakeRedis:
+    """Minimaler RedisClient-Ersatz auf einem dict"""
+
+    def __init__(self):
+        self.data = {}
+        self.client = self
+
+    def get_many_raw(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, expire=3600):
+        self.data[key] = json.dumps(value) if isinstance(value, (dict, list)) else value
+        return True
+
+    def delete(self, key):
+        return self.data.pop(key, None) is not None
+
+    def delete_pattern(self, pattern):
+        keys = fnmatch.filter(list(self.data), pattern)
+        for key in keys:
+            del self.data[key]
+        return len(keys)
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+
+@pytest.fixture
+def cache():
+    """doc_cache ohne Redis-Tier, leerer lokaler LRU"""
+    from app import doc_cache
+    doc_cache.clear()
+    with patch('app.doc_cache._redis', return_value=None):
+        yield doc_cache
+        doc_cache.clear()
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.mark.unit
+class TestDocCache:
+    """Tests für get_document / invalidate"""
+
+    def test_hit_skips_db(self, cache):
+        """Zweiter Zugriff kommt aus dem LRU"""
+        db = MagicMock()
+        db.get_document.return_value = {'id': 1, 'filename': 'a.pdf'}
+
+        assert cache.get_document(db, 1)['filename'] == 'a.pdf'
+        assert cache.get_document(db, 1)['filename'] == 'a.pdf'
+        assert db.get_document.call_count == 1
+
+    def test_hit_returns_copy(self, cache):
+        """Änderungen eines Aufrufers landen nicht im Cache"""
+        db = MagicMock()
+        db.get_document.return_value = {'id': 1, 'filename': 'a.pdf'}
+
+        cache.get_document(db, 1)['filename'] = 'b.pdf'
+        assert cache.get_document(db, 1)['filename'] == 'a.pdf'
+
+    def test_redis_bypasses_local(self, fake_redis):
+        """Mit Redis wird jeder Zugriff dort gelesen (Invalidierung anderer Worker)"""
+        from app import doc_cache
+
+        db = MagicMock()
+        db.get_document.return_value = {'id': 4, 'filename': 'alt.pdf'}
+        with patch('app.doc_cache._redis', return_value=fake_redis):
+            assert doc_cache.get_document(db, 4)['filename'] == 'alt.pdf'
+            assert doc_cache.get_document(db, 4)['filename'] == 'alt.pdf'
+            assert db.get_document.call_count == 1
+
+            db.get_document.return_value = {'id': 4, 'filename': 'neu.pdf'}
+            doc_cache.invalidate(4)
+            assert doc_cache.get_document(db, 4)['filename'] == 'neu.pdf'
+        assert db.get_document.call_count == 2
+
+    @pytest.mark.parametrize("writer", ["invalidate", "clear"])
+    def test_redis_stale_set_after_invalidate(self, fake_redis, writer):
+        """Ein Leser, der vor dem invalidate gelesen hat, darf keinen alten Stand cachen"""
+        from app import doc_cache
+
+        def read_then_write(doc_id):
+            # Leser hat die alte Zeile, Schreiber committet + invalidiert dazwischen
+            getattr(doc_cache, writer)(*([doc_id] if writer == "invalidate" else []))
+            return {'id': doc_id, 'filename': 'alt.pdf'}
+
+        db = MagicMock()
+        db.get_document.side_effect = read_then_write
+        with patch('app.doc_cache._redis', return_value=fake_redis):
+            assert doc_cache.get_document(db, 5)['filename'] == 'alt.pdf'
+
+            db.get_document.side_effect = None
+            db.get_document.return_value = {'id': 5, 'filename': 'neu.pdf'}
+            assert doc_cache.get_document(db, 5)['filename'] == 'neu.pdf'
+            assert doc_cache.get_document(db, 5)['filename'] == 'neu.pdf'
+        assert db.get_document.call_count == 2
+
+    def test_missing_not_cached(self, cache):
+        """Nicht gefundene IDs werden erneut abgefragt"""
+        db = MagicMock()
+        db.get_document.return_value = None
+
+        assert cache.get_document(db, 2) is None
+        assert cache.get_document(db, 2) is None
+        assert db.get_document.call_count == 2
+
+    def test_invalidate(self, cache):
+        """Nach invalidate wird neu geladen"""
+        db = MagicMock()
+        db.get_document.return_value = {'id': 3}
+
+        cache.get_document(db, 3)
+        cache.invalidate(3)
+        cache.get_document(db, 3)
+        assert db.get_document.call_count == 2
+
+    def test_lru_bound(self, cache):
+        """Älteste Einträge fallen bei LOCAL_MAXSIZE heraus"""
+        db = MagicMock()
+        db.get_document.side_effect = lambda doc_id: {'id': doc_id}
+
+        with patch.object(cache, 'LOCAL_MAXSIZE', 2):
+            for doc_id in (1, 2, 3):
+                cache.get_document(db, doc_id)
+            cache.get_document(db, 1)
+        assert db.get_document.call_count == 4
+
+    def test_list_cache_disabled_without_redis(self, cache):
+        """Ohne Redis kein Listen-Cache"""
+        assert cache.lookup_list(b'page=1') == (None, None)
+
+    def test_list_epoch_in_key(self):
+        """Neue Epoche -> neuer Key für denselben Query-String"""
+        from app import doc_cache
+
+        redis = MagicMock()
+        redis.client.get.side_effect = ['1', None, '2', None]
+        with patch('app.doc_cache._redis', return_value=redis):
+            key_a, body = doc_cache.lookup_list(b'page=1')
+            key_b, _ = doc_cache.lookup_list(b'page=1')
+
+        assert body is None
+        assert key_a.startswith('doclist:1:') and key_b.startswith('doclist:2:')
+        assert key_a.split(':')[2] == key_b.split(':')[2]
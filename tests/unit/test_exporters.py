@@ -0,0 +1,35 @@
+"""
+Unit Tests für DataExporter (Excel)
+"""
+import io
+import pandas as pd
+import pytest
+
+from app.exporters import DataExporter
+
+
+@pytest.mark.unit
+class TestWriteExcelChunks:
+    """Tests für write_excel_chunks / export_to_excel"""
+
+    def test_rows(self):
+        """Blöcke werden untereinander mit einer Kopfzeile geschrieben"""
+        output = io.BytesIO()
+        chunks = [pd.DataFrame({'a': [1], 'b': ['x']}), pd.DataFrame({'a': [2], 'b': ['y']})]
+
+        assert DataExporter().write_excel_chunks(chunks, output) is True
+        df = pd.read_excel(io.BytesIO(output.getvalue()))
+        assert df.to_dict('list') == {'a': [1, 2], 'b': ['x', 'y']}
+
+    def test_header_only(self):
+        """Ohne Datenzeilen bleibt die Kopfzeile erhalten"""
+        output = io.BytesIO()
+
+        assert DataExporter().write_excel_chunks([pd.DataFrame(columns=['a', 'b'])], output) is False
+        assert pd.read_excel(io.BytesIO(output.getvalue())).columns.tolist() == ['a', 'b']
+
+    def test_export_to_excel(self):
+        """export_to_excel liefert einen lesbaren BytesIO"""
+        output = DataExporter().export_to_excel([{'a': 1, 'b': 'x'}])
+
+        assert pd.read_excel(output).to_dict('list') == {'a': [1], 'b': ['x']}
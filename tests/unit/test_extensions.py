@@ -0,0 +1,60 @@
+"""
+Unit Tests für App-Extensions
+"""
+import pytest
+from flask import Flask
+from app.extensions import get_extension
+
+
+@pytest.mark.unit
+class TestGetExtension:
+    """Tests für get_extension()"""
+
+    def test_factory_called_once(self):
+        """Test dass die Instanz geteilt wird"""
+        app = Flask(__name__)
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return object()
+
+        with app.app_context():
+            first = get_extension('thing', factory)
+            assert get_extension('thing', factory) is first
+
+        assert len(calls) == 1
+        assert app.extensions['thing'] is first
+
+    def test_preregistered_instance(self):
+        """Test dass vorab registrierte Instanzen genutzt werden"""
+        app = Flask(__name__)
+        app.extensions['thing'] = 'existing'
+
+        with app.app_context():
+            assert get_extension('thing', lambda: 'new') == 'existing'
+
+
+@pytest.mark.unit
+class TestRunIo:
+    """Tests für run_io()"""
+
+    def test_runs_in_bounded_pool(self):
+        """Test dass im io-Pool mit App-Kontext ausgeführt wird"""
+        import asyncio
+        import threading
+        from flask import current_app
+        from app.extensions import run_io, get_io_pool
+
+        app = Flask(__name__)
+
+        def work(x):
+            return threading.current_thread().name, current_app.name, x * 2
+
+        with app.app_context():
+            name, app_name, value = asyncio.run(run_io(work, 21))
+            assert get_io_pool()._max_workers == 8
+
+        assert name.startswith('io')
+        assert app_name == app.name
+        assert value == 42
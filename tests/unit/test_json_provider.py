@@ -0,0 +1,104 @@
+"""
+Unit Tests für den orjson JSON-Provider
+"""
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from app.json_provider import OrjsonProvider
+
+
+@pytest.fixture
+def app():
+    """Minimale App mit OrjsonProvider"""
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    return app
+
+
+@pytest.fixture
+def default_provider(app):
+    """Flask-Standard als Referenz"""
+    return DefaultJSONProvider(app)
+
+
+@pytest.mark.unit
+class TestOrjsonProvider:
+    """Tests für OrjsonProvider.dumps/response"""
+
+    @pytest.mark.parametrize("value", [
+        datetime(2025, 3, 1, 12, 30, 5),
+        datetime(2025, 3, 1, 12, 30, 5, tzinfo=timezone.utc),
+        date(2025, 3, 1),
+        Decimal('19.99'),
+        {'amount': Decimal('0.10'), 'created': datetime(2024, 12, 31, 23, 59)},
+    ])
+    def test_matches_default_provider(self, app, default_provider, value):
+        """datetime/date/Decimal werden wie beim Flask-Standard serialisiert"""
+        assert json.loads(app.json.dumps(value)) == json.loads(default_provider.dumps(value))
+
+    def test_datetime_http_date(self, app):
+        """datetime als HTTP-Date (nicht ISO wie orjson-Standard)"""
+        assert app.json.dumps(datetime(2025, 3, 1, 12, 30, 5)) == '"Sat, 01 Mar 2025 12:30:05 GMT"'
+
+    def test_numpy_values(self, app):
+        """numpy-Skalare und -Arrays werden nativ serialisiert"""
+        payload = {
+            'count': np.int64(3),
+            'total': np.float64(12.5),
+            'flag': np.bool_(True),
+            'values': np.array([1, 2, 3], dtype=np.int32),
+        }
+
+        assert json.loads(app.json.dumps(payload)) == {
+            'count': 3, 'total': 12.5, 'flag': True, 'values': [1, 2, 3]
+        }
+
+    def test_non_str_keys_and_sort(self, app):
+        """Integer-Keys und sort_keys wie beim Standard"""
+        assert app.json.dumps({2: 'b', 1: 'a'}, sort_keys=True) == '{"1":"a","2":"b"}'
+
+    def test_big_int_falls_back(self, app):
+        """Integer > 64 Bit gehen über stdlib json"""
+        assert json.loads(app.json.dumps({'n': 2 ** 70})) == {'n': 2 ** 70}
+
+    def test_unsupported_kwargs_fall_back(self, app, default_provider):
+        """Unbekannte Keyword-Argumente nutzen den Standard-Provider"""
+        assert app.json.dumps({'a': 'ä'}, ensure_ascii=True) == default_provider.dumps({'a': 'ä'}, ensure_ascii=True)
+
+    def test_loads_roundtrip(self, app):
+        """loads akzeptiert str und bytes"""
+        assert app.json.loads('{"a": [1, 2]}') == {'a': [1, 2]}
+        assert app.json.loads(b'{"a": null}') == {'a': None}
+
+
+@pytest.mark.unit
+class TestJsonifyResponse:
+    """Tests für OrjsonProvider.response (jsonify)"""
+
+    def test_compact_body(self, app):
+        """Kompakter Body mit abschließendem Newline wie beim Standard"""
+        with app.app_context():
+            response = jsonify({'a': 1, 'b': [1, 2]})
+
+        assert response.mimetype == 'application/json'
+        assert response.get_data() == b'{"a":1,"b":[1,2]}\n'
+
+    def test_debug_indent(self, app):
+        """Im Debug-Modus eingerückt"""
+        app.debug = True
+        with app.app_context():
+            response = jsonify({'a': 1})
+
+        assert response.get_data() == b'{\n  "a": 1\n}\n'
+
+    def test_args_and_kwargs(self, app):
+        """jsonify(*args)/jsonify(**kwargs) wie beim Standard"""
+        with app.app_context():
+            assert jsonify(1, 2).get_json() == [1, 2]
+            assert jsonify(amount=Decimal('1.50')).get_json() == {'amount': '1.50'}
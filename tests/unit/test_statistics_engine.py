@@ -0,0 +1,139 @@
+"""
+Unit Tests für StatisticsEngine (Aggregationen)
+"""
+import pandas as pd
+import pytest
+import yaml
+
+from app.statistics_engine import StatisticsEngine
+
+
+YEAR = 2024
+
+ROWS = [
+    {'datum': '2024-01-05', 'kategorie': 'Strom', 'betrag': 80.0, 'lieferant': 'EVU'},
+    {'datum': '2024-01-20', 'kategorie': 'Internet', 'betrag': 39.99, 'lieferant': 'Telko'},
+    {'datum': '2024-01-28', 'kategorie': 'Strom', 'betrag': 12.5, 'lieferant': 'EVU'},
+    {'datum': '2024-03-02', 'kategorie': 'Versicherung', 'betrag': 120.0, 'lieferant': 'HUK'},
+    {'datum': '2024-03-15', 'kategorie': 'Strom', 'betrag': 81.25, 'lieferant': 'EVU'},
+    {'datum': '2024-12-31', 'kategorie': 'Internet', 'betrag': 39.99, 'lieferant': 'Telko'},
+    {'datum': 'kein Datum', 'kategorie': 'Strom', 'betrag': 5.0, 'lieferant': 'EVU'},
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """StatisticsEngine auf einem kleinen Rechnungs-CSV"""
+    config = tmp_path / 'config.yaml'
+    config.write_text(yaml.safe_dump({'system': {'storage': {'data_path': str(tmp_path / 'data')}}}))
+
+    year_dir = tmp_path / 'data' / str(YEAR)
+    year_dir.mkdir(parents=True)
+    pd.DataFrame(ROWS).to_csv(year_dir / 'rechnungen_data.csv', index=False)
+
+    return StatisticsEngine(config_path=str(config))
+
+
+def _frame(engine):
+    df = pd.read_csv(engine.data_path / str(YEAR) / 'rechnungen_data.csv')
+    df['datum'] = pd.to_datetime(df['datum'], errors='coerce')
+    return df
+
+
+def _assert_nested_close(actual, expected):
+    """Dict von Dicts mit Float-Toleranz vergleichen"""
+    assert actual.keys() == expected.keys()
+    for key, values in expected.items():
+        assert actual[key] == pytest.approx(values), key
+
+
+def _category_breakdown_per_mask(df):
+    """Bisherige Implementierung: eine Maske pro Kategorie"""
+    category_data = {}
+    for category in df['kategorie'].unique():
+        cat_data = df[df['kategorie'] == category]
+        category_data[category] = {
+            'total': float(cat_data['betrag'].sum()),
+            'count': int(len(cat_data)),
+            'average': float(cat_data['betrag'].mean()),
+            'min': float(cat_data['betrag'].min()),
+            'max': float(cat_data['betrag'].max())
+        }
+    return category_data
+
+
+@pytest.mark.unit
+class TestCategoryBreakdown:
+    """Tests für get_category_breakdown / get_expenses_comparison"""
+
+    @pytest.mark.parametrize('month', [None, 1, 3, 7])
+    def test_matches_per_category_masks(self, engine, month):
+        """groupby().agg() liefert dasselbe wie die Masken pro Kategorie"""
+        df = _frame(engine)
+        if month:
+            df = df[df['datum'].dt.month == month]
+
+        result = engine.get_category_breakdown(YEAR, month)
+
+        _assert_nested_close(result['categories'], _category_breakdown_per_mask(df))
+        assert result['total'] == pytest.approx(float(df['betrag'].sum()))
+
+    def test_missing_year(self, engine):
+        """Ohne CSV leerer Breakdown"""
+        assert engine.get_category_breakdown(1999)['categories'] == {}
+
+    def test_expenses_comparison(self, engine):
+        """Summen pro Kategorie, fehlendes Jahr zählt als 0"""
+        result = engine.get_expenses_comparison(YEAR - 1, YEAR)
+
+        _assert_nested_close(result['comparison'], {
+            'Internet': {'year1': 0.0, 'year2': 79.98, 'change': 79.98},
+            'Strom': {'year1': 0.0, 'year2': 178.75, 'change': 178.75},
+            'Versicherung': {'year1': 0.0, 'year2': 120.0, 'change': 120.0},
+        })
+
+
+def _monthly_trends_per_mask(df):
+    """Bisherige Implementierung: groupby pro Monat + Maske pro Monat"""
+    df = df.copy()
+    df['month'] = df['datum'].dt.month
+    monthly_totals = df.groupby('month')['betrag'].sum().to_dict()
+    monthly_categories = {}
+    for month in range(1, 13):
+        month_data = df[df['month'] == month]
+        monthly_categories[month] = month_data.groupby('kategorie')['betrag'].sum().to_dict()
+    return monthly_totals, monthly_categories
+
+
+@pytest.mark.unit
+class TestMonthlyTrends:
+    """Tests für get_monthly_trends"""
+
+    def test_matches_per_month_masks(self, engine):
+        """bincount + ein groupby liefern dasselbe wie die Masken pro Monat"""
+        totals, categories = _monthly_trends_per_mask(_frame(engine))
+
+        result = engine.get_monthly_trends(YEAR)
+
+        assert result['months'] == list(range(1, 13))
+        # Monats-Keys sind jetzt int statt float (NaN-Monat)
+        assert result['total_by_month'] == pytest.approx({int(m): t for m, t in totals.items()})
+        _assert_nested_close(result['categories_by_month'], categories)
+
+    def test_invalid_date_and_amount(self, engine):
+        """Ungültiges Datum fällt heraus, nicht-numerischer Betrag zählt als 0"""
+        csv_path = engine.data_path / str(YEAR) / 'rechnungen_data.csv'
+        pd.DataFrame([
+            {'datum': '2024-02-01', 'kategorie': 'Strom', 'betrag': '10.5'},
+            {'datum': '2024-02-03', 'kategorie': 'Strom', 'betrag': 'n/a'},
+            {'datum': '', 'kategorie': 'Strom', 'betrag': '99'},
+        ]).to_csv(csv_path, index=False)
+
+        result = engine.get_monthly_trends(YEAR)
+
+        assert result['total_by_month'] == {2: 10.5}
+        assert result['categories_by_month'][2] == {'Strom': 10.5}
+
+    def test_missing_year(self, engine):
+        """Ohne CSV leere Trends"""
+        assert engine.get_monthly_trends(1999)['months'] == []
@@ -0,0 +1,118 @@
+"""
+Unit Tests für den Stats-Cache (stale-while-revalidate)
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+from flask import Flask
+
+from app.blueprints import stats
+from app.blueprints.stats import CachePolicy, STALE_FACTOR
+
+POLICY = CachePolicy('test', min_ttl=60, max_ttl=300, buffer=0)
+
+
+class _InlinePool:
+    """Führt Hintergrund-Refreshes sofort im Test-Thread aus"""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+@pytest.fixture
+def clock():
+    """Feste Uhr für time.time/time.monotonic im stats-Modul"""
+    now = {'t': 1000.0}
+    with patch.object(stats.time, 'time', lambda: now['t']), \
+            patch.object(stats.time, 'monotonic', lambda: now['t']):
+        yield now
+
+
+@pytest.fixture
+def redis():
+    redis = MagicMock()
+    with patch('app.blueprints.stats.RedisClient', return_value=redis), \
+            patch('app.blueprints.stats._refresh_pool', return_value=_InlinePool()):
+        yield redis
+
+
+@pytest.fixture
+def app_ctx():
+    with Flask(__name__).app_context():
+        yield
+
+
+def _producer(value):
+    async def produce():
+        return value
+    return produce
+
+
+@pytest.mark.unit
+class TestStaleWhileRevalidate:
+    """Tests für _produce / _cached_body / _refresh_in_background"""
+
+    def test_produce_entry_and_expiry(self, clock, app_ctx):
+        """Eintrag trägt stale_at, Redis-TTL ist ttl * STALE_FACTOR"""
+        import asyncio
+
+        _, entry, expire = asyncio.run(stats._produce(POLICY, _producer({'a': 1})))
+
+        head, _, body = entry.partition(b'\n')
+        assert int(head) == 1000 + POLICY.min_ttl
+        assert body.strip() == b'{"a":1}'
+        assert expire == POLICY.min_ttl * STALE_FACTOR
+
+    def test_fresh_no_refresh(self, clock, redis):
+        """Frischer Eintrag wird ohne Refresh ausgeliefert"""
+        producer = MagicMock()
+
+        assert stats._cached_body('k', '1100\n{"a":1}', POLICY, producer) == '{"a":1}'
+        producer.assert_not_called()
+        redis.set.assert_not_called()
+
+    def test_stale_served_and_refreshed(self, clock, redis, app_ctx):
+        """Veralteter Eintrag wird ausgeliefert und neu erzeugt"""
+        clock['t'] = 1200.0
+
+        body = stats._cached_body('k', '1100\n{"a":1}', POLICY, _producer({'a': 2}))
+
+        assert body == '{"a":1}'
+        key, entry = redis.set.call_args.args
+        assert key == 'k'
+        assert entry.split(b'\n', 1)[1].strip() == b'{"a":2}'
+        assert redis.set.call_args.kwargs['expire'] == POLICY.min_ttl * STALE_FACTOR
+        assert 'k' not in stats._refreshing
+
+    def test_refresh_failure_keeps_stale(self, clock, redis, app_ctx):
+        """Fehlschlagender Refresh: alter Body bleibt, nichts wird geschrieben"""
+        async def failing():
+            raise RuntimeError('backend down')
+
+        clock['t'] = 1200.0
+
+        assert stats._cached_body('k', '1100\n{"a":1}', POLICY, failing) == '{"a":1}'
+        redis.set.assert_not_called()
+        assert 'k' not in stats._refreshing
+
+    def test_refresh_deduplicated(self, clock, redis):
+        """Läuft für den Key schon ein Refresh, wird kein zweiter eingeplant"""
+        producer = MagicMock()
+        clock['t'] = 1200.0
+        stats._refreshing.add('k')
+        try:
+            assert stats._cached_body('k', '1100\n{"a":1}', POLICY, producer) == '{"a":1}'
+        finally:
+            stats._refreshing.discard('k')
+        producer.assert_not_called()
+
+    def test_stale_not_allowed(self, clock, redis):
+        """Ohne allow_stale ist ein veralteter Eintrag ein Miss"""
+        policy = CachePolicy('strict', min_ttl=60, max_ttl=300, buffer=0, allow_stale=False)
+        clock['t'] = 1200.0
+
+        assert stats._cached_body('k', '1100\n{"a":1}', policy, MagicMock()) is None
+
+    def test_miss_and_old_format(self, clock, redis):
+        """Kein Eintrag bzw. Eintrag ohne Zeitstempel -> Miss"""
+        assert stats._cached_body('k', None, POLICY, MagicMock()) is None
+        assert stats._cached_body('k', '{"a":1}', POLICY, MagicMock()) is None